@@ -0,0 +1,376 @@
+# FILE: app/api.py
+"""
+HTTP scoring API (stdlib only):
+
+    python -m app.api --host 127.0.0.1 --port 8000
+
+    POST /score          {"jd": "...", "resumes": [{"name": "a", "text": "..."} |
+                                                   {"filename": "a.pdf", "content_b64": "..."}],
+                          "save": false}
+    POST /search         {"jd": "...", "k": 20}   top-k stored resumes for a JD
+    GET  /results        ?limit=50&before_ts=...&before_id=...   (newest first)
+    GET  /resumes/<id>   parsed fields of one stored resume
+    GET  /resumes/<id>/file   original upload (streamed in chunks)
+    GET  /jobs/<id>      background job progress
+    GET  /health         queue depth / in-flight requests / document cache hit ratio
+    GET  /metrics        Prometheus text (app.utils.metrics)
+
+Concurrent requests are coalesced by a micro-batcher: texts arriving
+within a few milliseconds share one embedding call. Admission control
+rejects work (HTTP 503 + Retry-After) instead of letting queues grow
+without bound.
+"""
+
+import argparse
+import base64
+import io
+import itertools
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from app.services.micro_batcher import MicroBatcher, Overloaded
+from app.utils.metrics import span, inc, to_prometheus
+
+# Admission control (queued texts are bounded by the micro-batcher)
+MAX_INFLIGHT = 32            # concurrent /score requests
+ADMIT_TIMEOUT = 0.5          # seconds a request may wait for a slot
+MAX_RESUMES_PER_REQUEST = 200
+MAX_BODY_BYTES = 50 * 1024 * 1024
+
+# Processed JDs remembered by fingerprint
+JD_CACHE_SIZE = 256
+
+
+# ------------------------------------------------------------
+# Scoring service
+# ------------------------------------------------------------
+class ScoringService:
+    def __init__(self, max_inflight=MAX_INFLIGHT):
+        """Engines from the registry + batcher + admission control."""
+        from app.services.registry import (
+            get_jd_parser, get_embedding_model, get_similarity_engine, get_scoring_engine
+        )
+        from app.utils.database import create_tables
+
+        create_tables()
+
+        self.jd_parser = get_jd_parser()
+        self.similarity_engine = get_similarity_engine()
+        self.scoring_engine = get_scoring_engine()
+
+        # Resumes and JDs share one encoder (same chunking + pooling)
+        self.batcher = MicroBatcher(get_embedding_model().encode_documents)
+
+        self.max_inflight = max_inflight
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._inflight = 0
+
+        self._jds = OrderedDict()
+        self._jd_lock = threading.Lock()
+
+    # Admission ------------------------------------------------
+    def admit(self):
+        if not self._slots.acquire(timeout=ADMIT_TIMEOUT):
+            inc("api_rejected_busy")
+            raise Overloaded("too many concurrent requests")
+        with self._jd_lock:
+            self._inflight += 1
+
+    def release(self):
+        with self._jd_lock:
+            self._inflight -= 1
+        self._slots.release()
+
+    def health(self):
+        from app.services.registry import get_extraction_pool
+
+        return {"status": "ok", "inflight": self._inflight, "max_inflight": self.max_inflight,
+                "queued_texts": self.batcher.depth, "max_queued_texts": self.batcher.max_queued,
+                "document_cache": get_extraction_pool().cache_stats()}
+
+    # JD -------------------------------------------------------
+    def _jd(self, jd_text, save):
+        from app.services.scoring_session import fingerprint_text
+        from app.utils.database import save_jd
+
+        fp = fingerprint_text(jd_text)
+        with self._jd_lock:
+            jd = self._jds.get(fp)
+            if jd is not None:
+                self._jds.move_to_end(fp)
+
+        if jd is None:
+            info = self.jd_parser.process_jd(jd_text)
+            jd = {"clean_text": info["clean_text"], "skills": info["skills"],
+                  "role": info["role"], "id": None,
+                  "embedding": self.batcher.submit([info["clean_text"]]).result()[0]}
+            with self._jd_lock:
+                jd = self._jds.setdefault(fp, jd)
+                while len(self._jds) > JD_CACHE_SIZE:
+                    self._jds.popitem(last=False)
+
+        if save and jd["id"] is None:
+            with self._jd_lock:
+                if jd["id"] is None:
+                    jd["id"] = save_jd(jd_text, jd["clean_text"], jd["skills"], jd["role"])
+        return jd
+
+    # Resumes --------------------------------------------------
+    def _resume_texts(self, resumes):
+        """[(name, raw_text, clean_text, filedata, error, sections)] in request order."""
+        from app.services.registry import get_extraction_pool
+
+        out = [None] * len(resumes)
+        files = []
+        for idx, r in enumerate(resumes):
+            name = r.get("name") or r.get("filename") or f"resume_{idx}"
+            if r.get("text"):
+                raw = r["text"]
+                out[idx] = (name, raw, self.jd_parser.preprocessor.clean_text(raw), None, None, None)
+            elif r.get("content_b64") and r.get("filename"):
+                buf = io.BytesIO(base64.b64decode(r["content_b64"]))
+                buf.name = r["filename"]
+                files.append((idx, name, buf))
+            else:
+                out[idx] = (name, None, None, None, "needs 'text' or 'filename' + 'content_b64'", None)
+
+        if files:
+            extracted = get_extraction_pool().extract_all([buf for _, _, buf in files])
+            for (idx, name, buf), item in zip(files, extracted):
+                error = item["error"] or (None if item["raw_text"] else "no text found")
+                out[idx] = (name, item["raw_text"], item["clean_text"], buf.getvalue(), error,
+                            item.get("sections"))
+
+        return out
+
+    @span("api_score")
+    def score(self, payload):
+        """Scores the request's resumes against its JD → response dict."""
+        from app.utils.database import save_resume, save_result
+        from app.utils.section_parser import SectionParser
+
+        jd_text = payload.get("jd")
+        resumes = payload.get("resumes") or []
+        save = bool(payload.get("save", False))
+
+        if not isinstance(jd_text, str) or not jd_text.strip():
+            raise ValueError("'jd' (non-empty string) is required")
+        if not isinstance(resumes, list) or not resumes:
+            raise ValueError("'resumes' must be a non-empty list")
+        if len(resumes) > MAX_RESUMES_PER_REQUEST:
+            raise ValueError(f"at most {MAX_RESUMES_PER_REQUEST} resumes per request")
+        for idx, r in enumerate(resumes):
+            if not isinstance(r, dict):
+                raise ValueError(f"resumes[{idx}] must be an object")
+            bad = [key for key in ("name", "filename", "text", "content_b64")
+                   if r.get(key) is not None and not isinstance(r[key], str)]
+            if bad:
+                raise ValueError(f"resumes[{idx}].{bad[0]} must be a string")
+
+        jd = self._jd(jd_text, save)
+        parsed = self._resume_texts(resumes)
+        ok = [i for i, p in enumerate(parsed) if p[4] is None]
+
+        vectors = self.batcher.submit([parsed[i][2] for i in ok]).result() if ok else []
+
+        results = [{"name": p[0], "error": p[4]} for p in parsed]
+        for i, vec in zip(ok, vectors):
+            if vec is None:
+                results[i]["error"] = "embedding failed"
+        vectors = [vec for vec in vectors if vec is not None]
+        ok = [i for i in ok if results[i]["error"] is None]
+        sims = self.similarity_engine.batch_similarity(vectors, jd["embedding"]) if ok else []
+        pending = []
+        for i, vec, sim in zip(ok, vectors, sims):
+            name, raw, clean, filedata, _, sections = parsed[i]
+            skills = self.jd_parser.match_skills(raw, jd["skills"])
+            results[i].update({
+                "semantic_score": round(sim, 4),
+                "final_score": self.scoring_engine.calculate_final_score(sim, skills, jd["skills"]),
+                "matched_skills": skills,
+            })
+
+            if save:
+                sections = sections or SectionParser.get_sections(raw)
+                pending.append((i, save_resume(
+                    filename=os.path.splitext(name)[0], filedata=filedata, clean_text=clean,
+                    skills=self.jd_parser.extract_skills(raw), name=sections["name"],
+                    email=sections["email"], phone=sections["phone"],
+                    education=sections["education"], experience=sections["experience"],
+                    projects=sections["projects"], embedding=vec, wait=False
+                )))
+
+        result_writes = []
+        for i, write in pending:
+            results[i]["resume_id"] = write.result()
+            result_writes.append((i, save_result(
+                results[i]["resume_id"], jd["id"], results[i]["semantic_score"],
+                results[i]["final_score"], wait=False
+            )))
+        for i, write in result_writes:
+            results[i]["result_id"] = write.result()
+
+        inc("api_resumes_scored", len(ok))
+        return {"jd": {"id": jd["id"], "role": jd["role"], "skills": jd["skills"]},
+                "results": results}
+
+    @span("api_search")
+    def search(self, payload):
+        """Top-k stored resumes for the request's JD → response dict."""
+        from app.services.corpus_search import DEFAULT_TOP_K
+        from app.services.registry import get_corpus_search
+
+        jd_text = payload.get("jd")
+        k = payload.get("k", DEFAULT_TOP_K)
+        if not isinstance(jd_text, str) or not jd_text.strip():
+            raise ValueError("'jd' (non-empty string) is required")
+        if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= 500:
+            raise ValueError("'k' must be an integer between 1 and 500")
+
+        jd = self._jd(jd_text, save=False)
+        return {"jd": {"role": jd["role"], "skills": jd["skills"]},
+                "results": get_corpus_search().search(jd["embedding"], jd["skills"], k,
+                                                      jd_text=jd["clean_text"])}
+
+
+# ------------------------------------------------------------
+# HTTP layer
+# ------------------------------------------------------------
+class ApiHandler(BaseHTTPRequestHandler):
+    service = None   # set by serve()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass   # metrics instead of per-request stderr lines
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message, headers=None):
+        inc(f"api_http_{status}")
+        self._send(status, {"error": message}, headers=headers)
+
+    def _stream_file(self, resume_id):
+        """Chunked transfer straight from the blob store (never the whole file in memory)."""
+        from app.utils.database import get_resume, iter_resume_file
+
+        row = get_resume(resume_id)
+        if row is None:
+            return self._error(404, f"resume {resume_id} not found")
+
+        chunks = iter_resume_file(resume_id)
+        try:
+            first = next(chunks, b"")
+        except OSError:
+            return self._error(404, f"file of resume {resume_id} not found")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Disposition", f'attachment; filename="{row["filename"]}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in itertools.chain([first] if first else [], chunks):
+            self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        from app.utils.database import list_results, get_resume, get_job
+
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+
+        try:
+            if parts == ["health"]:
+                return self._send(200, self.service.health())
+
+            if parts == ["metrics"]:
+                return self._send(200, to_prometheus(), content_type="text/plain; version=0.0.4")
+
+            if parts == ["results"]:
+                limit = min(int(query.get("limit", ["50"])[0]), 500)
+                before = None
+                if "before_ts" in query and "before_id" in query:
+                    before = (query["before_ts"][0], int(query["before_id"][0]))
+                rows, cursor = list_results(limit, before)
+                next_page = {"before_ts": cursor[0], "before_id": cursor[1]} if cursor else None
+                return self._send(200, {"results": rows, "next": next_page})
+
+            if len(parts) == 3 and parts[0] == "resumes" and parts[1].isdigit() and parts[2] == "file":
+                return self._stream_file(int(parts[1]))
+
+            if len(parts) == 2 and parts[0] in ("resumes", "jobs") and parts[1].isdigit():
+                row = (get_resume if parts[0] == "resumes" else get_job)(int(parts[1]))
+                if row is None:
+                    return self._error(404, f"{parts[0][:-1]} {parts[1]} not found")
+                return self._send(200, row)
+
+            return self._error(404, "not found")
+        except ValueError as e:
+            return self._error(400, str(e))
+
+    def do_POST(self):
+        route = urlparse(self.path).path.rstrip("/")
+        if route not in ("/score", "/search"):
+            return self._error(404, "not found")
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            return self._error(413, "request body too large")
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._error(400, "invalid JSON")
+        if not isinstance(payload, dict):
+            return self._error(400, "request body must be a JSON object")
+
+        try:
+            self.service.admit()
+        except Overloaded as e:
+            return self._error(503, str(e), headers={"Retry-After": "1"})
+
+        try:
+            handler = self.service.score if route == "/score" else self.service.search
+            return self._send(200, handler(payload))
+        except Overloaded as e:
+            return self._error(503, str(e), headers={"Retry-After": "1"})
+        except ValueError as e:
+            return self._error(400, str(e))
+        except Exception as e:
+            return self._error(500, f"{type(e).__name__}: {e}")
+        finally:
+            self.service.release()
+
+
+def serve(host="127.0.0.1", port=8000, max_inflight=MAX_INFLIGHT):
+    ApiHandler.service = ScoringService(max_inflight=max_inflight)
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    print(f"ATS scoring API on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-inflight", type=int, default=MAX_INFLIGHT)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.max_inflight)
@@ -0,0 +1,377 @@
+# FILE: app/batch.py
+"""
+Headless batch scoring:
+
+    python -m app.batch "resumes/**/*.pdf" resumes/docx/ --jd jd1.txt jd2.pdf --out results.csv
+
+Resumes are streamed through the pipeline in chunks (bounded memory) and
+every chunk is appended to the output file before the next one starts.
+Re-running the same command skips resume/JD pairs already in the output
+(a JD added on the rerun is scored against the finished resumes only);
+pairs whose row is an error are tried again and the new row supersedes it.
+With the database on, every row written is checkpointed in the same
+transaction, so a crash between the DB write and the output append
+never duplicates resumes, JDs or results.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+
+from app.services.extraction_pool import ExtractionPool
+from app.services.jd_parser import JDParser
+from app.services.embedding_model import EmbeddingModel
+from app.services.similarity_engine import SimilarityEngine
+from app.services.scoring_engine import ScoringEngine
+from app.utils.constants import SUPPORTED_RESUME_TYPES
+from app.utils.database import (
+    create_tables, save_resume, save_jd, save_result, flush, get_batch_checkpoints
+)
+from app.utils.file_handler import read_pdf, read_txt
+from app.utils.section_parser import SectionParser
+
+OUTPUT_FIELDS = [
+    "resume_file", "resume_name", "jd_file", "jd_role",
+    "semantic_score", "final_score", "matched_skills",
+    "resume_id", "jd_id", "error"
+]
+
+
+# ------------------------------------------------------------
+# Input discovery (generator → never lists the whole corpus twice)
+# ------------------------------------------------------------
+def iter_resume_paths(patterns):
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*")
+
+        for path in sorted(glob.iglob(pattern, recursive=True)):
+            ext = path.rsplit(".", 1)[-1].lower()
+            if ext not in SUPPORTED_RESUME_TYPES or not os.path.isfile(path):
+                continue
+
+            path = os.path.abspath(path)
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_jd_file(path):
+    with open(path, "rb") as f:
+        if path.lower().endswith(".pdf"):
+            return read_pdf(f)
+        return read_txt(f)
+
+
+# ------------------------------------------------------------
+# Output (append-only, doubles as the resume checkpoint)
+# ------------------------------------------------------------
+def load_finished(out_path):
+    """
+    Reads a previous run's output.
+    Returns ({(resume_file, jd_file)} already done, {jd_file: jd_id},
+    {resume_file: resume_id}). Error rows are not done (retried).
+    """
+    finished, jd_ids, resume_ids = set(), {}, {}
+    if not os.path.exists(out_path):
+        return finished, jd_ids, resume_ids
+
+    with open(out_path, newline="", encoding="utf-8") as f:
+        if out_path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+
+        for row in rows:
+            if not row.get("error"):
+                finished.add((row["resume_file"], row["jd_file"]))
+            if row["jd_id"] not in ("", None):
+                jd_ids[row["jd_file"]] = int(row["jd_id"])
+            if row["resume_id"] not in ("", None):
+                resume_ids[row["resume_file"]] = int(row["resume_id"])
+
+    return finished, jd_ids, resume_ids
+
+
+class ResultWriter:
+    def __init__(self, out_path):
+        self.jsonl = out_path.endswith(".jsonl")
+        is_new = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+
+        self.file = open(out_path, "a", newline="", encoding="utf-8")
+        if not self.jsonl:
+            self.writer = csv.DictWriter(self.file, fieldnames=OUTPUT_FIELDS)
+            if is_new:
+                self.writer.writeheader()
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self.jsonl:
+                self.file.write(json.dumps(row) + "\n")
+            else:
+                self.writer.writerow(row)
+
+        # One flush + fsync per chunk → finished work survives a crash
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+# ------------------------------------------------------------
+# Pipeline
+# ------------------------------------------------------------
+class BatchScorer:
+    def __init__(self, jd_paths, save_to_db=True, workers=None):
+        self.jd_parser = JDParser()
+        self.embed_model = EmbeddingModel()
+        self.similarity_engine = SimilarityEngine()
+        self.scoring_engine = ScoringEngine()
+        self.pool = ExtractionPool(workers=workers)
+        self.save_to_db = save_to_db
+
+        if save_to_db:
+            create_tables()
+
+        # Resume state of the current run (filled by run())
+        self.run_key = None
+        self.finished = set()
+        self.resume_ids = {}
+        self.checkpoints = {}
+        self.cache_stats = None   # document cache counters, read before the pool closes
+
+        # JDs are few → processed once up front
+        self.jds = []
+        for path in jd_paths:
+            raw = read_jd_file(path)
+            info = self.jd_parser.process_jd(raw)
+            self.jds.append({
+                "file": os.path.abspath(path),
+                "raw_text": raw,
+                "role": info["role"],
+                "skills": info["skills"],
+                "clean_text": info["clean_text"],
+                "id": None,
+            })
+
+        self.jd_embs = self.embed_model.encode_documents(
+            [jd["clean_text"] for jd in self.jds]
+        )
+
+    def _missing_jds(self, path):
+        """JDs this resume has no output row for yet."""
+        return [jd for jd in self.jds if (path, jd["file"]) not in self.finished]
+
+    def score_chunk(self, paths):
+        """Scores one chunk of resume files against the JDs they miss → list of rows."""
+        extracted = self.pool.extract_all(paths)
+
+        ok = [(p, item) for p, item in zip(paths, extracted)
+              if not item["error"] and item["raw_text"]]
+        rows = [
+            self._error_row(p, jd, item["error"] or "no text found")
+            for p, item in zip(paths, extracted)
+            if item["error"] or not item["raw_text"]
+            for jd in self._missing_jds(p)
+        ]
+        if not ok:
+            return rows
+
+        clean_texts = [item["clean_text"] for _, item in ok]
+        resume_embs = self.embed_model.encode_documents(clean_texts)
+
+        # Could not be embedded → error rows, nothing stored for them
+        rows += [self._error_row(p, jd, "embedding failed")
+                 for (p, _), emb in zip(ok, resume_embs) if emb is None
+                 for jd in self._missing_jds(p)]
+        kept = [(entry, emb) for entry, emb in zip(ok, resume_embs) if emb is not None]
+        if not kept:
+            return rows
+        ok = [entry for entry, _ in kept]
+        resume_embs = [emb for _, emb in kept]
+
+        sims = self.similarity_engine.similarity_matrix(resume_embs, self.jd_embs)
+
+        # Pass 1: parse + queue resume inserts (one writer transaction)
+        parsed = []
+        for r_idx, (path, item) in enumerate(ok):
+            name = os.path.splitext(os.path.basename(path))[0]
+            sections = item.get("sections") or SectionParser.get_sections(item["raw_text"])
+
+            detected = {
+                jd["file"]: self.jd_parser.match_skills(item["raw_text"], jd["skills"])
+                for jd in self.jds
+            }
+
+            # Saved by an earlier run (in the output or checkpointed) → reuse
+            pending = self.resume_ids.get(path) or self.checkpoints.get((path, ""))
+            if self.save_to_db and pending is None:
+                with open(path, "rb") as f:
+                    filedata = f.read()
+                all_detected = sorted({s for skills in detected.values() for s in skills})
+                pending = save_resume(
+                    filename=name,
+                    filedata=filedata,
+                    clean_text=item["clean_text"],
+                    skills=all_detected,
+                    name=sections["name"],
+                    email=sections["email"],
+                    phone=sections["phone"],
+                    education=sections["education"],
+                    experience=sections["experience"],
+                    projects=sections["projects"],
+                    embedding=resume_embs[r_idx],
+                    wait=False,
+                    checkpoint=(self.run_key, path, "")
+                )
+            parsed.append((path, name, detected, pending))
+
+        # Pass 2: score the missing JDs, queue results with the real resume ids
+        for r_idx, (path, name, detected, pending) in enumerate(parsed):
+            resume_id = pending.result() if hasattr(pending, "result") else pending
+
+            for j_idx, jd in enumerate(self.jds):
+                if (path, jd["file"]) in self.finished:
+                    continue
+
+                skills = detected[jd["file"]]
+                sim = float(sims[r_idx, j_idx])
+                score = self.scoring_engine.calculate_final_score(sim, skills, jd["skills"])
+
+                # Written before a crash that beat the output append → not again
+                if self.save_to_db and (path, jd["file"]) not in self.checkpoints:
+                    save_result(
+                        resume_id=resume_id,
+                        jd_id=jd["id"],
+                        semantic_score=sim,
+                        final_score=score,
+                        wait=False,
+                        checkpoint=(self.run_key, path, jd["file"])
+                    )
+
+                rows.append({
+                    "resume_file": path,
+                    "resume_name": name,
+                    "jd_file": jd["file"],
+                    "jd_role": jd["role"],
+                    "semantic_score": round(sim, 4),
+                    "final_score": score,
+                    "matched_skills": ",".join(skills),
+                    "resume_id": resume_id,
+                    "jd_id": jd["id"],
+                    "error": "",
+                })
+
+        # DB first, then the output file (the output is the checkpoint)
+        if self.save_to_db:
+            flush()
+
+        return rows
+
+    @staticmethod
+    def _error_row(path, jd, error):
+        return {
+            "resume_file": path,
+            "resume_name": os.path.splitext(os.path.basename(path))[0],
+            "jd_file": jd["file"],
+            "jd_role": jd["role"],
+            "semantic_score": "",
+            "final_score": "",
+            "matched_skills": "",
+            "resume_id": "",
+            "jd_id": jd["id"],
+            "error": error,
+        }
+
+    def run(self, resume_patterns, out_path, chunk_size=64):
+        """
+        Streams resumes chunk by chunk and appends rows to out_path.
+        Yields (files_done, rows_written) after each chunk.
+        """
+        self.run_key = os.path.abspath(out_path)
+        self.finished, jd_ids, self.resume_ids = load_finished(out_path)
+        self.checkpoints = get_batch_checkpoints(self.run_key) if self.save_to_db else {}
+
+        # Reuse JD rows from an interrupted run instead of inserting again
+        if self.save_to_db:
+            for jd in self.jds:
+                jd["id"] = (
+                    jd_ids.get(jd["file"])
+                    or self.checkpoints.get(("", jd["file"]))
+                    or save_jd(
+                        raw_jd=jd["raw_text"],
+                        clean_jd=jd["clean_text"],
+                        skills=jd["skills"],
+                        role=jd["role"],
+                        checkpoint=(self.run_key, "", jd["file"])
+                    )
+                )
+
+        todo = (
+            path for path in iter_resume_paths(resume_patterns)
+            if self._missing_jds(path)
+        )
+
+        writer = ResultWriter(out_path)
+        files_done = rows_written = 0
+        try:
+            for paths in chunked(todo, chunk_size):
+                rows = self.score_chunk(paths)
+                writer.write_rows(rows)
+                files_done += len(paths)
+                rows_written += len(rows)
+                yield files_done, rows_written
+        finally:
+            writer.close()
+            self.cache_stats = self.pool.cache_stats()
+            self.pool.close()
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.batch",
+        description="Score a directory (or glob) of resumes against one or more JDs."
+    )
+    parser.add_argument("resumes", nargs="+", help="Resume directories or glob patterns")
+    parser.add_argument("--jd", nargs="+", required=True, help="JD files (.txt/.pdf)")
+    parser.add_argument("--out", default="batch_results.csv", help="Output file (.csv or .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Resumes per pipeline chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction worker processes")
+    parser.add_argument("--no-db", action="store_true", help="Do not write to resume_system.db")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    scorer = BatchScorer(args.jd, save_to_db=not args.no_db, workers=args.workers)
+    for files_done, rows_written in scorer.run(args.resumes, args.out, args.chunk_size):
+        print(f"{files_done} resumes scored, {rows_written} rows written", file=sys.stderr)
+
+    stats = scorer.cache_stats
+    print(f"document cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"(hit ratio {stats['hit_ratio']:.0%}), {stats['entries']} entries", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,27 +15,29 @@ from app.components.sidebar import render_sidebar
 from app.components.upload_section import render_resume_upload, render_jd_upload
 from app.components.result_section import render_results
 
-# SERVICES
-from app.services.resume_parser import ResumeParser
-from app.services.jd_parser import JDParser
-from app.services.embedding_model import EmbeddingModel
-from app.services.similarity_engine import SimilarityEngine
-from app.services.scoring_engine import ScoringEngine
+# SERVICES (built once per process, heavy imports deferred)
+from app.services.scoring_session import ScoringSession
+from app.services.registry import (
+    get_job_workers, get_corpus_search, get_jd_parser, get_embedding_model
+)
+
+# METRICS (per-run stage breakdown)
+from app.utils.metrics import collect
 
 # DATABASE
 from app.utils.database import (
     create_tables,
-    save_resume,
-    save_jd,
-    save_result,
-    get_all_resumes,
-    get_all_jds,
-    get_all_results
+    list_resumes,
+    list_jds,
+    list_results,
+    count_rows,
+    get_resume,
+    open_resume_file,
+    get_jd,
+    get_job,
+    get_job_results
 )
 
-# SECTION PARSER
-from app.utils.section_parser import SectionParser
-
 
 # --------------------------------------------------------
 # STREAMLIT PAGE CONFIG
@@ -48,16 +50,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# --------------------------------------------------------
-# INIT NLP ENGINES
-# --------------------------------------------------------
-resume_parser = ResumeParser()
-jd_parser = JDParser()
-embed_model = EmbeddingModel()
-similarity_engine = SimilarityEngine()
-scoring_engine = ScoringEngine()
-
-
 # ================================================================
 #                      ADMIN LOGIN BLOCK
 # ================================================================
@@ -81,12 +73,39 @@ def admin_login():
 # ================================================================
 #                      ADMIN DASHBOARD
 # ================================================================
+ADMIN_PAGE_SIZE = 50
+
+
+def paginate(key, fetch_page, page_size=ADMIN_PAGE_SIZE):
+    """
+    Keyset pagination controls. Keeps a stack of page cursors in
+    session_state[key] and returns the rows of the current page.
+    """
+    cursors = st.session_state.setdefault(key, [None])
+    rows, next_cursor = fetch_page(limit=page_size, before=cursors[-1])
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if len(cursors) > 1 and st.button("⬅ Previous", key=f"{key}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {len(cursors)}")
+    with col_next:
+        if next_cursor is not None and st.button("Next ➡", key=f"{key}_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+    return rows
+
+
 def admin_dashboard():
     st.title("🔐 Admin Dashboard – Resume ATS")
 
     menu = st.sidebar.radio(
         "Navigate",
-        ["📄 All Resumes", "📝 All Job Descriptions", "📊 Match Results"]
+        ["📄 All Resumes", "📝 All Job Descriptions", "📊 Match Results",
+         "🔎 Search Stored Resumes"]
     )
 
     # -------------------------------------------------------
@@ -94,8 +113,9 @@ def admin_dashboard():
     # -------------------------------------------------------
     if menu == "📄 All Resumes":
         st.header("📄 Uploaded Resumes")
+        st.caption(f"{count_rows('resumes')} resume(s) stored")
 
-        resumes = get_all_resumes()
+        resumes = paginate("resume_page", list_resumes)
 
         if not resumes:
             st.warning("No resumes found.")
@@ -107,10 +127,13 @@ def admin_dashboard():
             "id", "filename", "name", "email", "phone", "uploaded_at"
         ]])
 
-        selected = st.selectbox("Select resume:", df["filename"].tolist())
+        labels = {r["id"]: r["filename"] for r in resumes}
+        selected = st.selectbox(
+            "Select resume:", list(labels), format_func=lambda rid: f"{labels[rid]} (#{rid})"
+        )
 
         if selected:
-            row = next(r for r in resumes if r["filename"] == selected)
+            row = get_resume(selected)
 
             st.subheader(f"📝 Resume: {row['filename']}")
 
@@ -135,19 +158,29 @@ def admin_dashboard():
             st.write("### 📜 Cleaned Resume Text")
             st.write(row["clean_text"])
 
-            st.download_button(
-                "⬇ Download Resume",
-                data=row["filedata"],
-                file_name=row["filename"] + ".pdf"
-            )
+            # File is only read when the admin asks for it, not on every
+            # rerun of the page (st.download_button reads the whole file
+            # into memory; Streamlit has no streaming download)
+            if st.button("📥 Prepare Download", key=f"prepare_{selected}"):
+                filename, stream = open_resume_file(selected)
+                if stream is None:
+                    st.warning("Original file not found.")
+                else:
+                    with stream:
+                        st.download_button(
+                            "⬇ Download Resume",
+                            data=stream,
+                            file_name=filename + ".pdf"
+                        )
 
     # -------------------------------------------------------
     # 2) ALL JOB DESCRIPTIONS
     # -------------------------------------------------------
     elif menu == "📝 All Job Descriptions":
         st.header("📝 Uploaded Job Descriptions")
+        st.caption(f"{count_rows('job_descriptions')} job description(s) stored")
 
-        jds = get_all_jds()
+        jds = paginate("jd_page", list_jds)
 
         if not jds:
             st.warning("No job descriptions found.")
@@ -159,7 +192,7 @@ def admin_dashboard():
         jd_selected = st.selectbox("Select JD:", df["id"].tolist())
 
         if jd_selected:
-            row = next(j for j in jds if j["id"] == jd_selected)
+            row = get_jd(jd_selected)
 
             st.subheader("📄 Raw JD")
             st.write(row["raw_jd"])
@@ -178,8 +211,9 @@ def admin_dashboard():
     # -------------------------------------------------------
     elif menu == "📊 Match Results":
         st.header("📊 Resume–JD Match Results")
+        st.caption(f"{count_rows('results')} result(s) stored")
 
-        results = get_all_results()
+        results = paginate("result_page", list_results)
 
         if not results:
             st.warning("No match results found.")
@@ -191,6 +225,86 @@ def admin_dashboard():
         st.subheader("📈 Final Score Distribution")
         st.bar_chart(df["final_score"])
 
+    # -------------------------------------------------------
+    # 4) SEARCH STORED RESUMES (whole corpus, not one upload)
+    # -------------------------------------------------------
+    elif menu == "🔎 Search Stored Resumes":
+        st.header("🔎 Search Stored Resumes")
+        st.caption(f"{count_rows('resumes')} resume(s) stored")
+
+        jd_text = st.text_area("Paste a Job Description")
+        top_k = st.slider("Top candidates", 5, 100, 20)
+
+        if st.button("Search") and jd_text.strip():
+            jd_info = get_jd_parser().process_jd(jd_text)
+            jd_emb = get_embedding_model().encode_document(jd_info["clean_text"])
+            hits = get_corpus_search().search(jd_emb, jd_info["skills"], top_k,
+                                              jd_text=jd_info["clean_text"])
+
+            if not hits:
+                st.warning("No stored resumes with embeddings yet.")
+                return
+
+            df = pd.DataFrame(hits)
+            df["matched_skills"] = df["matched_skills"].apply(", ".join)
+            st.dataframe(df[[
+                "resume_id", "filename", "name", "email",
+                "semantic_score", "lexical_score", "matched_skills", "final_score"
+            ]])
+
+
+# ================================================================
+#                      BACKGROUND JOBS (large uploads)
+# ================================================================
+BACKGROUND_MIN_FILES = 20
+JOB_POLL_SECONDS = 1.5
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_job_progress(job_id):
+    """
+    Progress of a running job. Only this fragment reruns on the poll
+    timer (no sleep, no re-hashing the uploads); one full rerun when the
+    job is over renders the results.
+    """
+    job = get_job(job_id)
+    if job["status"] not in ("queued", "running"):
+        st.rerun()
+
+    st.info(f"⏳ Scoring in the background (job #{job_id}) — you can keep using the app.")
+    st.progress(job["progress"])
+    st.caption(f"{job['done']} scored · {job['failed']} failed · {job['queued']} pending "
+               f"of {job['total']}")
+
+
+def render_background_job(session, resumes, jd_raw_text):
+    """Queues the upload once, shows progress, renders results when done."""
+    get_job_workers()
+    job_id = session.submit(resumes, jd_raw_text)
+    job = get_job(job_id)
+
+    if job["status"] in ("queued", "running"):
+        render_job_progress(job_id)
+        return
+
+    if job["status"] == "failed":
+        st.error(f"Job #{job_id} failed: {job['error']}")
+        return
+
+    items = get_job_results(job_id)
+    for item in items:
+        if item["status"] == "failed":
+            st.warning(f"⚠ Could not read {item['filename']}: {item['error']}")
+
+    scored = [item for item in items if item["status"] == "done"]
+    jd = session.set_jd(jd_raw_text)
+    render_results(
+        [item["clean_text"] or "" for item in scored],
+        [item["final_score"] for item in scored],
+        jd["clean_text"],
+        [os.path.splitext(item["filename"])[0] for item in scored]
+    )
+
 
 # ================================================================
 #                      USER PANEL (NORMAL USERS)
@@ -201,6 +315,9 @@ def user_panel():
 
     create_tables()
 
+    # Per-session incremental state (parsed / embedded / saved artifacts)
+    session = st.session_state.setdefault("scoring_session", ScoringSession())
+
     tab1, tab2, tab3 = st.tabs([
         "📤 Upload Resumes",
         "📝 Upload Job Description",
@@ -219,18 +336,6 @@ def user_panel():
     with tab2:
         render_jd_upload()
 
-        if "jd_text" in st.session_state:
-            try:
-                jd_info = jd_parser.process_jd(st.session_state["jd_text"])
-                save_jd(
-                    raw_jd=st.session_state["jd_text"],
-                    clean_jd=jd_info["clean_text"],
-                    skills=jd_info["skills"],
-                    role=jd_info["role"]
-                )
-            except:
-                pass
-
     # -----------------------------------------------
     # TAB 3 → MATCH RESULTS
     # -----------------------------------------------
@@ -245,56 +350,33 @@ def user_panel():
         resumes = st.session_state["resume_files"]
         jd_raw_text = st.session_state["jd_text"]
 
-        jd_info = jd_parser.process_jd(jd_raw_text)
-        jd_clean = jd_info["clean_text"]
-        jd_skills = jd_info["skills"]
-        jd_emb = embed_model.get_embedding(jd_clean)
-
-        resume_texts = []
-        resume_names = []
-        resume_skills_list = []
-
-        for file in resumes:
-            name = os.path.splitext(file.name)[0]
-            resume_names.append(name)
-
-            raw_text, clean_text = resume_parser.get_resume_text(file)
-            resume_texts.append(clean_text)
-
-            sections = SectionParser.get_sections(raw_text)
-
-            detected = [s for s in jd_skills if s in clean_text]
-            resume_skills_list.append(detected)
-
-            save_resume(
-                filename=name,
-                filedata=file.read(),
-                clean_text=clean_text,
-                skills=detected,
-                name=sections["name"],
-                email=sections["email"],
-                phone=sections["phone"],
-                education=sections["education"],
-                experience=sections["experience"],
-                projects=sections["projects"]
-            )
-
-        resume_embs = embed_model.get_batch_embeddings(resume_texts)
-
-        final_scores = []
-        for emb, skills in zip(resume_embs, resume_skills_list):
-            sim = similarity_engine.calculate_similarity(emb, jd_emb)
-            score = scoring_engine.calculate_final_score(sim, skills, jd_skills)
-            final_scores.append(score)
-
-            save_result(
-                resume_id=1,
-                jd_id=1,
-                semantic_score=sim,
-                final_score=score
-            )
-
-        render_results(resume_texts, final_scores, jd_clean, resume_names)
+        # Big batches → worker processes; the session stays responsive
+        if len(resumes) >= BACKGROUND_MIN_FILES:
+            render_background_job(session, resumes, jd_raw_text)
+            return
+
+        # Only new uploads are extracted / embedded / saved;
+        # only new (resume, JD) pairs are scored
+        with collect() as run:
+            scored, scores = session.score(resumes, jd_raw_text)
+
+        for filename, error in session.errors(resumes):
+            st.warning(f"⚠ Could not read {filename}: {error}")
+
+        jd = session.set_jd(jd_raw_text)
+        render_results(
+            [r["clean_text"] for r in scored],
+            [s["final_score"] for s in scores],
+            jd["clean_text"],
+            [r["name"] for r in scored]
+        )
+
+        with st.expander("⏱ Processing Breakdown (this run)"):
+            rows = run.rows()
+            if rows:
+                st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            else:
+                st.caption("Nothing recomputed — every result came from this session's cache.")
 
 
 # ================================================================
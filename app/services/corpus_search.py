@@ -0,0 +1,167 @@
+# FILE: app/services/corpus_search.py
+"""
+JD search over every stored resume (not just the current upload).
+
+The semantic stage is an index over resume_embeddings, picked with
+ATS_CORPUS_INDEX:
+- ivf (default)    IVF cells, trained once the corpus is big enough
+                   (app/services/resume_index.py)
+- int8 | float16   compact quantized scan + float32 re-rank
+                   (app/services/embedding_store.py)
+Either picks up resumes saved (and drops resumes deleted) since the
+last query on every search.
+
+With ATS_SHORTLIST_SIZE set, the first stage is lexical instead: the
+persisted BM25 index (app/services/lexical_index.py) picks that many
+stored resumes for the JD text, and only those are scored against
+their stored vectors (hybrid score, as for uploads).
+Hits are scored like uploads (semantic + skill match).
+
+    python -m app.services.corpus_search jd.txt --top 20
+    python -m app.services.corpus_search --build          # retrain cells
+"""
+
+import argparse
+import os
+import threading
+
+import numpy as np
+
+from app.services.lexical_index import LexicalIndex, SHORTLIST_SIZE
+from app.services.resume_index import ResumeIndex, MIN_TRAIN_SIZE
+from app.utils.database import get_resumes_by_ids, get_embeddings_by_ids
+from app.utils.metrics import span
+
+# Results returned per JD
+DEFAULT_TOP_K = 20
+
+# Semantic index over the stored vectors: ivf | int8 | float16
+CORPUS_INDEX = os.environ.get("ATS_CORPUS_INDEX", "ivf")
+
+
+def load_index(kind=CORPUS_INDEX):
+    """The configured corpus index (ResumeIndex or QuantizedEmbeddingStore)."""
+    if kind == "ivf":
+        return ResumeIndex()
+    if kind in ("int8", "float16"):
+        from app.services.embedding_store import QuantizedEmbeddingStore
+        return QuantizedEmbeddingStore(dtype=kind)
+    raise ValueError(f"unknown corpus index: {kind} (choose from ivf, int8, float16)")
+
+
+class CorpusSearch:
+    def __init__(self, index=None, shortlist_size=SHORTLIST_SIZE):
+        """Stored-resume retrieval; one per process (see registry)."""
+        self.index = index if index is not None else load_index()
+        self.shortlist_size = shortlist_size
+        self.lexical = None             # LexicalIndex, loaded on first lexical search
+        self._lock = threading.Lock()   # refresh / training mutate the indexes
+
+    def __len__(self):
+        return len(self.index)
+
+    def build(self):
+        """(Re)trains the index over everything stored."""
+        with self._lock:
+            self.index.refresh()
+            return self.index.build()
+
+    def _lexical_hits(self, jd_embedding, jd_text):
+        """
+        BM25 shortlist of stored resumes, then cosine against their
+        stored vectors → ([(resume_id, sim or None)], {resume_id: bm25}).
+        """
+        with self._lock:
+            if self.lexical is None:
+                self.lexical = LexicalIndex()
+            lexical = dict(self.lexical.shortlist(jd_text, self.shortlist_size))
+
+        q = np.asarray(jd_embedding, dtype=np.float32).ravel()
+        q = q / (np.linalg.norm(q) or 1.0)
+
+        vectors = get_embeddings_by_ids(list(lexical))
+        hits = []
+        for resume_id in lexical:
+            vec = vectors.get(resume_id)
+            if vec is None or vec.size != q.size:
+                hits.append((resume_id, None))   # not embedded (by this model) → lexical share only
+                continue
+            sim = float(vec @ q) / (float(np.linalg.norm(vec)) or 1.0)
+            hits.append((resume_id, max(0.0, min(1.0, sim))))
+        return hits, lexical
+
+    @span("corpus_search")
+    def search(self, jd_embedding, jd_skills=None, k=DEFAULT_TOP_K, jd_text=None):
+        """
+        Top-k stored resumes for a JD embedding, best final score first.
+        With a shortlist size and the JD's clean text, candidates come
+        from the lexical stage (see module docstring).
+        Returns [{resume_id, filename, name, email, semantic_score,
+        lexical_score, matched_skills, final_score}] (lexical_score is
+        None without the lexical stage).
+        """
+        from app.services.registry import get_scoring_engine
+
+        if jd_embedding is None:
+            return []
+
+        lexical = {}
+        if self.shortlist_size > 0 and jd_text:
+            hits, lexical = self._lexical_hits(jd_embedding, jd_text)
+        else:
+            with self._lock:
+                hits = self.index.search(jd_embedding, k)
+                if not self.index.is_trained and len(self.index) >= MIN_TRAIN_SIZE:
+                    self.index.build()   # next query scans cells only
+
+        rows = get_resumes_by_ids([rid for rid, _ in hits])
+        jd_skills = jd_skills or []
+        scoring_engine = get_scoring_engine()
+
+        out = []
+        for resume_id, sim in hits:
+            row = rows.get(resume_id)
+            if row is None:
+                continue   # deleted since it was indexed
+            stored = set((row["skills"] or "").split(","))
+            matched = [s for s in jd_skills if s in stored]
+            out.append({
+                "resume_id": resume_id,
+                "filename": row["filename"],
+                "name": row["name"],
+                "email": row["email"],
+                "semantic_score": round(sim, 4) if sim is not None else None,
+                "lexical_score": lexical.get(resume_id),
+                "matched_skills": matched,
+                "final_score": scoring_engine.calculate_final_score(
+                    sim or 0.0, matched, jd_skills, lexical_value=lexical.get(resume_id)
+                ),
+            })
+
+        out.sort(key=lambda r: r["final_score"], reverse=True)
+        return out[:k]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.services.corpus_search")
+    parser.add_argument("jd", nargs="?", help="JD file (.txt / .pdf)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--build", action="store_true", help="Retrain the index cells first")
+    args = parser.parse_args()
+
+    from app.services.registry import get_jd_parser, get_embedding_model
+
+    search = CorpusSearch()
+    if args.build:
+        trained = search.build()
+        print(f"{len(search)} vectors indexed" + ("" if trained else
+              f" (below {MIN_TRAIN_SIZE} → exact search, not trained)"))
+
+    if args.jd:
+        from app.batch import read_jd_file
+
+        jd = get_jd_parser().process_jd(read_jd_file(args.jd))
+        jd_emb = get_embedding_model().encode_document(jd["clean_text"])
+        for hit in search.search(jd_emb, jd["skills"], args.top, jd_text=jd["clean_text"]):
+            semantic = "-" if hit["semantic_score"] is None else f"{hit['semantic_score']:.4f}"
+            print(f"{hit['resume_id']}\t{hit['final_score']:.2f}\t{semantic}\t{hit['filename']}")
@@ -0,0 +1,344 @@
+# FILE: app/services/embedding_daemon.py
+"""
+Embedding sidecar: one model per host, shared by every app process.
+
+    python -m app.services.embedding_daemon --socket /tmp/ats-embed.sock
+
+    ATS_EMBEDDING_SOCKET=/tmp/ats-embed.sock streamlit run app/main.py
+
+With ATS_EMBEDDING_SOCKET set, EmbeddingModel swaps its encoder for a
+SidecarEncoder: texts go to the daemon over a Unix domain socket, the
+daemon micro-batches them with other clients' texts and writes the
+vectors into a shared-memory block owned by the connection, so only a
+small JSON header crosses the socket. Only an unreachable daemon makes
+the client load the model in-process (and retry the daemon later); a
+busy daemon is waited for with backoff, and a request it answers with
+an error (or still rejects as busy) fails like a local encode error.
+
+Wire format (both directions): 4-byte big-endian length + JSON.
+    → {"texts": [...]}
+    ← {"shm": name, "rows": n, "dim": d}  |  {"error": "...", "busy": bool}
+"busy" → the daemon's queue is full; retry shortly.
+The daemon must run the same model / ATS_EMBEDDING_BACKEND as its
+clients (the embedding cache namespace is computed client-side).
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.utils.logger import log_warning
+from app.utils.metrics import span, inc
+
+SOCKET_PATH = os.environ.get("ATS_EMBEDDING_SOCKET", "")
+
+# Client: socket timeout per request / wait before re-trying a dead daemon
+REQUEST_TIMEOUT = 60.0
+RETRY_SECONDS = 30.0
+
+# Texts waiting in the daemon across all clients before it answers "busy"
+DAEMON_MAX_QUEUED = int(os.environ.get("ATS_EMBEDDING_DAEMON_QUEUE", "8192"))
+
+# Client: total wait for a busy daemon (backoff doubles from BUSY_BACKOFF
+# up to BUSY_MAX_BACKOFF seconds); once exceeded, requests fail fast for
+# BUSY_MAX_BACKOFF seconds instead of each waiting again
+BUSY_WAIT_SECONDS = float(os.environ.get("ATS_EMBEDDING_BUSY_WAIT", "10"))
+BUSY_BACKOFF = 0.05
+BUSY_MAX_BACKOFF = 1.0
+
+# Largest request header accepted (texts are sent as JSON)
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+
+# ------------------------------------------------------------
+# Framing
+# ------------------------------------------------------------
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def send_message(sock, obj):
+    data = json.dumps(obj).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock):
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if length > MAX_MESSAGE_BYTES:
+        raise ValueError(f"message of {length} bytes exceeds limit")
+    return json.loads(_recv_exact(sock, length))
+
+
+def attach_segment(name):
+    """
+    Opens a daemon-owned shared-memory block without letting this
+    process's resource tracker claim it (it would unlink the daemon's
+    block when this process exits).
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister("/" + shm.name, "shared_memory")
+    return shm
+
+
+class DaemonBusy(RuntimeError):
+    """The daemon's queue is full; the request may be retried."""
+
+
+# ------------------------------------------------------------
+# Daemon
+# ------------------------------------------------------------
+class _Connection(socketserver.BaseRequestHandler):
+    """One client connection → one reusable shared-memory block."""
+
+    def setup(self):
+        self.shm = None
+
+    def _buffer(self, nbytes):
+        if self.shm is None or self.shm.size < nbytes:
+            if self.shm is not None:
+                self.shm.close()
+                self.shm.unlink()
+            # Grow geometrically → few re-allocations per connection
+            size = max(nbytes, 2 * self.shm.size if self.shm is not None else 1 << 20)
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        return self.shm
+
+    def handle(self):
+        from app.services.micro_batcher import Overloaded
+
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            try:
+                texts = request.get("texts") or []
+                vectors = np.asarray(self.server.batcher.submit(texts).result(), dtype=np.float32)
+                if vectors.ndim != 2 or len(vectors) != len(texts):
+                    raise RuntimeError("embedding failed")
+
+                shm = self._buffer(vectors.nbytes)
+                np.ndarray(vectors.shape, dtype=np.float32, buffer=shm.buf)[:] = vectors
+                reply = {"shm": shm.name, "rows": vectors.shape[0], "dim": vectors.shape[1]}
+                inc("sidecar_texts_encoded", len(texts))
+            except Overloaded as e:
+                reply = {"error": str(e), "busy": True}
+            except Exception as e:
+                reply = {"error": f"{type(e).__name__}: {e}"}
+
+            try:
+                send_message(self.request, reply)
+            except OSError:
+                return
+
+    def finish(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+
+
+class EmbeddingDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, model=None):
+        """Serves `model` (default: a freshly loaded in-process EmbeddingModel)."""
+        from app.services.embedding_model import EmbeddingModel, plan_batches
+        from app.services.micro_batcher import MicroBatcher
+
+        self.model = model or EmbeddingModel(cache_path=None, sidecar=None)
+        self.model.warmup()
+
+        def encode(texts):
+            # Clients' batches are merged here → re-plan against the token budget
+            out = np.empty((len(texts), 0), dtype=np.float32)
+            for batch in plan_batches(self.model.token_lengths(texts)):
+                vectors = self.model.model.encode(
+                    [texts[i] for i in batch], convert_to_numpy=True,
+                    batch_size=len(batch), device=self.model.device
+                )
+                if out.shape[1] == 0:
+                    out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+                out[batch] = vectors
+            return out
+
+        self.batcher = MicroBatcher(encode, max_queued=DAEMON_MAX_QUEUED, name="daemon")
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)   # stale socket of a previous run
+        super().__init__(socket_path, _Connection)
+
+
+def serve(socket_path=SOCKET_PATH or "/tmp/ats-embed.sock"):
+    server = EmbeddingDaemon(socket_path)
+    print(f"Embedding daemon ({server.model.model_name}, {server.model.backend}) on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+# ------------------------------------------------------------
+# Client
+# ------------------------------------------------------------
+class _ClientConnection:
+    def __init__(self, socket_path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(REQUEST_TIMEOUT)
+        self.sock.connect(socket_path)
+        self.shm = None
+
+    def encode(self, texts):
+        send_message(self.sock, {"texts": texts})
+        reply = recv_message(self.sock)
+        if "error" in reply:
+            raise (DaemonBusy if reply.get("busy") else RuntimeError)(reply["error"])
+
+        if self.shm is None or self.shm.name != reply["shm"]:
+            if self.shm is not None:
+                self.shm.close()
+            self.shm = attach_segment(reply["shm"])
+
+        # Copy out: the block is overwritten by this connection's next request
+        shape = (reply["rows"], reply["dim"])
+        return np.ndarray(shape, dtype=np.float32, buffer=self.shm.buf).copy()
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+        self.sock.close()
+
+
+class SidecarEncoder:
+    name = "sidecar"
+
+    def __init__(self, socket_path, fallback_factory, tokenizer=None, max_seq_length=None):
+        """
+        SentenceTransformer.encode()-compatible client of the daemon.
+        fallback_factory() builds the in-process encoder, only when the
+        daemon is first found unreachable.
+        """
+        self.socket_path = socket_path
+        self.fallback_factory = fallback_factory
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+
+        self._idle = []                 # pooled connections (one per concurrent caller)
+        self._lock = threading.Lock()
+        self._fallback_lock = threading.Lock()
+        self._fallback = None
+        self._down_until = 0.0
+        self._busy_until = 0.0
+
+    def _fallback_encoder(self):
+        with self._fallback_lock:
+            if self._fallback is None:
+                self._fallback = self.fallback_factory()
+                if self.tokenizer is None:
+                    self.tokenizer = getattr(self._fallback, "tokenizer", None)
+            return self._fallback
+
+    @span("sidecar_request")
+    def _remote(self, texts):
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = _ClientConnection(self.socket_path)
+
+        try:
+            vectors = conn.encode(texts)
+        except RuntimeError:
+            with self._lock:
+                self._idle.append(conn)   # daemon answered → connection still fine
+            raise
+        except Exception:
+            conn.close()
+            raise
+
+        with self._lock:
+            self._idle.append(conn)
+        return vectors
+
+    def _remote_with_retry(self, texts):
+        """
+        _remote(), waiting out a busy daemon with a doubling backoff
+        for up to BUSY_WAIT_SECONDS → DaemonBusy after that.
+        """
+        if time.monotonic() < self._busy_until:
+            raise DaemonBusy("embedding daemon busy")
+
+        deadline = time.monotonic() + BUSY_WAIT_SECONDS
+        delay = BUSY_BACKOFF
+        while True:
+            try:
+                return self._remote(texts)
+            except DaemonBusy:
+                inc("sidecar_busy_retries")
+                if time.monotonic() + delay > deadline:
+                    self._busy_until = time.monotonic() + BUSY_MAX_BACKOFF
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, BUSY_MAX_BACKOFF)
+
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        if time.monotonic() >= self._down_until:
+            try:
+                vectors = self._remote_with_retry(texts)
+                return vectors[0] if single else vectors
+            except RuntimeError:
+                # Daemon is up but could not serve this request (busy / failed):
+                # loading a second model here would only add to the load
+                inc("sidecar_remote_errors")
+                raise
+            except (OSError, ConnectionError, ValueError) as e:
+                self._down_until = time.monotonic() + RETRY_SECONDS
+                inc("sidecar_fallbacks")
+                log_warning(f"embedding daemon at {self.socket_path} unavailable ({e}); "
+                            f"encoding in-process for {RETRY_SECONDS:.0f}s")
+
+        return self._fallback_encoder().encode(sentences, **kwargs)
+
+
+def load_tokenizer(model_path):
+    """Tokenizer only (chunking / token budgets) — no model weights."""
+    try:
+        from transformers import AutoTokenizer
+        from app.services.inference_backends import is_local_snapshot
+        return AutoTokenizer.from_pretrained(model_path, local_files_only=is_local_snapshot(model_path))
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.services.embedding_daemon")
+    parser.add_argument("--socket", default=SOCKET_PATH or "/tmp/ats-embed.sock")
+    args = parser.parse_args()
+    serve(args.socket)
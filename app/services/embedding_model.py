@@ -1,28 +1,170 @@
 # FILE: app/services/embedding_model.py
 
-from sentence_transformers import SentenceTransformer
-import torch
+import os
+import numpy as np
+
+from app.utils.constants import CHUNKED_EMBEDDINGS, CHUNK_POOLING
+from app.utils.embedding_cache import EmbeddingCache, EMBEDDING_CACHE_PATH
+from app.utils.logger import log_warning
+from app.utils.metrics import span, inc
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Local snapshot (README layout: models/sbert) → no hub lookup at startup
+LOCAL_MODEL_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "models", "sbert"
+)
+
+# all-MiniLM-L6-v2 truncates input here
+MAX_SEQ_LENGTH = 256
+
+# Dynamic batching: padded tokens per forward pass / hard cap on batch size
+TOKEN_BUDGET = 8192
+MAX_BATCH_SIZE = 128
+
+# Torch CPU threads (0 → torch default); env overrides for ops tuning
+INTRA_OP_THREADS = int(os.environ.get("ATS_TORCH_THREADS", "0"))
+INTER_OP_THREADS = int(os.environ.get("ATS_TORCH_INTEROP_THREADS", "0"))
+
+# Inference backend: torch (eager reference) | onnx | torchscript
+EMBEDDING_BACKEND = os.environ.get("ATS_EMBEDDING_BACKEND", "torch")
+EMBEDDING_INT8 = os.environ.get("ATS_EMBEDDING_INT8", "0") == "1"
+
+# Check a non-torch backend against the torch reference on first load
+VALIDATE_BACKEND = os.environ.get("ATS_EMBEDDING_VALIDATE", "1") == "1"
+
+# Unix socket of a shared embedding daemon (app/services/embedding_daemon.py)
+EMBEDDING_SOCKET = os.environ.get("ATS_EMBEDDING_SOCKET", "")
+
+# Chunked mode: word-pieces shared by consecutive windows
+CHUNK_OVERLAP = 32
+
+
+def plan_batches(lengths, token_budget=TOKEN_BUDGET, max_batch=MAX_BATCH_SIZE):
+    """
+    Groups item indices into batches, longest first.
+    A batch grows while (items x longest item) stays within the token
+    budget → short texts travel in big batches, long ones in small
+    batches, and padding stays minimal.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+
+    batches, batch = [], []
+    for idx in order:
+        longest = max(lengths[batch[0]] if batch else lengths[idx], 1)
+        if batch and (len(batch) >= max_batch or (len(batch) + 1) * longest > token_budget):
+            batches.append(batch)
+            batch = []
+        batch.append(idx)
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def resolve_model_path(model_name=MODEL_NAME, local_dir=LOCAL_MODEL_DIR):
+    """Local snapshot if present, otherwise the hub name."""
+    if local_dir and os.path.isfile(os.path.join(local_dir, "config.json")):
+        return local_dir
+    return model_name
+
 
 class EmbeddingModel:
-    def __init__(self):
+    def __init__(self, model_name=MODEL_NAME, cache_path=EMBEDDING_CACHE_PATH,
+                 local_dir=LOCAL_MODEL_DIR, backend=EMBEDDING_BACKEND, quantize=EMBEDDING_INT8,
+                 sidecar=EMBEDDING_SOCKET):
+        """
+        Loads the SBERT model on the configured inference backend with
+        automatic device selection (CPU/GPU for torch, CPU for exported
+        graphs). Also initializes a two-tier (memory LRU + SQLite)
+        embedding cache so repeated texts are never re-encoded, even
+        across restarts.
+        With `sidecar` (a Unix socket path) only the tokenizer is loaded;
+        encoding goes to the shared embedding daemon, with the model
+        loaded in-process only if the daemon is unreachable.
+        """
+        self.model_name = model_name
+        self.model_path = resolve_model_path(model_name, local_dir)
+        self.backend = backend
+        self.quantize = quantize and backend != "torch"
+
+        self.device = "cpu"
+        if not isinstance(backend, str):
+            # Ready-made encoder object (e.g. benchmark stub)
+            self.backend = backend.name
+        elif backend != "onnx" and not sidecar:
+            import torch
+            if backend == "torch" and torch.cuda.is_available():
+                self.device = "cuda"
+
+        # Every backend mimics SentenceTransformer.encode()
+        if not isinstance(backend, str):
+            self.model = backend
+        elif sidecar:
+            from app.services.embedding_daemon import SidecarEncoder, load_tokenizer
+            self.model = SidecarEncoder(
+                sidecar,
+                fallback_factory=self._load_local,
+                tokenizer=load_tokenizer(self.model_path),
+                max_seq_length=MAX_SEQ_LENGTH
+            )
+        else:
+            self.model = self._load_local()
+
+        # Cache for repeated text (boosts speed); keyed by model name so
+        # hub and local snapshot share entries. Non-reference backends get
+        # their own namespace (their vectors differ slightly).
+        namespace = model_name
+        if self.backend != "torch":
+            namespace = f"{model_name}@{self.backend}{'-int8' if self.quantize else ''}"
+        self.cache = EmbeddingCache(namespace, path=cache_path)
+
+    def _load_local(self):
         """
-        Loads the SBERT model with automatic device selection (CPU/GPU).
-        Also initializes a cache dictionary to avoid recomputing embeddings.
+        In-process encoder for the configured backend. A non-torch
+        backend that disagrees with the torch reference (see
+        inference_backends.check_backend) is replaced by torch.
         """
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Heavy imports deferred until a model is actually built
+        from app.services.inference_backends import load_backend, check_backend
 
-        # Load SBERT (fast + accurate + lightweight)
-        self.model = SentenceTransformer(
-            "sentence-transformers/all-MiniLM-L6-v2",
-            device=self.device
+        if self.backend != "onnx" and self.device == "cpu":
+            import torch
+            configure_threads(torch)
+
+        model = load_backend(
+            self.backend,
+            self.model_path,
+            device=self.device,
+            quantize=self.quantize,
+            intra_op_threads=INTRA_OP_THREADS
         )
+        if self.backend == "torch" or not VALIDATE_BACKEND:
+            return model
+
+        try:
+            report = check_backend(model, self.model_path, self.quantize)
+        except ImportError as e:
+            log_warning(f"{self.backend} backend not validated (no torch reference: {e})")
+            return model
+        if report["passed"]:
+            return model
 
-        # Cache for repeated text (boosts speed)
-        self.cache = {}
+        inc("backend_validation_failures")
+        log_warning(f"{self.backend}{' int8' if self.quantize else ''} backend disagrees with torch "
+                    f"(min cosine {report['min_cosine']}); using torch instead")
+        self.backend, self.quantize = "torch", False
+        return load_backend("torch", self.model_path, device=self.device)
+
+    def warmup(self):
+        """One tiny encode → first real request skips lazy kernel init."""
+        self.model.encode("warmup", convert_to_numpy=True, device=self.device)
 
     # ----------------------------------------------------------
     # Single sentence embedding
     # ----------------------------------------------------------
+    @span("embed")
     def get_embedding(self, text: str):
         """
         Returns embedding for a single text input.
@@ -32,8 +174,11 @@ class EmbeddingModel:
             return None
 
         # Cache hit
-        if text in self.cache:
-            return self.cache[text]
+        emb = self.cache.get(text)
+        if emb is not None:
+            inc("embedding_cache_hits")
+            return emb
+        inc("embedding_cache_misses")
 
         try:
             emb = self.model.encode(
@@ -41,7 +186,7 @@ class EmbeddingModel:
                 convert_to_numpy=True,
                 device=self.device
             )
-            self.cache[text] = emb
+            self.cache.put(text, emb)
             return emb
         except Exception:
             return None
@@ -49,18 +194,239 @@ class EmbeddingModel:
     # ----------------------------------------------------------
     # Batch Embeddings (FAST for multi-resume)
     # ----------------------------------------------------------
-    def get_batch_embeddings(self, text_list):
+    @span("embed")
+    def get_batch_embeddings(self, text_list, lengths=None):
         """
         Generates embeddings for multiple texts at once.
-        Much faster than single encoding.
+        Only texts missing from the cache are sent to the model, in
+        length-sorted, token-budgeted batches; output keeps input order.
+        Returns one vector per text, None for a text that could not be
+        encoded (it never fails the whole batch). `lengths` are known
+        word-piece counts used for batch planning (else estimated).
         """
+        if not text_list:
+            return []
+
+        texts = [t if isinstance(t, str) else "" for t in text_list]
         try:
-            embeddings = self.model.encode(
-                text_list,
-                convert_to_numpy=True,
-                batch_size=16,
-                device=self.device
-            )
-            return embeddings
+            embeddings = self.cache.get_many(texts)
         except Exception:
+            embeddings = [None] * len(texts)
+
+        # Encode each unseen text once (duplicates share the result)
+        missing = list(dict.fromkeys(
+            t for t, emb in zip(texts, embeddings) if emb is None
+        ))
+
+        known = dict(zip(texts, lengths)) if lengths is not None else {}
+        fresh = self._encode_batched(missing, [known.get(t) for t in missing]) if missing else {}
+        if fresh:
+            self.cache.put_many(list(fresh), list(fresh.values()))
+
+        inc("embedding_cache_hits", len(texts) - sum(1 for e in embeddings if e is None))
+        inc("embedding_cache_misses", len(missing))
+        inc("embedding_failures", len(missing) - len(fresh))
+
+        return [emb if emb is not None else fresh.get(t) for t, emb in zip(texts, embeddings)]
+
+    def token_lengths(self, texts):
+        """
+        Estimated word-piece count per text (capped at the model limit).
+        Only plans batches, so no tokenizer pass: encode() tokenizes anyway.
+        """
+        max_len = getattr(self.model, "max_seq_length", None) or MAX_SEQ_LENGTH
+        return [min(max_len, int(len(t.split()) * 1.3) + 2) for t in texts]
+
+    def _encode_batched(self, texts, lengths=None):
+        """
+        Encodes distinct texts → {text: vector}.
+        A failing batch is retried item by item; items that still fail
+        are left out (and logged).
+        """
+        estimated = self.token_lengths(texts)
+        if lengths is not None:
+            estimated = [n if n is not None else e for n, e in zip(lengths, estimated)]
+
+        out = {}
+        for batch in plan_batches(estimated):
+            batch_texts = [texts[i] for i in batch]
+            try:
+                encoded = self.model.encode(
+                    batch_texts,
+                    convert_to_numpy=True,
+                    batch_size=len(batch_texts),
+                    device=self.device
+                )
+                out.update(zip(batch_texts, encoded))
+                continue
+            except Exception:
+                pass
+
+            for text in batch_texts:
+                try:
+                    out[text] = self.model.encode(text, convert_to_numpy=True, device=self.device)
+                except Exception as e:
+                    log_warning(f"embedding failed for text of {len(text)} chars: {e}")
+
+        return out
+
+    # ----------------------------------------------------------
+    # Chunked long-document embeddings
+    # ----------------------------------------------------------
+    def split_into_chunks(self, text: str, window=None, overlap=CHUNK_OVERLAP):
+        """
+        Splits text into overlapping windows of <= `window` word-pieces
+        (default: the model's max_seq_length minus special tokens), so
+        nothing past the model limit is silently dropped.
+        Returns [(chunk_text, n_tokens), ...].
+        """
+        if not text or not isinstance(text, str):
             return []
+
+        max_len = getattr(self.model, "max_seq_length", None) or MAX_SEQ_LENGTH
+        window = window or max(8, max_len - 2)
+        overlap = min(overlap, window // 2)
+        step = window - overlap
+        tokenizer = getattr(self.model, "tokenizer", None)
+
+        if tokenizer is None:
+            # No word-piece tokenizer → approximate with words
+            words = text.split()
+            return [(" ".join(words[i:i + window]), len(words[i:i + window]))
+                    for i in range(0, max(1, len(words) - overlap), step)]
+
+        ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+        chunks = []
+        for start in range(0, max(1, len(ids) - overlap), step):
+            piece = ids[start:start + window]
+            chunks.append((tokenizer.decode(piece), len(piece)))
+        return chunks
+
+    def embed_documents(self, texts, pooling="mean", window=None, overlap=CHUNK_OVERLAP):
+        """
+        Chunked embeddings for many documents.
+        Windows from ALL documents are encoded together, sorted by length
+        (length bucketing → minimal padding), each window through the cache.
+        Returns one dict per text:
+            {"embedding": pooled vector, "chunks": [chunk texts],
+             "chunk_embeddings": (n_chunks x d) matrix}
+        Per-chunk vectors are kept so section-level scoring can reuse them.
+        """
+        per_doc = [self.split_into_chunks(t, window, overlap) for t in texts]
+
+        flat = [(doc_idx, chunk, n_tok)
+                for doc_idx, chunks in enumerate(per_doc)
+                for chunk, n_tok in chunks]
+        if not flat:
+            return [{"embedding": None, "chunks": [], "chunk_embeddings": None} for _ in texts]
+
+        # Length bucketing: similar lengths share a batch (token counts
+        # are already known here → the tokenizer is not run again)
+        order = sorted(range(len(flat)), key=lambda i: flat[i][2])
+        encoded = self.get_batch_embeddings([flat[i][1] for i in order],
+                                            lengths=[flat[i][2] + 2 for i in order])
+
+        vectors = [None] * len(flat)
+        for i, vec in zip(order, encoded):
+            vectors[i] = vec
+
+        results = []
+        pos = 0
+        for chunks in per_doc:
+            # Chunks that failed to encode are left out of the pool
+            kept = [(chunk, n_tok, vec) for (chunk, n_tok), vec in zip(chunks, vectors[pos:pos + len(chunks)])
+                    if vec is not None]
+            pos += len(chunks)
+            if not kept:
+                results.append({"embedding": None, "chunks": [], "chunk_embeddings": None})
+                continue
+
+            chunk_vecs = np.vstack([vec for _, _, vec in kept]).astype(np.float32)
+            lengths = np.array([n_tok for _, n_tok, _ in kept], dtype=np.float32)
+            results.append({
+                "embedding": pool_chunks(chunk_vecs, lengths, pooling),
+                "chunks": [c for c, _, _ in kept],
+                "chunk_embeddings": chunk_vecs,
+            })
+
+        return results
+
+    def get_document_embeddings(self, texts, pooling="mean"):
+        """Pooled chunked embedding per text, None where nothing could be encoded."""
+        return [d["embedding"] for d in self.embed_documents(texts, pooling)]
+
+    # ----------------------------------------------------------
+    # Document vectors (resumes AND JDs go through here)
+    # ----------------------------------------------------------
+    def encode_documents(self, texts):
+        """
+        (n x d) document vectors in the configured mode: chunk-pooled
+        when CHUNKED_EMBEDDINGS, whole text otherwise. Resumes and JDs
+        must share this path or their vectors are not comparable.
+        """
+        if CHUNKED_EMBEDDINGS:
+            return self.get_document_embeddings(texts, CHUNK_POOLING)
+        return self.get_batch_embeddings(texts)
+
+    def encode_document(self, text: str):
+        """One document vector (see encode_documents) or None."""
+        if not text or not isinstance(text, str):
+            return None
+        embs = self.encode_documents([text])
+        return embs[0] if len(embs) else None
+
+    def cache_stats(self):
+        """Hit / miss / eviction counters of the embedding cache."""
+        return self.cache.stats()
+
+
+# ----------------------------------------------------------
+# Chunk pooling
+# ----------------------------------------------------------
+def pool_chunks(chunk_vecs, lengths=None, method="mean", temperature=0.1):
+    """
+    Combines per-chunk vectors into one document vector.
+    - mean: token-length weighted mean
+    - max: element-wise max
+    - attention: softmax over each chunk's agreement with the mean
+      (chunks on the document's main topic weigh more)
+    """
+    chunk_vecs = np.asarray(chunk_vecs, dtype=np.float32)
+    if lengths is None:
+        lengths = np.ones(len(chunk_vecs), dtype=np.float32)
+    weights = lengths / lengths.sum()
+
+    if method == "max":
+        return chunk_vecs.max(axis=0)
+
+    mean = weights @ chunk_vecs
+    if method == "mean":
+        return mean
+
+    if method == "attention":
+        norms = np.linalg.norm(chunk_vecs, axis=1) * (np.linalg.norm(mean) or 1.0)
+        norms[norms == 0] = 1.0
+        logits = (chunk_vecs @ mean) / norms / temperature
+        attn = np.exp(logits - logits.max()) * weights
+        attn /= attn.sum()
+        return attn @ chunk_vecs
+
+    raise ValueError(f"unknown pooling method: {method}")
+
+
+# ----------------------------------------------------------
+# CPU thread control
+# ----------------------------------------------------------
+def configure_threads(torch, intra_op=INTRA_OP_THREADS, inter_op=INTER_OP_THREADS):
+    """
+    Applies torch intra-op / inter-op thread counts (0 keeps the default).
+    Inter-op threads can only be set before torch runs parallel work, so
+    a late call is ignored.
+    """
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            pass
@@ -0,0 +1,276 @@
+# FILE: app/services/embedding_store.py
+
+import numpy as np
+
+from app.utils.database import (
+    create_tables, get_resume_embeddings, get_embeddings_by_ids, latest_embedding_dim,
+    get_deleted_resumes, last_deleted_seq
+)
+
+# Rows scored per block (int8 → float32 upcast happens per block only)
+SCORE_CHUNK_SIZE = 16384
+
+# Rows read from the DB per refresh page
+LOAD_PAGE_SIZE = 50000
+
+# Full-precision re-rank pool = k x this factor
+RERANK_FACTOR = 4
+
+
+class QuantizedEmbeddingStore:
+    def __init__(self, dtype="int8", rerank_factor=RERANK_FACTOR, load=True, dim=None):
+        """
+        Compact in-RAM copy of the stored resume embeddings.
+        - int8: one byte per dimension + one float32 scale per vector
+        - float16: two bytes per dimension
+        A JD is scored against the compact matrix first; only the top
+        k x rerank_factor candidates are re-scored with the float32
+        vectors from the DB (resume_embeddings stays the source of truth).
+        Same interface as ResumeIndex, so CorpusSearch can use either
+        (ATS_CORPUS_INDEX=int8 | float16). Only vectors of size `dim` are
+        kept (default: the newest stored vector's size).
+        """
+        if dtype not in ("int8", "float16"):
+            raise ValueError(f"unsupported dtype: {dtype}")
+
+        self.dtype = dtype
+        self.rerank_factor = rerank_factor
+        self.dim = dim
+        self._clear()
+
+        if load:
+            create_tables()
+            self.refresh()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _clear(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.codes = None
+        self.scales = np.empty(0, dtype=np.float32)
+        self._last_id = 0
+        self._deleted_seq = None   # set from the DB on the first refresh
+
+    @property
+    def is_trained(self):
+        return True   # nothing to train; always searchable
+
+    def build(self):
+        """Re-quantizes every stored vector from scratch."""
+        self._clear()
+        self.refresh()
+        return True
+
+    def _match_dim(self, query_emb):
+        """A query from another model size → load that model's vectors instead."""
+        dim = np.asarray(query_emb).size
+        if dim != self.dim:
+            self.dim = dim
+            self.build()
+
+    # ----------------------------------------------------------
+    # Quantization
+    # ----------------------------------------------------------
+    @staticmethod
+    def _normalize(mat):
+        mat = np.asarray(mat, dtype=np.float32)
+        if mat.ndim == 1:
+            mat = mat.reshape(1, -1)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return mat / norms
+
+    def quantize(self, vectors):
+        """Unit-normalizes, then → (codes, per-vector scales)."""
+        vectors = self._normalize(vectors)
+
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def dequantize(self, positions=None):
+        """Approximate float32 vectors (all rows, or the given positions)."""
+        codes = self.codes if positions is None else self.codes[positions]
+        scales = self.scales if positions is None else self.scales[positions]
+        return codes.astype(np.float32) * scales[:, None]
+
+    # ----------------------------------------------------------
+    # Loading
+    # ----------------------------------------------------------
+    def add(self, resume_ids, vectors):
+        """Quantizes and appends vectors (does not write the DB)."""
+        resume_ids = np.asarray(resume_ids, dtype=np.int64).ravel()
+        codes, scales = self.quantize(vectors)
+
+        self.ids = np.concatenate([self.ids, resume_ids])
+        self.codes = codes if self.codes is None else np.vstack([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+        self._last_id = max(self._last_id, int(resume_ids.max()))
+        return len(resume_ids)
+
+    def remove(self, resume_ids):
+        """Drops resumes from the compact matrix → number removed."""
+        keep = ~np.isin(self.ids, np.asarray(resume_ids, dtype=np.int64))
+        removed = int((~keep).sum())
+        if removed:
+            self.ids = self.ids[keep]
+            self.codes = self.codes[keep] if keep.any() else None
+            self.scales = self.scales[keep]
+        return removed
+
+    def refresh(self, page_size=LOAD_PAGE_SIZE):
+        """
+        Drops resumes deleted since the last refresh, then loads
+        embeddings saved since, one page at a time (float32 is never
+        held for the whole corpus).
+        Returns number of new vectors.
+        """
+        if self._deleted_seq is None:
+            self._deleted_seq = last_deleted_seq()   # read before the rows → no delete is missed
+        else:
+            self._deleted_seq, deleted = get_deleted_resumes(self._deleted_seq)
+            if deleted:
+                self.remove(deleted)
+
+        if self.dim is None:
+            self.dim = latest_embedding_dim()
+            if self.dim is None:
+                return 0
+
+        added = 0
+        while True:
+            ids, vectors = get_resume_embeddings(after_id=self._last_id, limit=page_size, dim=self.dim)
+            if len(ids) == 0:
+                return added
+            added += self.add(ids, vectors)
+
+    # ----------------------------------------------------------
+    # Search
+    # ----------------------------------------------------------
+    def approximate_scores(self, query_emb, chunk_size=SCORE_CHUNK_SIZE):
+        """Cosine scores of every stored resume from the compact matrix."""
+        q = self._normalize(query_emb)[0]
+        scores = np.empty(len(self.ids), dtype=np.float32)
+
+        for start in range(0, len(self.ids), chunk_size):
+            block = self.codes[start:start + chunk_size].astype(np.float32) @ q
+            scores[start:start + chunk_size] = block * self.scales[start:start + chunk_size]
+
+        return scores
+
+    @staticmethod
+    def _top_positions(scores, k):
+        k = min(k, len(scores))
+        if k == 0:
+            return np.empty(0, dtype=np.int64)
+        part = np.argpartition(-scores, k - 1)[:k]
+        return part[np.argsort(-scores[part], kind="stable")]
+
+    def search(self, query_emb, k=10, rerank=True, full_vectors=None):
+        """
+        Top-k resumes for a JD embedding → [(resume_id, score), ...].
+        Picks up vectors saved since the last call first.
+        rerank=True re-scores the best k x rerank_factor candidates with
+        full-precision vectors (from `full_vectors` {id: vector} if given,
+        else from the DB).
+        """
+        if query_emb is None:
+            return []
+        self._match_dim(query_emb)
+        self.refresh()
+        if self.codes is None:
+            return []
+
+        scores = self.approximate_scores(query_emb)
+
+        if not rerank:
+            top = self._top_positions(scores, k)
+            return [(int(self.ids[p]), float(np.clip(scores[p], 0.0, 1.0))) for p in top]
+
+        pool = self._top_positions(scores, k * self.rerank_factor)
+        pool_ids = [int(self.ids[p]) for p in pool]
+
+        lookup = full_vectors if full_vectors is not None else get_embeddings_by_ids(pool_ids)
+        kept = [rid for rid in pool_ids if rid in lookup]
+        if not kept:
+            return []
+
+        q = self._normalize(query_emb)[0]
+        exact = self._normalize(np.vstack([lookup[rid] for rid in kept])) @ q
+        top = self._top_positions(exact, k)
+        return [(kept[p], float(np.clip(exact[p], 0.0, 1.0))) for p in top]
+
+    # ----------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------
+    def memory_report(self):
+        """Bytes held vs the same vectors as float32."""
+        if self.codes is None:
+            return {"vectors": 0, "dim": 0, "float32_bytes": 0,
+                    "stored_bytes": 0, "saved_bytes": 0, "compression": 0.0}
+
+        n, dim = self.codes.shape
+        float32_bytes = n * dim * 4
+        stored = self.codes.nbytes + (self.scales.nbytes if self.dtype == "int8" else 0)
+
+        return {
+            "vectors": n,
+            "dim": dim,
+            "float32_bytes": float32_bytes,
+            "stored_bytes": stored,
+            "saved_bytes": float32_bytes - stored,
+            "compression": round(float32_bytes / stored, 2),
+        }
+
+    def exact_top_k(self, query_embs, k=10, page_size=LOAD_PAGE_SIZE):
+        """
+        Exact float32 top-k resume ids per JD embedding, one DB page at a
+        time (the float32 corpus is never held in memory at once).
+        """
+        from app.services.similarity_engine import SimilarityEngine
+
+        engine = SimilarityEngine()
+        best = [dict() for _ in range(len(query_embs))]   # per query: {resume_id: score}
+        after_id = 0
+
+        while True:
+            ids, vectors = get_resume_embeddings(after_id=after_id, limit=page_size, dim=self.dim)
+            if len(ids) == 0:
+                break
+            after_id = int(ids[-1])
+
+            top_idx, top_scores = engine.top_k(vectors, query_embs, k)
+            for q_best, row, scores in zip(best, top_idx, top_scores):
+                q_best.update((int(ids[i]), float(s)) for i, s in zip(row, scores))
+                if len(q_best) > k:
+                    keep = sorted(q_best.items(), key=lambda kv: -kv[1])[:k]
+                    q_best.clear()
+                    q_best.update(keep)
+
+        return [set(q_best) for q_best in best]
+
+    def overlap(self, query_embs, k=10, rerank=True):
+        """
+        Mean top-k overlap with exact float32 SimilarityEngine scoring
+        over the given JD embeddings (1.0 = identical result sets).
+        """
+        query_embs = np.asarray(query_embs, dtype=np.float32)
+        if query_embs.ndim == 1:
+            query_embs = query_embs.reshape(1, -1)
+
+        self._match_dim(query_embs[0])
+        self.refresh()
+        if self.codes is None:
+            return 1.0
+
+        ratios = []
+        for q, exact in zip(query_embs, self.exact_top_k(query_embs, k)):
+            approx = {rid for rid, _ in self.search(q, k, rerank=rerank)}
+            ratios.append(len(exact & approx) / len(exact) if exact else 1.0)
+
+        return float(np.mean(ratios))
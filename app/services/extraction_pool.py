@@ -0,0 +1,271 @@
+# FILE: app/services/extraction_pool.py
+
+import io
+import os
+import threading
+import time
+import multiprocessing as mp
+from multiprocessing.connection import wait
+
+from app.utils.document_cache import DocumentCache, DOCUMENT_CACHE_PATH, file_key
+from app.utils.metrics import span, inc, capture, replay
+
+# Per-document limits
+DEFAULT_TIMEOUT = 30.0      # seconds
+DEFAULT_MAX_PAGES = 20
+
+
+# ------------------------------------------------------------
+# Worker side (runs in a child process)
+# ------------------------------------------------------------
+def _worker_loop(conn, max_pages):
+    """
+    Receives (filename, bytes) jobs, sends back
+    (raw_text, clean_text, sections, error, spans); spans are this
+    job's (stage, seconds) timings, replayed in the parent.
+    One ResumeParser per worker → NLTK/pdfplumber load once per process.
+    """
+    try:
+        from app.services.resume_parser import ResumeParser
+        from app.utils.section_parser import SectionParser
+        parser = ResumeParser()
+        init_error = None
+    except Exception as e:
+        parser = None
+        init_error = f"worker init failed: {type(e).__name__}: {e}"
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        filename, data = job
+        if parser is None:
+            conn.send((None, None, None, init_error, []))
+            continue
+
+        with capture() as spans:
+            try:
+                buf = io.BytesIO(data)
+                buf.name = filename
+                raw_text, clean_text = parser.get_resume_text(buf, max_pages=max_pages)
+                sections = SectionParser.get_sections(raw_text) if raw_text else None
+                reply = (raw_text, clean_text, sections, None)
+            except Exception as e:
+                reply = (None, None, None, f"{type(e).__name__}: {e}")
+        conn.send(reply + (list(spans),))
+
+
+def _read_upload(file):
+    """(filename, bytes) from an uploaded file or a path."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return os.path.basename(file), f.read()
+
+    if hasattr(file, "getvalue"):
+        return file.name, file.getvalue()
+
+    file.seek(0)
+    return file.name, file.read()
+
+
+# ------------------------------------------------------------
+# Parent side
+# ------------------------------------------------------------
+class _Worker:
+    def __init__(self, ctx, max_pages):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_loop, args=(child_conn, max_pages), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.job_index = None
+        self.started_at = None
+
+    def submit(self, index, job):
+        self.job_index = index
+        self.started_at = time.monotonic()
+        self.conn.send(job)
+
+    def idle(self):
+        self.job_index = None
+        self.started_at = None
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.idle()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class ExtractionPool:
+    def __init__(self, workers=None, timeout=DEFAULT_TIMEOUT, max_pages=DEFAULT_MAX_PAGES,
+                 cache_path=DOCUMENT_CACHE_PATH):
+        """
+        Parallel resume extraction in worker processes.
+        - One job per worker at a time, pool sized to available cores
+        - A job over `timeout` seconds gets its worker killed & replaced
+        - A worker that crashes only fails the file it was working on
+        - Files parsed before (same bytes, parser version, page cap) come
+          from the persistent document cache without reaching a worker
+        Results always come back in input order. Safe to share between
+        threads (callers take turns on the workers).
+        """
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.cache = DocumentCache(cache_path)
+        self._ctx = mp.get_context("spawn")
+        self._pool = []
+        self._lock = threading.Lock()   # extract_all is shared by every session thread
+
+    def _spawn(self):
+        return _Worker(self._ctx, self.max_pages)
+
+    def _dispatch(self, jobs, queue, finish):
+        """Runs jobs[idx] for every idx in queue on the workers; finish() per file."""
+        total, done = len(queue), 0
+
+        while len(self._pool) < min(self.workers, len(queue)):
+            self._pool.append(self._spawn())
+
+        queue.reverse()
+        resubmitted = set()
+
+        while done < total:
+            # Hand out work to idle workers
+            for pos, worker in enumerate(self._pool):
+                if worker.job_index is None and queue:
+                    idx = queue.pop()
+                    try:
+                        worker.submit(idx, jobs[idx])
+                    except (BrokenPipeError, OSError):
+                        # Worker died while idle → retry the file once on a fresh one
+                        worker.kill()
+                        self._pool[pos] = self._spawn()
+                        if idx in resubmitted:
+                            finish(idx, None, None, None, "worker crashed")
+                            done += 1
+                        else:
+                            resubmitted.add(idx)
+                            queue.append(idx)
+
+            busy = [w for w in self._pool if w.job_index is not None]
+            if not busy:
+                continue   # replacements get the re-queued files next pass
+
+            now = time.monotonic()
+            wait_for = min(self.timeout - (now - w.started_at) for w in busy)
+
+            ready = wait(
+                [w.conn for w in busy] + [w.process.sentinel for w in busy],
+                timeout=max(0.0, wait_for)
+            )
+
+            for pos, worker in enumerate(self._pool):
+                if worker.job_index is None:
+                    continue
+
+                idx = worker.job_index
+                error = None
+
+                if worker.conn in ready:
+                    try:
+                        raw_text, clean_text, sections, error, spans = worker.conn.recv()
+                        replay(spans)
+                        finish(idx, raw_text, clean_text, sections, error)
+                        worker.idle()
+                        done += 1
+                        continue
+                    except (EOFError, OSError):
+                        error = "worker crashed"
+                elif worker.process.sentinel in ready:
+                    error = "worker crashed"
+                elif time.monotonic() - worker.started_at >= self.timeout:
+                    error = f"timed out after {self.timeout:.0f}s"
+                else:
+                    continue
+
+                # Crash / timeout → fail only this file, replace the worker
+                finish(idx, None, None, None, error)
+                done += 1
+                worker.kill()
+                self._pool[pos] = self._spawn()
+
+    @span("extract")
+    def extract_all(self, files):
+        """
+        Extracts many files in parallel.
+        Returns list of dicts {filename, raw_text, clean_text, sections, error}
+        aligned with `files`.
+        """
+        jobs = [_read_upload(f) for f in files]
+        results = [None] * len(jobs)
+        if not jobs:
+            return results
+
+        def finish(idx, raw_text, clean_text, sections, error):
+            results[idx] = {
+                "filename": jobs[idx][0],
+                "raw_text": raw_text,
+                "clean_text": clean_text,
+                "sections": sections,
+                "error": error,
+            }
+
+        # Repeat uploads → straight from the document cache
+        keys = [file_key(data) for _, data in jobs]
+        queue = []
+        for idx, doc in enumerate(self.cache.get_many(keys, self.max_pages)):
+            if doc is None:
+                queue.append(idx)
+            else:
+                finish(idx, doc["raw_text"], doc["clean_text"], doc["sections"], None)
+        misses = list(queue)
+        if queue:
+            # Replies are read off shared pipes → one caller at a time
+            with self._lock:
+                self._dispatch(jobs, queue, finish)
+
+        # Only readable documents are cached (timeouts / crashes may be transient)
+        self.cache.put_many(
+            [(keys[idx], results[idx]) for idx in misses
+             if results[idx]["raw_text"] and not results[idx]["error"]],
+            self.max_pages
+        )
+
+        inc("documents_extracted", len(misses))
+        inc("extraction_failures", sum(1 for r in results if r["error"]))
+        return results
+
+    def cache_stats(self):
+        """Hit / miss counters + hit ratio of the document cache."""
+        return self.cache.stats()
+
+    def close(self):
+        with self._lock:
+            for worker in self._pool:
+                worker.stop()
+            self._pool = []
+        self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,389 @@
+# FILE: app/services/inference_backends.py
+"""
+Inference backends for EmbeddingModel.
+
+Every backend exposes the slice of the SentenceTransformer API that
+EmbeddingModel uses: encode(), tokenizer, max_seq_length.
+
+- torch        eager SentenceTransformer (reference, default)
+- onnx         exported graph on ONNX Runtime (CPU), optional dynamic int8
+- torchscript  traced graph on torch.jit, optional dynamic int8
+
+A non-torch backend is checked against the torch reference the first
+time it is loaded (report cached next to the exported graph); one that
+disagrees is not used.
+
+    python -m app.services.inference_backends validate --backend onnx --int8
+    python -m app.services.inference_backends tiny-model /tmp/tiny_sbert
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Exported graphs are written here (one folder per model)
+EXPORT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "models", "exported"
+)
+
+BACKENDS = ("torch", "onnx", "torchscript")
+
+# Minimum cosine between a backend and the torch reference
+MIN_AGREEMENT = 0.99
+
+VALIDATION_TEXTS = [
+    "python developer with sql and machine learning projects",
+    "data analyst skilled in pandas numpy statistics and data visualization",
+    "looking for a backend engineer with git github and rest api experience",
+    "deep learning researcher tensorflow pytorch nlp transformers",
+    "b tech computer science 2021 internship at a fintech startup",
+]
+
+
+def is_local_snapshot(model_path):
+    """A model folder on disk → load it without ever asking the hub."""
+    return os.path.isdir(model_path)
+
+
+# ------------------------------------------------------------
+# Reference backend (eager PyTorch)
+# ------------------------------------------------------------
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model_path, device="cpu"):
+        from sentence_transformers import SentenceTransformer
+        self.st = SentenceTransformer(model_path, device=device,
+                                      local_files_only=is_local_snapshot(model_path))
+        self.tokenizer = self.st.tokenizer
+        self.max_seq_length = self.st.max_seq_length
+
+    def encode(self, sentences, **kwargs):
+        return self.st.encode(sentences, **kwargs)
+
+
+# ------------------------------------------------------------
+# Exported-graph backends
+# ------------------------------------------------------------
+def _read_st_config(model_path, filename):
+    """JSON file of a sentence-transformers model folder (or hub repo)."""
+    try:
+        if os.path.isdir(model_path):
+            path = os.path.join(model_path, filename)
+        else:
+            from huggingface_hub import hf_hub_download
+            path = hf_hub_download(model_path, filename)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _pooling_spec(model_path):
+    """(pooling mode, normalize, max_seq_length) as configured for SBERT."""
+    modules = _read_st_config(model_path, "modules.json") or []
+    normalize = any(m.get("type", "").endswith("Normalize") for m in modules)
+
+    mode = "mean"
+    pooling_dir = next((m["path"] for m in modules if m.get("type", "").endswith("Pooling")), None)
+    pooling = _read_st_config(model_path, f"{pooling_dir}/config.json") if pooling_dir else None
+    if pooling and pooling.get("pooling_mode_cls_token"):
+        mode = "cls"
+    elif pooling and pooling.get("pooling_mode_max_tokens"):
+        mode = "max"
+
+    st_config = _read_st_config(model_path, "sentence_bert_config.json") or {}
+    return mode, normalize, st_config.get("max_seq_length", 256)
+
+
+def _export_dir(model_path):
+    return os.path.join(EXPORT_DIR, os.path.basename(os.path.normpath(model_path)))
+
+
+class _GraphBackend:
+    """Shared tokenize → run graph → pool → normalize loop."""
+
+    name = None
+
+    def __init__(self, model_path):
+        from transformers import AutoTokenizer
+
+        self.model_path = model_path
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            model_path, local_files_only=is_local_snapshot(model_path)
+        )
+        self.pooling, self.normalize, self.max_seq_length = _pooling_spec(model_path)
+
+    def _run(self, input_ids, attention_mask, token_type_ids):
+        """Returns token embeddings (batch x seq x dim) as float32."""
+        raise NotImplementedError
+
+    def _pool(self, tokens, mask):
+        if self.pooling == "cls":
+            return tokens[:, 0]
+        mask = mask[:, :, None].astype(np.float32)
+        if self.pooling == "max":
+            return np.where(mask > 0, tokens, -1e9).max(axis=1)
+        return (tokens * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        out = []
+        for start in range(0, len(texts), batch_size):
+            enc = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            mask = enc["attention_mask"].astype(np.int64)
+            type_ids = enc.get("token_type_ids")
+            type_ids = np.zeros_like(mask) if type_ids is None else type_ids.astype(np.int64)
+
+            tokens = self._run(enc["input_ids"].astype(np.int64), mask, type_ids)
+            out.append(self._pool(tokens, mask))
+
+        emb = np.vstack(out).astype(np.float32) if out else np.zeros((0, 0), dtype=np.float32)
+        if self.normalize and len(emb):
+            emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+
+        return emb[0] if single else emb
+
+    # Export helper: HF encoder + dummy inputs
+    def _load_encoder(self):
+        from transformers import AutoModel
+        model = AutoModel.from_pretrained(
+            self.model_path, local_files_only=is_local_snapshot(self.model_path)
+        )
+        model.eval()
+        dummy = self.tokenizer(["export sample text"], return_tensors="pt")
+        if "token_type_ids" not in dummy:
+            import torch
+            dummy["token_type_ids"] = torch.zeros_like(dummy["input_ids"])
+        return model, (dummy["input_ids"], dummy["attention_mask"], dummy["token_type_ids"])
+
+
+class OnnxBackend(_GraphBackend):
+    name = "onnx"
+
+    def __init__(self, model_path, quantize=False, intra_op_threads=0, export_dir=None):
+        """
+        Runs the encoder on ONNX Runtime (CPU). The graph is exported on
+        first use (needs torch once) and reused afterwards; quantize=True
+        adds dynamic int8 weights.
+        """
+        super().__init__(model_path)
+
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("ONNX backend needs onnxruntime: pip install onnxruntime") from e
+
+        export_dir = export_dir or _export_dir(model_path)
+        path = os.path.join(export_dir, "model.int8.onnx" if quantize else "model.onnx")
+        if not os.path.exists(path):
+            self._export(export_dir, quantize)
+
+        options = ort.SessionOptions()
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _export(self, export_dir, quantize):
+        import torch
+
+        os.makedirs(export_dir, exist_ok=True)
+        fp32_path = os.path.join(export_dir, "model.onnx")
+
+        if not os.path.exists(fp32_path):
+            model, dummy = self._load_encoder()
+            axes = {0: "batch", 1: "sequence"}
+            with torch.no_grad():
+                torch.onnx.export(
+                    model, dummy, fp32_path,
+                    input_names=["input_ids", "attention_mask", "token_type_ids"],
+                    output_names=["token_embeddings"],
+                    dynamic_axes={"input_ids": axes, "attention_mask": axes,
+                                  "token_type_ids": axes, "token_embeddings": axes},
+                    opset_version=14
+                )
+
+        if quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(fp32_path, os.path.join(export_dir, "model.int8.onnx"),
+                             weight_type=QuantType.QInt8)
+
+    def _run(self, input_ids, attention_mask, token_type_ids):
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask,
+                 "token_type_ids": token_type_ids}
+        feeds = {k: v for k, v in feeds.items() if k in self.input_names}
+        return self.session.run(None, feeds)[0]
+
+
+class TorchScriptBackend(_GraphBackend):
+    name = "torchscript"
+
+    def __init__(self, model_path, quantize=False, export_dir=None):
+        """
+        Runs a traced (torch.jit) encoder; quantize=True applies dynamic
+        int8 quantization to the Linear layers before tracing.
+        """
+        super().__init__(model_path)
+        import torch
+
+        export_dir = export_dir or _export_dir(model_path)
+        path = os.path.join(export_dir, "model.int8.pt" if quantize else "model.pt")
+
+        if not os.path.exists(path):
+            os.makedirs(export_dir, exist_ok=True)
+            model, dummy = self._load_encoder()
+            model.config.return_dict = False
+            if quantize:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            with torch.no_grad():
+                traced = torch.jit.trace(model, dummy, strict=False)
+            traced.save(path)
+
+        self.torch = torch
+        self.graph = torch.jit.load(path, map_location="cpu")
+        self.graph.eval()
+
+    def _run(self, input_ids, attention_mask, token_type_ids):
+        torch = self.torch
+        with torch.inference_mode():
+            out = self.graph(torch.from_numpy(input_ids), torch.from_numpy(attention_mask),
+                             torch.from_numpy(token_type_ids))
+        return out[0].float().numpy()
+
+
+# ------------------------------------------------------------
+# Selection + validation
+# ------------------------------------------------------------
+def load_backend(name, model_path, device="cpu", quantize=False, intra_op_threads=0):
+    """Builds the named backend (exported graphs are CPU-only)."""
+    if name == "torch":
+        return TorchBackend(model_path, device)
+    if name == "onnx":
+        return OnnxBackend(model_path, quantize, intra_op_threads)
+    if name == "torchscript":
+        return TorchScriptBackend(model_path, quantize)
+    raise ValueError(f"unknown embedding backend: {name} (choose from {', '.join(BACKENDS)})")
+
+
+def validate_backend(backend, reference, texts=None, min_agreement=MIN_AGREEMENT):
+    """
+    Cosine agreement of `backend` with `reference` (usually TorchBackend)
+    on the same texts → {"mean_cosine", "min_cosine", "passed"}.
+    """
+    texts = texts or VALIDATION_TEXTS
+    a = np.asarray(backend.encode(texts, convert_to_numpy=True), dtype=np.float32)
+    b = np.asarray(reference.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+    cos = (a * b).sum(axis=1) / np.clip(
+        np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1), 1e-12, None
+    )
+    return {
+        "mean_cosine": round(float(cos.mean()), 6),
+        "min_cosine": round(float(cos.min()), 6),
+        "passed": bool(cos.min() >= min_agreement),
+    }
+
+
+def check_backend(backend, model_path, quantize=False, export_dir=None):
+    """
+    validate_backend() against TorchBackend(model_path), run once per
+    exported graph: the report is saved next to it and reused on later
+    loads. Returns the report.
+    """
+    export_dir = export_dir or _export_dir(model_path)
+    path = os.path.join(export_dir, f"{backend.name}{'-int8' if quantize else ''}.validation.json")
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    report = validate_backend(backend, TorchBackend(model_path))
+    try:
+        os.makedirs(export_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+    except OSError:
+        pass
+    return report
+
+
+# ------------------------------------------------------------
+# Tiny random model (offline fixture)
+# ------------------------------------------------------------
+def build_tiny_model(out_dir, hidden_size=32, layers=2, heads=2, seed=0):
+    """
+    Writes a randomly initialised BERT + mean-pooling SBERT model to
+    out_dir. No download needed → every backend can be exercised offline.
+    """
+    import torch
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    from sentence_transformers import SentenceTransformer, models
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    words = sorted({w for text in VALIDATION_TEXTS for w in text.split()})
+    letters = list("abcdefghijklmnopqrstuvwxyz0123456789")
+    vocab = (["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+             + letters + [f"##{c}" for c in letters] + words)
+    with open(os.path.join(out_dir, "vocab.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(dict.fromkeys(vocab)) + "\n")
+
+    BertTokenizerFast(os.path.join(out_dir, "vocab.txt"), do_lower_case=True).save_pretrained(out_dir)
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(dict.fromkeys(vocab)),
+        hidden_size=hidden_size,
+        num_hidden_layers=layers,
+        num_attention_heads=heads,
+        intermediate_size=hidden_size * 2,
+        max_position_embeddings=128,
+    )
+    BertModel(config).save_pretrained(out_dir)
+
+    transformer = models.Transformer(out_dir, max_seq_length=128)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="mean")
+    SentenceTransformer(modules=[transformer, pooling]).save(out_dir)
+    return out_dir
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.services.embedding_model import MODEL_NAME, resolve_model_path
+
+    parser = argparse.ArgumentParser(prog="python -m app.services.inference_backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    validate = sub.add_parser("validate", help="compare a backend with the torch reference")
+    validate.add_argument("--backend", choices=BACKENDS, default="onnx")
+    validate.add_argument("--int8", action="store_true")
+    validate.add_argument("--model", default=None, help="model path or hub name")
+
+    tiny = sub.add_parser("tiny-model", help="write a random tiny SBERT model")
+    tiny.add_argument("out_dir")
+
+    args = parser.parse_args()
+
+    if args.command == "tiny-model":
+        print(build_tiny_model(args.out_dir))
+    else:
+        model_path = args.model or resolve_model_path(MODEL_NAME)
+        report = validate_backend(
+            load_backend(args.backend, model_path, quantize=args.int8),
+            TorchBackend(model_path)
+        )
+        print(json.dumps(report, indent=2))
@@ -1,27 +1,34 @@
 # FILE: app/services/jd_parser.py
 
 from app.services.preprocessor import TextPreprocessor
+from app.services.skill_matcher import SkillMatcher
+from app.utils.constants import SKILL_VOCAB, SKILL_ALIASES
+from app.utils.metrics import span
 import re
 
 class JDParser:
     def __init__(self):
         self.preprocessor = TextPreprocessor()
 
-        # Common skills vocabulary (expandable)
-        self.skills_list = {
-            "python", "sql", "mysql", "nlp", "machine learning", "ml", 
-            "deep learning", "pandas", "numpy", "matplotlib", "seaborn",
-            "statistics", "probability", "data analysis", "nltk",
-            "tensorflow", "pytorch", "communication", "problem solving"
-        }
+        # Common skills vocabulary (expandable, app/utils/constants.py)
+        self.skills_list = SKILL_VOCAB
+
+        # Compiled once → one pass per text, whole-word matches only
+        self.skill_matcher = SkillMatcher(self.skills_list, SKILL_ALIASES)
 
     # --------------------------------------------------------
     # Extract skills from JD (Keyword Matching)
     # --------------------------------------------------------
+    @span("skills")
     def extract_skills(self, text: str):
-        text_lower = text.lower()
-        extracted = [skill for skill in self.skills_list if skill in text_lower]
-        return list(set(extracted))  # unique skills
+        return self.skill_matcher.find_all(text)  # unique skills
+
+    # --------------------------------------------------------
+    # Which JD skills appear in a resume
+    # --------------------------------------------------------
+    @span("skills")
+    def match_skills(self, resume_text: str, jd_skills):
+        return self.skill_matcher.match(resume_text, jd_skills)
 
     # --------------------------------------------------------
     # Extract job role (very useful for score weighting)
@@ -48,6 +55,7 @@ class JDParser:
     # --------------------------------------------------------
     # Main JD Processing Function
     # --------------------------------------------------------
+    @span("jd_parse")
     def process_jd(self, jd_text: str):
         """
         Clean JD + extract skills + detect job role.
@@ -0,0 +1,352 @@
+# FILE: app/services/job_worker.py
+"""
+Background scoring workers.
+
+The UI only queues a job (files → blob store, one `job_items` row each)
+and polls its progress; worker processes claim jobs from SQLite and do
+the extraction / embedding / scoring / saving. Jobs survive browser
+refreshes and app restarts (a job whose worker died is reclaimed).
+
+    python -m app.services.job_worker --workers 4    # standalone workers
+"""
+
+import argparse
+import atexit
+import io
+import multiprocessing as mp
+import os
+import socket
+import time
+
+from app.utils.metrics import span, inc
+
+# Worker processes started by the Streamlit app (0 → run them separately)
+JOB_WORKERS = int(os.environ.get("ATS_JOB_WORKERS", "2"))
+
+# Cores shared by all job workers (extraction processes + torch threads);
+# 0 → every core but one
+JOB_CPU_BUDGET = int(os.environ.get("ATS_JOB_CPUS", "0"))
+
+# Files processed per step (progress + heartbeat granularity)
+JOB_CHUNK_SIZE = 8
+
+# Attempts per file before it is marked failed
+JOB_MAX_ATTEMPTS = 3
+
+# Idle workers look for new jobs this often (seconds)
+POLL_SECONDS = 1.0
+
+# Deterministic failures → retrying cannot help
+PERMANENT_ERRORS = ("no text found", "file missing")
+
+
+def _named_bytes(name, data):
+    buf = io.BytesIO(data)
+    buf.name = name
+    return buf
+
+
+# ------------------------------------------------------------
+# One job
+# ------------------------------------------------------------
+def _embed(texts):
+    from app.services.registry import get_embedding_model
+    return get_embedding_model().encode_documents(texts)
+
+
+def _resume_saved(items, jd, fail):
+    """
+    Items an earlier attempt already saved rows for: result saved →
+    done; resume saved → only the result is scored and saved. Items
+    whose resume was deleted meanwhile are returned to start over.
+    """
+    from app.services.registry import get_similarity_engine
+    from app.utils.database import get_resumes_by_ids, get_embeddings_by_ids
+
+    rows = get_resumes_by_ids([item["resume_id"] for item in items])
+    vectors = get_embeddings_by_ids(list(rows))
+
+    fresh, to_score = [], []
+    for item in items:
+        row = rows.get(item["resume_id"])
+        if row is None:
+            item["resume_id"] = item["result_id"] = None
+            fresh.append(item)
+            continue
+
+        # Matched against the skills stored with the resume (as corpus search does)
+        stored = set((row["skills"] or "").split(","))
+        item["skills"] = [s for s in jd["skills"] if s in stored]
+        if item["result_id"]:
+            item["status"] = "done"
+            item["error"] = None
+        elif item["resume_id"] not in vectors:
+            fail(item, "embedding failed")
+        else:
+            to_score.append(item)
+
+    if to_score:
+        sims = get_similarity_engine().batch_similarity(
+            [vectors[item["resume_id"]] for item in to_score], jd["embedding"]
+        )
+        _save_results(to_score, sims, jd)
+    return fresh
+
+
+def _save_results(items, sims, jd):
+    """Scores + saves one result per item (result_id recorded with it) → done."""
+    from app.services.registry import get_scoring_engine
+    from app.utils.database import save_result
+
+    scoring_engine = get_scoring_engine()
+    pending = []
+    for item, sim in zip(items, sims):
+        item["semantic_score"] = sim
+        item["final_score"] = scoring_engine.calculate_final_score(sim, item["skills"], jd["skills"])
+        pending.append(save_result(
+            resume_id=item["resume_id"],
+            jd_id=jd["id"],
+            semantic_score=item["semantic_score"],
+            final_score=item["final_score"],
+            wait=False,
+            job_item=item["id"]
+        ))
+
+    for item, write in zip(items, pending):
+        item["result_id"] = write.result()
+        item["status"] = "done"
+        item["error"] = None
+
+
+@span("job_chunk")
+def process_items(items, jd):
+    """
+    Extracts, embeds, scores and saves one chunk of job items.
+    Every saved row is recorded on its item in the same transaction, so
+    a retried item reuses what an earlier attempt saved (never a
+    duplicate resume / result). Returns the items with their new
+    status / ids / scores; items still "running" did not finish.
+    """
+    from app.services.registry import (
+        get_jd_parser, get_similarity_engine, get_extraction_pool
+    )
+    from app.utils.blob_store import read_blob
+    from app.utils.database import save_resume
+    from app.utils.section_parser import SectionParser
+
+    jd_parser = get_jd_parser()
+
+    def fail(item, error):
+        item["attempts"] += 1
+        item["error"] = error
+        permanent = error in PERMANENT_ERRORS
+        item["status"] = "failed" if permanent or item["attempts"] >= JOB_MAX_ATTEMPTS else "queued"
+
+    for item in items:
+        item["status"] = "running"
+
+    todo = [item for item in items if not item.get("resume_id")]
+    saved = [item for item in items if item.get("resume_id")]
+    if saved:
+        todo += _resume_saved(saved, jd, fail)
+
+    uploads = []
+    for item in todo:
+        try:
+            uploads.append((item, read_blob(item["file_sha256"])))
+        except FileNotFoundError:
+            fail(item, "file missing")   # permanent; the rest of the chunk goes on
+
+    extracted = get_extraction_pool().extract_all(
+        [_named_bytes(item["filename"], data) for item, data in uploads]
+    ) if uploads else []
+
+    ok = []
+    for (item, data), result in zip(uploads, extracted):
+        if result["error"] or not result["raw_text"]:
+            fail(item, result["error"] or "no text found")
+        else:
+            ok.append((item, data, result))
+
+    if not ok:
+        return items
+
+    embs = _embed([result["clean_text"] for _, _, result in ok])
+
+    # Not embedded → retried later (never stored with a placeholder vector)
+    embedded = []
+    for entry, emb in zip(ok, embs):
+        if emb is None:
+            fail(entry[0], "embedding failed")
+        else:
+            embedded.append((entry, emb))
+    if not embedded:
+        return items
+    ok = [entry for entry, _ in embedded]
+    embs = [emb for _, emb in embedded]
+
+    sims = get_similarity_engine().batch_similarity(embs, jd["embedding"])
+
+    # Resumes first (ids needed by results), all through the writer queue
+    pending = []
+    for (item, data, result), emb in zip(ok, embs):
+        sections = result.get("sections") or SectionParser.get_sections(result["raw_text"])
+        item["skills"] = jd_parser.match_skills(result["raw_text"], jd["skills"])
+
+        pending.append(save_resume(
+            filename=os.path.splitext(item["filename"])[0],
+            filedata=data,
+            clean_text=result["clean_text"],
+            skills=jd_parser.extract_skills(result["raw_text"]),
+            name=sections["name"],
+            email=sections["email"],
+            phone=sections["phone"],
+            education=sections["education"],
+            experience=sections["experience"],
+            projects=sections["projects"],
+            embedding=emb,
+            wait=False,
+            job_item=item["id"]
+        ))
+
+    for (item, _, _), write in zip(ok, pending):
+        item["resume_id"] = write.result()
+
+    _save_results([item for item, _, _ in ok], sims, jd)
+    return items
+
+
+def run_job(job, worker_id, stop_event=None):
+    """Processes every queued item of a claimed job."""
+    from app.services.registry import get_jd_parser, get_embedding_model
+    from app.utils.database import (
+        get_jd, next_job_items, update_job_items, touch_job, finish_job, requeue_job
+    )
+
+    row = get_jd(job["jd_id"])
+    if row is None:
+        finish_job(job["id"], error=f"job description {job['jd_id']} not found")
+        return
+
+    jd = {
+        "id": row["id"],
+        "skills": get_jd_parser().extract_skills(row["raw_jd"]),
+        "embedding": get_embedding_model().encode_document(row["clean_jd"]),
+    }
+
+    while True:
+        if stop_event is not None and stop_event.is_set():
+            requeue_job(job["id"])   # another worker continues where we stopped
+            return
+
+        items = next_job_items(job["id"], JOB_CHUNK_SIZE)
+        if not items:
+            break
+
+        try:
+            items = process_items(items, jd)
+        except Exception as e:
+            # Chunk aborted (e.g. DB error) → an attempt for each file it left
+            # unfinished; rows already saved are reused by the retry
+            for item in items:
+                if item["status"] != "running":
+                    continue
+                item["attempts"] += 1
+                item["error"] = f"{type(e).__name__}: {e}"
+                item["status"] = "failed" if item["attempts"] >= JOB_MAX_ATTEMPTS else "queued"
+
+        update_job_items(items)
+        inc("job_items_done", sum(1 for it in items if it["status"] == "done"))
+        inc("job_items_failed", sum(1 for it in items if it["status"] == "failed"))
+        inc("job_items_retried", sum(1 for it in items if it["status"] == "queued"))
+
+        if not touch_job(job["id"], worker_id):
+            return   # reclaimed elsewhere → stop quietly
+
+    finish_job(job["id"])
+    inc("jobs_finished")
+
+
+# ------------------------------------------------------------
+# Worker processes
+# ------------------------------------------------------------
+def cpu_share(n_workers, budget=JOB_CPU_BUDGET):
+    """Cores one of n_workers job workers may use (at least 1)."""
+    budget = budget or max(1, (os.cpu_count() or 2) - 1)
+    return max(1, budget // max(1, n_workers))
+
+
+def worker_loop(stop_event=None, poll_seconds=POLL_SECONDS, cpus=None):
+    """
+    Claims and runs jobs until stop_event is set.
+    cpus: this worker's core share → extraction pool size and torch
+    threads (default: every core but one).
+    """
+    from app.utils.database import create_tables, claim_job, finish_job
+
+    if cpus:
+        # Before the model is built; an explicit ATS_TORCH_THREADS wins
+        os.environ.setdefault("ATS_TORCH_THREADS", str(cpus))
+        from app.services.registry import get_extraction_pool
+        get_extraction_pool(workers=cpus)
+
+    create_tables()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    while stop_event is None or not stop_event.is_set():
+        job = claim_job(worker_id)
+        if job is None:
+            time.sleep(poll_seconds)
+            continue
+
+        try:
+            run_job(job, worker_id, stop_event)
+        except Exception as e:
+            finish_job(job["id"], error=f"{type(e).__name__}: {e}")
+
+
+def stop_workers(processes, stop_event, timeout=10):
+    """Asks workers to stop after their current chunk; kills stragglers."""
+    stop_event.set()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        process.join(timeout=max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.terminate()
+
+
+def start_workers(n=JOB_WORKERS):
+    """
+    Starts n worker processes → (processes, stop_event).
+    Not daemonic (each runs its own extraction pool); they are stopped
+    when the starting process exits. The CPU budget (ATS_JOB_CPUS) is
+    split between them. Each still loads its own embedding model unless
+    ATS_EMBEDDING_SOCKET points them at one shared daemon.
+    """
+    ctx = mp.get_context("spawn")
+    stop_event = ctx.Event()
+    cpus = cpu_share(n)
+    processes = [
+        ctx.Process(target=worker_loop, args=(stop_event, POLL_SECONDS, cpus),
+                    name=f"ats-job-worker-{i}")
+        for i in range(n)
+    ]
+    for process in processes:
+        process.start()
+
+    atexit.register(stop_workers, processes, stop_event)
+    return processes, stop_event
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.services.job_worker")
+    parser.add_argument("--workers", type=int, default=max(1, JOB_WORKERS))
+    args = parser.parse_args()
+
+    processes, stop = start_workers(args.workers)
+    print(f"{len(processes)} job worker(s) running — Ctrl+C to stop")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop_workers(processes, stop)
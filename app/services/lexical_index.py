@@ -0,0 +1,220 @@
+# FILE: app/services/lexical_index.py
+"""
+Sparse BM25 first stage in front of the embedding model.
+
+A JD is matched lexically against resume clean_text (scikit-learn
+HashingVectorizer term counts → BM25); only the top-N candidates are
+embedded and scored semantically. Hashing needs no fitted vocabulary,
+so new resumes are appended without re-indexing. Uploads are
+shortlisted with shortlist_texts(); stored resumes through
+LexicalIndex, the first stage of CorpusSearch.
+
+    python -m app.services.lexical_index jd.txt --top 20    # stored resumes
+"""
+
+import argparse
+import os
+
+import numpy as np
+from scipy import sparse
+
+from app.utils.database import (
+    DB_PATH, create_tables, get_resume_texts, get_deleted_resumes, last_deleted_seq
+)
+from app.utils.metrics import span
+
+# Term counts live next to resume_system.db
+LEXICAL_INDEX_PATH = os.path.join(os.path.dirname(DB_PATH), "resume_lexical.npz")
+
+# Resumes kept per JD for semantic scoring (0 → no pre-filter)
+SHORTLIST_SIZE = int(os.environ.get("ATS_SHORTLIST_SIZE", "0"))
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+N_FEATURES = 2 ** 20
+LOAD_PAGE_SIZE = 5000
+
+_vectorizer = None
+
+
+def term_counts(texts):
+    """(n x N_FEATURES) CSR matrix of raw term counts."""
+    global _vectorizer
+    if _vectorizer is None:
+        from sklearn.feature_extraction.text import HashingVectorizer
+        _vectorizer = HashingVectorizer(
+            n_features=N_FEATURES, alternate_sign=False, norm=None, dtype=np.float32
+        )
+    return _vectorizer.transform([t or "" for t in texts]).tocsr()
+
+
+def bm25_scores(doc_counts, query_counts, k1=BM25_K1, b=BM25_B):
+    """
+    BM25 of every document (rows of doc_counts, CSC or CSR) for one
+    query (1-row term counts). Only the query's term columns are read.
+    """
+    n_docs = doc_counts.shape[0]
+    terms = np.unique(query_counts.indices)
+    if n_docs == 0 or len(terms) == 0:
+        return np.zeros(n_docs, dtype=np.float32)
+
+    lengths = np.asarray(doc_counts.sum(axis=1)).ravel()
+    avgdl = lengths.mean() or 1.0
+
+    sub = sparse.csc_matrix(doc_counts[:, terms])
+    df = np.diff(sub.indptr)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+    sub = sub.tocoo()
+    tf = sub.data
+    norm = k1 * (1.0 - b + b * lengths[sub.row] / avgdl)
+    contrib = idf[sub.col] * tf * (k1 + 1.0) / (tf + norm)
+    return np.bincount(sub.row, weights=contrib, minlength=n_docs).astype(np.float32)
+
+
+def normalize_scores(scores):
+    """Scales BM25 scores to 0–1 (best candidate → 1)."""
+    scores = np.asarray(scores, dtype=np.float32)
+    top = scores.max() if len(scores) else 0.0
+    return scores / top if top > 0 else np.zeros_like(scores)
+
+
+def top_n(scores, n):
+    """Indices of the n best scores, best first."""
+    n = min(n, len(scores))
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    part = np.argpartition(-scores, n - 1)[:n]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+@span("lexical")
+def shortlist_texts(texts, query, n=SHORTLIST_SIZE):
+    """
+    In-memory shortlist for one batch of texts (e.g. the current upload).
+    Returns (indices of the top n best first, normalized score of every text).
+    """
+    scores = normalize_scores(bm25_scores(term_counts(texts), term_counts([query])))
+    return top_n(scores, n if n > 0 else len(texts)), scores
+
+
+# ------------------------------------------------------------
+# Persistent index over stored resumes
+# ------------------------------------------------------------
+class LexicalIndex:
+    def __init__(self, index_path=LEXICAL_INDEX_PATH):
+        """
+        BM25 index over every stored resume's clean_text.
+        Saved to index_path; refresh() appends resumes inserted since
+        and drops the ones deleted since (deleted_resumes tombstones).
+        """
+        create_tables()
+
+        self.index_path = index_path
+        self.ids = np.empty(0, dtype=np.int64)
+        self.counts = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self._csc = None
+        self.deleted_seq = last_deleted_seq()   # read before the rows → no delete is missed
+
+        if index_path and os.path.exists(index_path):
+            try:
+                self._load()
+            except Exception:
+                # Unreadable → rebuilt from the database below
+                self.ids = np.empty(0, dtype=np.int64)
+                self.counts = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+                self.deleted_seq = last_deleted_seq()
+
+        if self.refresh() and self.index_path:
+            self.save()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _load(self):
+        data = np.load(self.index_path)
+        self.counts = sparse.csr_matrix(
+            (data["data"], data["indices"], data["indptr"]), shape=tuple(data["shape"])
+        )
+        self.ids = data["ids"]
+        # Files saved before tombstones existed → replay every tombstone
+        self.deleted_seq = int(data["deleted_seq"]) if "deleted_seq" in data else 0
+
+    def save(self):
+        tmp = f"{self.index_path}.tmp.npz"
+        np.savez(tmp, data=self.counts.data, indices=self.counts.indices,
+                 indptr=self.counts.indptr, shape=np.array(self.counts.shape), ids=self.ids,
+                 deleted_seq=np.array(self.deleted_seq))
+        os.replace(tmp, self.index_path)
+
+    def add(self, resume_ids, texts):
+        if len(resume_ids) == 0:
+            return
+        self.ids = np.concatenate([self.ids, np.asarray(resume_ids, dtype=np.int64)])
+        self.counts = sparse.vstack([self.counts, term_counts(texts)], format="csr")
+        self._csc = None
+
+    def remove(self, resume_ids):
+        """Drops resumes from the index → number removed."""
+        keep = ~np.isin(self.ids, np.asarray(resume_ids, dtype=np.int64))
+        removed = int((~keep).sum())
+        if removed:
+            self.ids = self.ids[keep]
+            self.counts = self.counts[np.flatnonzero(keep)]
+            self._csc = None
+        return removed
+
+    def rebuild(self):
+        """Re-indexes from scratch."""
+        self.ids = np.empty(0, dtype=np.int64)
+        self.counts = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self._csc = None
+        self.deleted_seq = last_deleted_seq()
+        self.refresh()
+        if self.index_path:
+            self.save()
+
+    def refresh(self):
+        """
+        Drops resumes deleted and indexes resumes saved since the last
+        refresh → number of changed rows (added + removed).
+        """
+        self.deleted_seq, deleted = get_deleted_resumes(self.deleted_seq)
+        changed = self.remove(deleted) if deleted else 0
+
+        last_id = int(self.ids[-1]) if len(self.ids) else 0
+        while True:
+            ids, texts = get_resume_texts(after_id=last_id, limit=LOAD_PAGE_SIZE)
+            if not ids:
+                return changed
+            self.add(ids, texts)
+            changed += len(ids)
+            last_id = ids[-1]
+
+    @span("lexical")
+    def shortlist(self, query, n=SHORTLIST_SIZE):
+        """[(resume_id, normalized BM25 score)] for the n best stored resumes."""
+        if self.refresh() and self.index_path:
+            self.save()
+
+        if self._csc is None:
+            self._csc = self.counts.tocsc()   # column slices for query terms
+
+        scores = normalize_scores(bm25_scores(self._csc, term_counts([query])))
+        return [(int(self.ids[i]), float(scores[i])) for i in top_n(scores, n or len(scores))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.services.lexical_index")
+    parser.add_argument("jd", help="JD file (.txt / .pdf)")
+    parser.add_argument("--top", type=int, default=SHORTLIST_SIZE or 20)
+    args = parser.parse_args()
+
+    from app.batch import read_jd_file
+    from app.services.preprocessor import TextPreprocessor
+
+    query = TextPreprocessor().clean_text(read_jd_file(args.jd))
+    for resume_id, score in LexicalIndex().shortlist(query, args.top):
+        print(f"{resume_id}\t{score:.4f}")
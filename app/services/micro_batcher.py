@@ -0,0 +1,104 @@
+# FILE: app/services/micro_batcher.py
+"""
+Request coalescing for the embedding model.
+
+Callers on many threads submit small lists of texts; one background
+thread gathers whatever arrives within a few milliseconds and sends it
+to the encoder as a single batch. Used by the HTTP API and the
+embedding daemon.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from app.utils.metrics import inc
+
+# Flush after this many texts or this long after the first request
+MAX_BATCH_TEXTS = 64
+MAX_WAIT_MS = 5
+
+# Texts waiting for the encoder before submit() refuses more
+MAX_QUEUED_TEXTS = 2048
+
+
+class Overloaded(Exception):
+    """Raised when the queue cannot take more work."""
+
+
+class MicroBatcher:
+    def __init__(self, encode_fn, max_batch=MAX_BATCH_TEXTS, max_wait_ms=MAX_WAIT_MS,
+                 max_queued=MAX_QUEUED_TEXTS, name="api"):
+        """
+        Gathers embedding requests from many threads into one
+        encode_fn(texts) call (at most max_batch texts, waiting at most
+        max_wait_ms for company after the first request arrives).
+        Counters are named after the owner: <name>_embed_batches,
+        <name>_embed_batched_requests, <name>_rejected_queue_full.
+        """
+        self.encode_fn = encode_fn
+        self.name = name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queued = max_queued
+
+        self._queue = queue.Queue()
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self):
+        return self._queued
+
+    def submit(self, texts):
+        """Future resolving to one vector per text; Overloaded if the queue is full."""
+        texts = list(texts)
+        with self._lock:
+            if self._queued + len(texts) > self.max_queued:
+                inc(f"{self.name}_rejected_queue_full")
+                raise Overloaded("embedding queue full")
+            self._queued += len(texts)
+
+        future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            n_texts = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            while n_texts < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_texts += len(item[0])
+
+            texts = [t for item_texts, _ in batch for t in item_texts]
+            with self._lock:
+                self._queued -= len(texts)
+            inc(f"{self.name}_embed_batches")
+            inc(f"{self.name}_embed_batched_requests", len(batch))
+
+            try:
+                vectors = self.encode_fn(texts) if texts else []
+                if len(vectors) != len(texts):
+                    raise RuntimeError("embedding failed")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            pos = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[pos:pos + len(item_texts)])
+                pos += len(item_texts)
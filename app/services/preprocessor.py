@@ -1,29 +1,90 @@
 # FILE: app/services/preprocessor.py
 
+import os
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import multiprocessing as mp
+
+from app.utils.metrics import span
+
+# Local NLTK data (models/nltk_data) → no hub/network lookup on cold start
+NLTK_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "models", "nltk_data"
+)
+
+# Precompiled once (clean_text used to recompile per call)
+URL_PATTERN = re.compile(r"http\S+|www\S+")
+NON_ALPHA_PATTERN = re.compile(r"[^a-z\s]")
+SPACES_PATTERN = re.compile(r"\s+")
+
+# Distinct words remembered by the lemma memo (shared by all instances)
+LEMMA_CACHE_SIZE = 200_000
+
+# Below this many texts a process pool costs more than it saves
+PARALLEL_MIN_TEXTS = 256
+
+# Add custom stopwords for better NLP cleaning
+CUSTOM_JOB_STOPWORDS = {
+    "responsible", "requirements", "skills", "experience", "ability",
+    "knowledge", "job", "role", "looking", "applicant", "candidate",
+    "must", "should", "preferred", "good", "excellent", "strong"
+}
+
+
+# ------------------------------------------------------------
+# Lazy NLTK resources (loaded on first use, not at import)
+# ------------------------------------------------------------
+def _ensure_resource(resource, package):
+    """Finds an NLTK resource locally; downloads into NLTK_DATA_DIR only if missing."""
+    import nltk   # ~1.5s import → deferred until text is actually cleaned
+
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True)
+
+
+@lru_cache(maxsize=1)
+def get_stop_words():
+    _ensure_resource("corpora/stopwords", "stopwords")
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words("english")) | CUSTOM_JOB_STOPWORDS
+
+
+@lru_cache(maxsize=1)
+def get_lemmatizer():
+    _ensure_resource("corpora/wordnet", "wordnet")
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize(word: str) -> str:
+    """Memoized lemma lookup (resume vocabularies repeat heavily)."""
+    return get_lemmatizer().lemmatize(word)
+
+
+def _clean_chunk(texts):
+    """Process-pool entry point (one memo per worker process)."""
+    preprocessor = TextPreprocessor()
+    return [preprocessor.clean_text(t) for t in texts]
 
-# Download required NLTK resources once
-nltk.download("stopwords", quiet=True)
-nltk.download("wordnet", quiet=True)
 
 class TextPreprocessor:
     def __init__(self):
-        """Initialize stopwords and lemmatizer."""
-        self.stop_words = set(stopwords.words("english"))
-        self.lemmatizer = WordNetLemmatizer()
+        """Stopwords and lemmatizer are loaded lazily on first clean."""
+        self.custom_job_stopwords = CUSTOM_JOB_STOPWORDS
 
-        # Add custom stopwords for better NLP cleaning
-        self.custom_job_stopwords = {
-            "responsible", "requirements", "skills", "experience", "ability",
-            "knowledge", "job", "role", "looking", "applicant", "candidate",
-            "must", "should", "preferred", "good", "excellent", "strong"
-        }
-
-        self.stop_words = self.stop_words.union(self.custom_job_stopwords)
+    @property
+    def stop_words(self):
+        return get_stop_words()
 
+    @span("clean_text")
     def clean_text(self, text: str) -> str:
         """
         Clean text for NLP processing:
@@ -40,26 +101,42 @@ class TextPreprocessor:
         text = text.lower()
 
         # Remove URLs
-        text = re.sub(r"http\S+|www\S+", " ", text)
+        text = URL_PATTERN.sub(" ", text)
 
         # Remove numbers & special chars (keep alphabets)
-        text = re.sub(r"[^a-z\s]", " ", text)
+        text = NON_ALPHA_PATTERN.sub(" ", text)
 
         # Collapse extra spaces
-        text = re.sub(r"\s+", " ", text).strip()
+        text = SPACES_PATTERN.sub(" ", text).strip()
 
         # Tokenize
         words = text.split()
 
         # Remove stopwords & lemmatize
+        stop_words = get_stop_words()
         cleaned_words = [
-            self.lemmatizer.lemmatize(word)
+            lemmatize(word)
             for word in words
-            if word not in self.stop_words
+            if word not in stop_words
         ]
 
         return " ".join(cleaned_words)
 
+    def clean_batch(self, texts, workers=None, chunk_size=64):
+        """
+        Cleans many texts; output[i] == clean_text(texts[i]).
+        workers > 1 fans big batches out to a process pool.
+        """
+        texts = list(texts)
+
+        if not workers or workers <= 1 or len(texts) < PARALLEL_MIN_TEXTS:
+            return [self.clean_text(t) for t in texts]
+
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            results = pool.map(_clean_chunk, chunks)
+            return [cleaned for chunk in results for cleaned in chunk]
+
     def clean_and_tokenize(self, text: str):
         """Additional helper (OPTIONAL): returns token list instead of string."""
         cleaned = self.clean_text(text)
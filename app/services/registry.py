@@ -0,0 +1,141 @@
+# FILE: app/services/registry.py
+"""
+Process-wide engine registry.
+
+Streamlit re-executes app/main.py on every widget interaction, but
+imported modules survive reruns → engines built here are built once
+per server process and shared by every session.
+
+    python -m app.services.registry     # prints cold-start timings
+"""
+
+import os
+import threading
+import time
+
+_engines = {}
+_lock = threading.Lock()
+
+# Run one tiny encode when the embedding model is first built
+WARMUP_ON_BOOT = os.environ.get("ATS_WARMUP", "1") == "1"
+
+
+def _get(name, factory):
+    engine = _engines.get(name)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = factory()
+                _engines[name] = engine
+    return engine
+
+
+# ------------------------------------------------------------
+# Factories (imports deferred → importing the registry is cheap)
+# ------------------------------------------------------------
+def _build_embedding_model():
+    from app.services.embedding_model import EmbeddingModel
+    model = EmbeddingModel()
+    if WARMUP_ON_BOOT:
+        model.warmup()
+    return model
+
+
+def get_resume_parser():
+    from app.services.resume_parser import ResumeParser
+    return _get("resume_parser", ResumeParser)
+
+
+def get_jd_parser():
+    from app.services.jd_parser import JDParser
+    return _get("jd_parser", JDParser)
+
+
+def get_embedding_model():
+    return _get("embedding_model", _build_embedding_model)
+
+
+def get_similarity_engine():
+    from app.services.similarity_engine import SimilarityEngine
+    return _get("similarity_engine", SimilarityEngine)
+
+
+def get_scoring_engine():
+    from app.services.scoring_engine import ScoringEngine
+    return _get("scoring_engine", ScoringEngine)
+
+
+def get_extraction_pool(workers=None):
+    """Shared extraction pool; workers sizes it when first built (default: cores - 1)."""
+    from app.services.extraction_pool import ExtractionPool
+    return _get("extraction_pool", lambda: ExtractionPool(workers=workers))
+
+
+def get_corpus_search():
+    """Search over stored resumes (index loaded once, refreshed per query)."""
+    from app.services.corpus_search import CorpusSearch
+    return _get("corpus_search", CorpusSearch)
+
+
+def get_job_workers():
+    """Background scoring workers (ATS_JOB_WORKERS processes, started once)."""
+    from app.services.job_worker import start_workers, JOB_WORKERS
+    return _get("job_workers", lambda: start_workers(JOB_WORKERS) if JOB_WORKERS > 0 else None)
+
+
+def reset():
+    """Drops every engine (next get_* rebuilds it)."""
+    with _lock:
+        pool = _engines.pop("extraction_pool", None)
+        if pool is not None:
+            pool.close()
+        _engines.clear()
+
+
+# ------------------------------------------------------------
+# Cold-start measurement
+# ------------------------------------------------------------
+def measure_cold_start(sample_resume="python developer with sql and machine learning projects",
+                       sample_jd="looking for a python developer with sql"):
+    """
+    Seconds spent in each cold-start step of this process.
+    Call in a fresh interpreter for meaningful numbers.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    import app.services.resume_parser, app.services.jd_parser           # noqa: F401
+    import app.services.similarity_engine, app.services.scoring_engine  # noqa: F401
+    timings["import_services"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jd_parser = get_jd_parser()
+    get_resume_parser()
+    timings["build_parsers"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embed_model = get_embedding_model()
+    timings["build_embedding_model"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jd_info = jd_parser.process_jd(sample_jd)
+    resume_clean = jd_parser.preprocessor.clean_text(sample_resume)
+    jd_emb = embed_model.encode_document(jd_info["clean_text"])
+    resume_emb = embed_model.encode_document(resume_clean)
+    sim = get_similarity_engine().calculate_similarity(resume_emb, jd_emb)
+    get_scoring_engine().calculate_final_score(
+        sim, jd_parser.match_skills(sample_resume, jd_info["skills"]), jd_info["skills"]
+    )
+    timings["first_score"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jd_parser.process_jd(sample_jd)
+    timings["second_process_jd"] = time.perf_counter() - start
+
+    return {k: round(v, 4) for k, v in timings.items()}
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(measure_cold_start(), indent=2))
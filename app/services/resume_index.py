@@ -0,0 +1,259 @@
+# FILE: app/services/resume_index.py
+
+import os
+import numpy as np
+
+from app.utils.database import (
+    DB_PATH, create_tables, get_resume_embeddings, latest_embedding_dim,
+    get_deleted_resumes, last_deleted_seq
+)
+
+# Centroids live next to resume_system.db; vectors live in the DB itself
+INDEX_PATH = os.path.join(os.path.dirname(DB_PATH), "resume_index.npy")
+
+# Below this many vectors an exact scan is already fast enough
+MIN_TRAIN_SIZE = 1024
+
+# Rows read from the DB per refresh page
+LOAD_PAGE_SIZE = 50000
+
+
+class ResumeIndex:
+    def __init__(self, index_path=INDEX_PATH, nprobe=8, dim=None):
+        """
+        IVF (inverted file) index over stored resume embeddings, pure NumPy.
+        - Vectors are clustered with spherical k-means into n_lists cells
+        - A query only scans the nprobe closest cells
+        nprobe is the recall-vs-speed knob (nprobe = n_lists → exact).
+        Only vectors of size `dim` are indexed (default: the newest stored
+        vector's size → rows left by an older model are skipped).
+        """
+        create_tables()
+
+        self.index_path = index_path
+        self.nprobe = nprobe
+        self.dim = dim or latest_embedding_dim()
+
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = None
+        self.centroids = None
+        self._lists = []
+        self._last_id = 0
+        self._deleted_seq = last_deleted_seq()   # read before the rows → no delete is missed
+
+        if index_path and os.path.exists(index_path):
+            centroids = np.load(index_path)
+            if self.dim is None or centroids.shape[1] == self.dim:
+                self.centroids = centroids
+                self._lists = [[] for _ in range(len(centroids))]
+
+        self.refresh()
+
+    # ----------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------
+    @staticmethod
+    def _normalize(mat):
+        mat = np.asarray(mat, dtype=np.float32)
+        if mat.ndim == 1:
+            mat = mat.reshape(1, -1)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return mat / norms
+
+    def _assign(self, vectors, chunk_size=8192):
+        """Nearest centroid for each vector (chunked)."""
+        out = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], chunk_size):
+            block = vectors[start:start + chunk_size] @ self.centroids.T
+            out[start:start + chunk_size] = block.argmax(axis=1)
+        return out
+
+    def _add_to_lists(self, positions, assignments):
+        for pos, cell in zip(positions, assignments):
+            self._lists[cell].append(pos)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def reset(self, dim):
+        """Drops everything and re-indexes the stored vectors of size dim."""
+        self.dim = dim
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = None
+        self.centroids = None
+        self._lists = []
+        self._last_id = 0
+        self._deleted_seq = last_deleted_seq()
+        self.refresh()
+
+    def _match_dim(self, query_emb):
+        """A query from another model size → index that model's vectors instead."""
+        dim = np.asarray(query_emb).size
+        if dim != self.dim:
+            self.reset(dim)
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    # ----------------------------------------------------------
+    # Incremental update (new rows written by save_resume)
+    # ----------------------------------------------------------
+    def refresh(self, page_size=LOAD_PAGE_SIZE):
+        """
+        Drops resumes deleted since the last refresh, then loads
+        embeddings saved since (one page at a time) and files them into
+        their nearest cell.
+        Returns number of new vectors.
+        """
+        self._deleted_seq, deleted = get_deleted_resumes(self._deleted_seq)
+        if deleted:
+            self.remove(deleted)
+
+        if self.dim is None:
+            self.dim = latest_embedding_dim()
+            if self.dim is None:
+                return 0
+
+        added = 0
+        while True:
+            new_ids, new_vecs = get_resume_embeddings(
+                after_id=self._last_id, limit=page_size, dim=self.dim
+            )
+            if len(new_ids) == 0:
+                return added
+            added += self.add(new_ids, new_vecs)
+
+    def add(self, resume_ids, vectors):
+        """Adds vectors to the in-memory index (does not write the DB)."""
+        resume_ids = np.asarray(resume_ids, dtype=np.int64).ravel()
+        vectors = self._normalize(vectors)
+
+        start = len(self.ids)
+        self.ids = np.concatenate([self.ids, resume_ids])
+        self.vectors = vectors if self.vectors is None else np.vstack([self.vectors, vectors])
+        self._last_id = max(self._last_id, int(resume_ids.max()))
+
+        if self.is_trained:
+            if self.centroids.shape[1] != vectors.shape[1]:
+                # Model dimension changed → old centroids are useless
+                self.centroids = None
+                self._lists = []
+            else:
+                positions = range(start, start + len(resume_ids))
+                self._add_to_lists(positions, self._assign(vectors))
+
+        return len(resume_ids)
+
+    def remove(self, resume_ids):
+        """Drops resumes from the in-memory index → number removed."""
+        keep = ~np.isin(self.ids, np.asarray(resume_ids, dtype=np.int64))
+        removed = int((~keep).sum())
+        if not removed:
+            return 0
+
+        self.ids = self.ids[keep]
+        self.vectors = self.vectors[keep] if keep.any() else None
+        if self.is_trained:
+            # Positions shifted → refile what is left
+            self._lists = [[] for _ in range(len(self.centroids))]
+            if self.vectors is not None:
+                self._add_to_lists(range(len(self.ids)), self._assign(self.vectors))
+        return removed
+
+    # ----------------------------------------------------------
+    # Training (spherical k-means)
+    # ----------------------------------------------------------
+    def build(self, n_lists=None, n_iter=10, sample_size=50000, seed=42):
+        """
+        (Re)trains the cells over all stored vectors and saves the
+        centroids next to the database.
+        """
+        if self.vectors is None or len(self.ids) < MIN_TRAIN_SIZE:
+            return False
+
+        n = len(self.ids)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+
+        rng = np.random.default_rng(seed)
+        sample = self.vectors
+        if n > sample_size:
+            sample = self.vectors[rng.choice(n, sample_size, replace=False)]
+
+        self.centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = self._assign(sample)
+            for cell in range(n_lists):
+                members = sample[labels == cell]
+                if len(members):
+                    self.centroids[cell] = members.mean(axis=0)
+            self.centroids = self._normalize(self.centroids)
+
+        self._lists = [[] for _ in range(n_lists)]
+        self._add_to_lists(range(n), self._assign(self.vectors))
+
+        if self.index_path:
+            np.save(self.index_path, self.centroids)
+
+        return True
+
+    # ----------------------------------------------------------
+    # Search
+    # ----------------------------------------------------------
+    @staticmethod
+    def _top(scores, candidates, ids, k):
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+        part = np.argpartition(-scores, k - 1)[:k]
+        part = part[np.argsort(-scores[part], kind="stable")]
+        return [(int(ids[candidates[p]]), float(max(0.0, min(1.0, scores[p]))))
+                for p in part]
+
+    def exact_search(self, query_emb, k=10):
+        """Brute-force scan of every stored resume (reference results)."""
+        self._match_dim(query_emb)
+        if self.vectors is None:
+            return []
+
+        q = self._normalize(query_emb)[0]
+        scores = self.vectors @ q
+        return self._top(scores, np.arange(len(self.ids)), self.ids, k)
+
+    def search(self, query_emb, k=10, nprobe=None):
+        """
+        Approximate top-k resumes for a JD embedding.
+        Returns list of (resume_id, score), best first.
+        Falls back to exact search while the index is untrained.
+        """
+        self._match_dim(query_emb)
+        self.refresh()
+
+        if not self.is_trained or not self._lists:
+            return self.exact_search(query_emb, k)
+
+        nprobe = min(nprobe or self.nprobe, len(self._lists))
+        q = self._normalize(query_emb)[0]
+
+        cell_scores = self.centroids @ q
+        cells = np.argpartition(-cell_scores, nprobe - 1)[:nprobe]
+
+        candidates = np.fromiter(
+            (pos for cell in cells for pos in self._lists[cell]),
+            dtype=np.int64
+        )
+        if len(candidates) == 0:
+            return []
+
+        scores = self.vectors[candidates] @ q
+        return self._top(scores, candidates, self.ids, k)
+
+    def recall(self, query_emb, k=10, nprobe=None):
+        """Fraction of the exact top-k also returned by search()."""
+        exact = {rid for rid, _ in self.exact_search(query_emb, k)}
+        if not exact:
+            return 1.0
+        approx = {rid for rid, _ in self.search(query_emb, k, nprobe)}
+        return len(exact & approx) / len(exact)
@@ -1,8 +1,15 @@
 # FILE: app/services/resume_parser.py
 
-import pdfplumber
-import docx
 from app.services.preprocessor import TextPreprocessor
+from app.utils.metrics import span, inc
+from app.utils.pdf_text import extract_pdf_text, MAX_PAGES
+
+# DOCX has no stored page count → page breaks saved in the file are
+# counted; files without any are capped at this many characters per page
+DOCX_CHARS_PER_PAGE = 4000
+
+_PAGE_BREAKS = './/w:br[@w:type="page"]'
+_RENDERED_BREAKS = ".//w:lastRenderedPageBreak"
 
 class ResumeParser:
     def __init__(self):
@@ -11,36 +18,52 @@ class ResumeParser:
     # ------------------------------------------------------------
     # Extract text from PDF
     # ------------------------------------------------------------
-    def extract_text_from_pdf(self, file):
-        text = ""
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text += page_text + "\n"
-        return text.strip()
+    def extract_text_from_pdf(self, file, max_pages=MAX_PAGES):
+        # Fast text-stream pass, layout analysis only for pages that need it
+        return extract_pdf_text(file, max_pages=max_pages)
 
     # ------------------------------------------------------------
     # Extract text from DOCX
     # ------------------------------------------------------------
-    def extract_text_from_docx(self, file):
-        text = ""
+    def extract_text_from_docx(self, file, max_pages=MAX_PAGES):
+        import docx
+
         doc = docx.Document(file)
+        char_limit = max_pages * DOCX_CHARS_PER_PAGE if max_pages else None
+
+        # Word's last layout (breaks before a paragraph's text) if saved,
+        # else explicit page breaks (they end the paragraph's page)
+        rendered = bool(max_pages and doc.element.body.xpath(_RENDERED_BREAKS))
+
+        lines, page, chars = [], 1, 0
         for para in doc.paragraphs:
+            if max_pages and rendered:
+                page += len(para._p.xpath(_RENDERED_BREAKS))
+            if max_pages and (page > max_pages or chars > char_limit):
+                inc("docx_docs_capped")
+                break
+
             if para.text.strip():
-                text += para.text + "\n"
-        return text.strip()
+                lines.append(para.text)
+                chars += len(para.text)
+
+            if max_pages and not rendered:
+                page += len(para._p.xpath(_PAGE_BREAKS))
+
+        return "\n".join(lines).strip()
 
     # ------------------------------------------------------------
     # Main → Return BOTH raw text & cleaned text
     # ------------------------------------------------------------
-    def get_resume_text(self, uploaded_file):
+    @span("extract_text")
+    def get_resume_text(self, uploaded_file, max_pages=MAX_PAGES):
         filename = uploaded_file.name.lower()
 
         # RAW TEXT
         if filename.endswith(".pdf"):
-            raw_text = self.extract_text_from_pdf(uploaded_file)
+            raw_text = self.extract_text_from_pdf(uploaded_file, max_pages=max_pages)
         elif filename.endswith(".docx"):
-            raw_text = self.extract_text_from_docx(uploaded_file)
+            raw_text = self.extract_text_from_docx(uploaded_file, max_pages=max_pages)
         else:
             return None, None
 
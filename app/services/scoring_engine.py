@@ -1,5 +1,7 @@
 # FILE: app/services/scoring_engine.py
 
+from app.utils.metrics import span
+
 class ScoringEngine:
     def __init__(self):
         """
@@ -7,9 +9,12 @@ class ScoringEngine:
         - Semantic Similarity: 60%
         - Skill Match Score: 40%
         (ATS-style scoring system)
+        With a lexical (BM25) score available, the semantic part becomes
+        a hybrid: 70% SBERT similarity + 30% lexical relevance.
         """
         self.semantic_weight = 0.60
         self.skill_weight = 0.40
+        self.lexical_weight = 0.30
 
     # ----------------------------------------------------------
     # Skill overlap score (JD skills vs Resume skills)
@@ -38,13 +43,33 @@ class ScoringEngine:
 
         return skill_score
 
+    # ----------------------------------------------------------
+    # Hybrid relevance (semantic + lexical)
+    # ----------------------------------------------------------
+    def hybrid_similarity(self, semantic_value, lexical_value):
+        """
+        Blends SBERT similarity with normalized BM25 (both 0–1).
+        semantic_value None → resume was not shortlisted / embedded,
+        only its lexical share counts.
+        """
+        semantic_value = max(0.0, min(1.0, semantic_value or 0.0))
+        lexical_value = max(0.0, min(1.0, lexical_value or 0.0))
+        return round(
+            (1.0 - self.lexical_weight) * semantic_value + self.lexical_weight * lexical_value, 4
+        )
+
     # ----------------------------------------------------------
     # Final combined scoring (semantic + skills)
     # ----------------------------------------------------------
-    def calculate_final_score(self, semantic_value, resume_skills, jd_skills):
+    @span("scoring")
+    def calculate_final_score(self, semantic_value, resume_skills, jd_skills, lexical_value=None):
         """
         Returns final weighted ATS score (0–100).
+        lexical_value (0–1) switches the semantic part to the hybrid score.
         """
+        if lexical_value is not None:
+            semantic_value = self.hybrid_similarity(semantic_value, lexical_value)
+
         # Clamp similarity between 0–1
         semantic_value = max(0.0, min(1.0, semantic_value))
 
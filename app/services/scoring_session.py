@@ -0,0 +1,288 @@
+# FILE: app/services/scoring_session.py
+
+import hashlib
+import os
+
+from app.services.registry import (
+    get_jd_parser,
+    get_embedding_model,
+    get_similarity_engine,
+    get_scoring_engine,
+    get_extraction_pool
+)
+from app.services.lexical_index import SHORTLIST_SIZE, shortlist_texts
+from app.utils.database import (
+    save_resume, save_resume_embedding, save_jd, save_result, flush, submit_job, find_job
+)
+from app.utils.section_parser import SectionParser
+from app.utils.constants import CHUNKED_EMBEDDINGS, CHUNK_POOLING
+from app.utils.metrics import span, inc
+
+
+def fingerprint_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScoringSession:
+    def __init__(self):
+        """
+        Incremental scoring state for one user session.
+        Every upload / JD is fingerprinted (SHA-256) and its parsed,
+        cleaned and embedded artifacts are kept per fingerprint, so a
+        rerun only processes what changed and nothing is saved twice.
+        """
+        self.jds = {}         # jd fingerprint → JD artifacts
+        self.resumes = {}     # file fingerprint → resume artifacts (readable only)
+        self.failed = {}      # file fingerprint → error (last run; retried next run)
+        self.scores = {}      # (resume fp, jd fp) → score dict
+
+    # --------------------------------------------------------
+    # JD
+    # --------------------------------------------------------
+    def set_jd(self, jd_text: str):
+        """Processes the JD once per distinct text. Returns its artifacts (saved when scored)."""
+        fp = fingerprint_text(jd_text)
+        jd = self.jds.get(fp)
+        if jd is not None:
+            return jd
+
+        jd_info = get_jd_parser().process_jd(jd_text)
+        jd = {
+            "fingerprint": fp,
+            "clean_text": jd_info["clean_text"],
+            "skills": jd_info["skills"],
+            "role": jd_info["role"],
+            "raw_text": jd_text,
+            "embedding": None,
+            "id": None,
+        }
+        self.jds[fp] = jd
+        return jd
+
+    def _saved_jd(self, jd_text: str):
+        """JD artifacts, saved to the DB the first time they are scored."""
+        jd = self.set_jd(jd_text)
+        if jd["id"] is None:
+            jd["id"] = save_jd(
+                raw_jd=jd["raw_text"],
+                clean_jd=jd["clean_text"],
+                skills=jd["skills"],
+                role=jd["role"]
+            )
+        return jd
+
+    # --------------------------------------------------------
+    # Resumes
+    # --------------------------------------------------------
+    def add_resumes(self, files, embed=True):
+        """
+        Extracts, embeds and saves only uploads not seen before.
+        embed=False defers embedding (lexical shortlist decides later).
+        Unreadable files are not cached, so the next run tries them again.
+        Returns fingerprints aligned with `files`.
+        """
+        fps = [fingerprint_bytes(f.getvalue()) for f in files]
+        self.failed = {}
+
+        new = {}
+        for file, fp in zip(files, fps):
+            if fp not in self.resumes and fp not in new:
+                new[fp] = file
+
+        if new:
+            extracted = get_extraction_pool().extract_all(list(new.values()))
+            ok = []
+            for (fp, file), item in zip(new.items(), extracted):
+                error = item["error"] or (None if item["raw_text"] else "no text found")
+                if error:
+                    self.failed[fp] = error
+                    continue
+                resume = {
+                    "fingerprint": fp,
+                    "name": os.path.splitext(file.name)[0],
+                    "raw_text": item["raw_text"],
+                    "clean_text": item["clean_text"],
+                    "embedding": None,
+                    "id": None,
+                }
+                resume["sections"] = item.get("sections") or SectionParser.get_sections(resume["raw_text"])
+                self.resumes[fp] = resume
+                ok.append((resume, file))
+
+            if ok:
+                if embed:
+                    self._embed([r for r, _ in ok])
+                pending = []
+                for resume, file in ok:
+                    sections = resume["sections"]
+                    pending.append(save_resume(
+                        filename=resume["name"],
+                        filedata=file.getvalue(),
+                        clean_text=resume["clean_text"],
+                        skills=get_jd_parser().extract_skills(resume["raw_text"]),
+                        name=sections["name"],
+                        email=sections["email"],
+                        phone=sections["phone"],
+                        education=sections["education"],
+                        experience=sections["experience"],
+                        projects=sections["projects"],
+                        embedding=resume["embedding"],
+                        wait=False
+                    ))
+                for (resume, _), write in zip(ok, pending):
+                    resume["id"] = write.result()
+
+        # Forget uploads the user removed (bounded memory per session)
+        keep = set(fps)
+        self.resumes = {fp: r for fp, r in self.resumes.items() if fp in keep}
+        self.scores = {key: v for key, v in self.scores.items() if key[0] in keep}
+
+        return fps
+
+    def _embed(self, resumes):
+        """Whole-text or chunked embeddings (chunk vectors kept per resume)."""
+        model = get_embedding_model()
+        texts = [r["clean_text"] for r in resumes]
+
+        if CHUNKED_EMBEDDINGS:
+            for resume, doc in zip(resumes, model.embed_documents(texts, CHUNK_POOLING)):
+                resume["embedding"] = doc["embedding"]
+                resume["chunks"] = doc["chunks"]
+                resume["chunk_embeddings"] = doc["chunk_embeddings"]
+            return
+
+        for resume, emb in zip(resumes, model.encode_documents(texts)):
+            resume["embedding"] = emb
+
+    # --------------------------------------------------------
+    # Scoring
+    # --------------------------------------------------------
+    @span("score_run")
+    def score(self, files, jd_text: str):
+        """
+        Scores uploads against the JD, recomputing only new
+        (resume, JD) pairs. Returns (resumes, scores) for readable files,
+        in upload order.
+        With a shortlist size set (ATS_SHORTLIST_SIZE), a BM25 pass over
+        the uploads picks the top-N for this JD; only those are embedded
+        and scored semantically (hybrid score), the rest keep their
+        lexical + skill score and are not saved as matches.
+        """
+        jd = self._saved_jd(jd_text)
+        if jd["embedding"] is None:
+            jd["embedding"] = get_embedding_model().encode_document(jd["clean_text"])
+
+        shortlisting = SHORTLIST_SIZE > 0
+        fps = self.add_resumes(files, embed=not shortlisting)
+        readable = [fp for fp in dict.fromkeys(fps) if fp in self.resumes]
+
+        lexical = {}
+        shortlist = set(readable)
+        if shortlisting and readable:
+            picked, lex_scores = shortlist_texts(
+                [self.resumes[fp]["clean_text"] for fp in readable], jd["clean_text"], SHORTLIST_SIZE
+            )
+            lexical = dict(zip(readable, lex_scores.tolist()))
+            shortlist = {readable[i] for i in picked}
+
+        # Shortlisted later, or the embedding failed last time → (re)try
+        self._embed_late([self.resumes[fp] for fp in readable
+                          if fp in shortlist and self.resumes[fp]["embedding"] is None])
+        embedded = {fp for fp in shortlist if self.resumes[fp]["embedding"] is not None}
+
+        todo = [fp for fp in readable
+                if (fp, jd["fingerprint"]) not in self.scores
+                or self.scores[(fp, jd["fingerprint"])]["shortlisted"] != (fp in embedded)]
+
+        inc("documents_scored", len(todo))
+        if todo:
+            semantic = [fp for fp in todo if fp in embedded]
+            sims = dict(zip(semantic, get_similarity_engine().batch_similarity(
+                [self.resumes[fp]["embedding"] for fp in semantic], jd["embedding"]
+            ))) if semantic else {}
+            jd_parser = get_jd_parser()
+            scoring_engine = get_scoring_engine()
+
+            for fp in todo:
+                resume = self.resumes[fp]
+                sim = sims.get(fp)
+                skills = jd_parser.match_skills(resume["raw_text"], jd["skills"])
+                final = scoring_engine.calculate_final_score(
+                    sim or 0.0, skills, jd["skills"], lexical_value=lexical.get(fp)
+                )
+
+                self.scores[(fp, jd["fingerprint"])] = {
+                    "semantic_score": sim,
+                    "lexical_score": lexical.get(fp),
+                    "skills": skills,
+                    "final_score": final,
+                    "shortlisted": fp in embedded,
+                }
+                if sim is not None:
+                    save_result(
+                        resume_id=resume["id"],
+                        jd_id=jd["id"],
+                        semantic_score=sim,
+                        final_score=final,
+                        wait=False
+                    )
+            flush()
+
+        # BM25 is normalised over this upload set, so cached pairs get
+        # this run's lexical score too (otherwise rows aren't comparable)
+        if lexical:
+            scoring_engine = get_scoring_engine()
+            for fp in readable:
+                entry = self.scores[(fp, jd["fingerprint"])]
+                entry["lexical_score"] = lexical[fp]
+                entry["final_score"] = scoring_engine.calculate_final_score(
+                    entry["semantic_score"] or 0.0, entry["skills"], jd["skills"],
+                    lexical_value=lexical[fp]
+                )
+
+        resumes, scores = [], []
+        for fp in fps:
+            if fp in self.resumes:
+                resumes.append(self.resumes[fp])
+                scores.append(self.scores[(fp, jd["fingerprint"])])
+        return resumes, scores
+
+    def _embed_late(self, resumes):
+        """Embeds already saved resumes (shortlisted later) and stores their vectors."""
+        if not resumes:
+            return
+        self._embed(resumes)
+        for resume in resumes:
+            if resume["embedding"] is not None and resume["id"] is not None:
+                save_resume_embedding(resume["id"], resume["embedding"], wait=False)
+
+    # --------------------------------------------------------
+    # Background jobs (large uploads)
+    # --------------------------------------------------------
+    def submit(self, files, jd_text: str):
+        """
+        Queues these uploads for the background workers → job id.
+        The same files + JD map to the same job, so a rerun or a browser
+        refresh reattaches to it instead of starting over.
+        """
+        jd = self._saved_jd(jd_text)
+        fps = sorted(fingerprint_bytes(f.getvalue()) for f in files)
+        signature = fingerprint_text(jd["fingerprint"] + ":" + ",".join(fps))
+
+        job_id = find_job(signature)
+        if job_id is None:
+            job_id = submit_job(jd["id"], [(f.name, f.getvalue()) for f in files], signature)
+        return job_id
+
+    def errors(self, files):
+        """(filename, error) for uploads that could not be read."""
+        out = []
+        for file in files:
+            error = self.failed.get(fingerprint_bytes(file.getvalue()))
+            if error:
+                out.append((file.name, error))
+        return out
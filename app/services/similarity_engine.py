@@ -1,7 +1,12 @@
 # FILE: app/services/similarity_engine.py
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+
+from app.utils.metrics import span
+
+# Resumes scored per block in the matrix kernels (bounds peak memory)
+DEFAULT_CHUNK_SIZE = 4096
+
 
 class SimilarityEngine:
 
@@ -18,6 +23,8 @@ class SimilarityEngine:
             return 0.0
 
         try:
+            from sklearn.metrics.pairwise import cosine_similarity
+
             # Convert to numpy arrays
             r_vec = np.array(resume_emb).reshape(1, -1)
             jd_vec = np.array(jd_emb).reshape(1, -1)
@@ -33,6 +40,95 @@ class SimilarityEngine:
         except Exception:
             return 0.0
 
+    # ----------------------------------------------------------
+    # Row normalization (done ONCE per embedding block)
+    # ----------------------------------------------------------
+    @staticmethod
+    def normalize(embeddings):
+        """
+        Returns a float32 (n x d) matrix with unit-length rows.
+        Zero rows stay zero (their similarity is 0); so do missing
+        vectors (None = text that could not be embedded). An empty
+        input gives a (0 x 0) matrix, not one empty row.
+        """
+        if isinstance(embeddings, (list, tuple)) and any(e is None for e in embeddings):
+            dim = next((len(e) for e in embeddings if e is not None), 0)
+            embeddings = [np.zeros(dim, dtype=np.float32) if e is None else e for e in embeddings]
+
+        mat = np.asarray(embeddings, dtype=np.float32)
+        if mat.ndim == 1:
+            mat = mat.reshape(1, -1) if mat.size else mat.reshape(0, 0)
+
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return mat / norms
+
+    # ----------------------------------------------------------
+    # Full score matrix → N resumes vs M JDs
+    # ----------------------------------------------------------
+    @span("similarity")
+    def similarity_matrix(self, resume_embeddings, jd_embeddings,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Cosine similarity of every resume against every JD.
+        resume_embeddings: (N x d), jd_embeddings: (M x d)
+        Returns (N x M) float32 matrix clamped to 0–1.
+        """
+        resumes = self.normalize(resume_embeddings)
+        jds = self.normalize(jd_embeddings)
+        if 0 in resumes.shape or 0 in jds.shape:
+            return np.zeros((resumes.shape[0], jds.shape[0]), dtype=np.float32)   # nothing to score
+
+        scores = np.empty((resumes.shape[0], jds.shape[0]), dtype=np.float32)
+        for start in range(0, resumes.shape[0], chunk_size):
+            block = resumes[start:start + chunk_size] @ jds.T
+            np.clip(block, 0.0, 1.0, out=scores[start:start + chunk_size])
+
+        return scores
+
+    # ----------------------------------------------------------
+    # Per-JD top-k (partial sort, chunked over resumes)
+    # ----------------------------------------------------------
+    @span("similarity")
+    def top_k(self, resume_embeddings, jd_embeddings, k=10,
+              chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Best k resumes for each JD without materialising the N x M matrix.
+        Returns (indices, scores), both (M x k), best first.
+        """
+        resumes = self.normalize(resume_embeddings)
+        jds = self.normalize(jd_embeddings)
+        k = min(k, resumes.shape[0])
+        if k == 0 or not jds.shape[0]:
+            return (np.empty((jds.shape[0], 0), dtype=np.int64),
+                    np.empty((jds.shape[0], 0), dtype=np.float32))
+
+        best_idx = np.empty((jds.shape[0], 0), dtype=np.int64)
+        best_scores = np.empty((jds.shape[0], 0), dtype=np.float32)
+
+        for start in range(0, resumes.shape[0], chunk_size):
+            block = jds @ resumes[start:start + chunk_size].T   # (M x c)
+            block_idx = np.broadcast_to(
+                np.arange(start, start + block.shape[1]), block.shape
+            )
+
+            cand_scores = np.hstack([best_scores, block])
+            cand_idx = np.hstack([best_idx, block_idx])
+
+            # Keep only the k best candidates per JD
+            if cand_scores.shape[1] > k:
+                part = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+                cand_scores = np.take_along_axis(cand_scores, part, axis=1)
+                cand_idx = np.take_along_axis(cand_idx, part, axis=1)
+
+            best_scores, best_idx = cand_scores, cand_idx
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_idx = np.take_along_axis(best_idx, order, axis=1)
+
+        return best_idx, np.clip(best_scores, 0.0, 1.0)
+
     # ----------------------------------------------------------
     # Batch similarity → MANY resumes vs one JD
     # ----------------------------------------------------------
@@ -45,9 +141,8 @@ class SimilarityEngine:
         if jd_emb is None or len(resume_embeddings) == 0:
             return []
 
-        scores = []
-        for emb in resume_embeddings:
-            score = self.calculate_similarity(emb, jd_emb)
-            scores.append(score)
-
-        return scores
+        try:
+            scores = self.similarity_matrix(resume_embeddings, jd_emb)[:, 0]
+            return [float(s) for s in scores]
+        except Exception:
+            return [self.calculate_similarity(emb, jd_emb) for emb in resume_embeddings]
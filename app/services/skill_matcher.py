@@ -0,0 +1,83 @@
+# FILE: app/services/skill_matcher.py
+
+import re
+
+# Tokens keep the symbols used in skill names (c++, c#, node.js)
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+_END = "\0"   # trie key marking "a skill ends here"
+
+
+def tokenize(text: str):
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    # Sentence dots are not part of a skill ("python." → "python")
+    return [t.rstrip(".") for t in tokens if t.rstrip(".")]
+
+
+class SkillMatcher:
+    def __init__(self, skills, aliases=None):
+        """
+        Compiled multi-pattern skill matcher (token trie).
+        - Matches whole words only ("ml" never matches inside "html")
+        - Multi-word skills ("machine learning") are matched as phrases
+        - Aliases fold to their canonical skill ("tf" → "tensorflow")
+        Build once, reuse: one pass over the text finds every skill,
+        independent of vocabulary size.
+        """
+        self.root = {}
+        self.max_len = 0
+
+        for skill in skills:
+            self.add(skill, skill)
+
+        # A canonical skill always reports itself (an alias never hides it)
+        for alias, canonical in (aliases or {}).items():
+            if canonical in skills and alias not in skills:
+                self.add(alias, canonical)
+
+    def add(self, phrase, canonical):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+
+        node = self.root
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        node[_END] = canonical
+        self.max_len = max(self.max_len, len(tokens))
+
+    # --------------------------------------------------------
+    # Single pass over the text (longest match at each token)
+    # --------------------------------------------------------
+    def find_all(self, text: str):
+        """Returns canonical skills found in text (first-seen order, unique)."""
+        if not text or not isinstance(text, str):
+            return []
+
+        tokens = tokenize(text)
+        found = {}
+
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            match, match_end = None, i
+
+            for j in range(i, min(i + self.max_len, len(tokens))):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    match, match_end = node[_END], j + 1
+
+            if match is not None:
+                found.setdefault(match, None)
+                i = match_end
+            else:
+                i += 1
+
+        return list(found)
+
+    def match(self, text: str, skills):
+        """Which of `skills` (e.g. JD skills) appear in text."""
+        found = set(self.find_all(text))
+        return [s for s in skills if s in found]
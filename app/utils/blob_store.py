@@ -0,0 +1,75 @@
+# FILE: app/utils/blob_store.py
+
+import hashlib
+import os
+import tempfile
+
+# Original resume files, content-addressed: resume_files/ab/cd/abcd...
+BLOB_DIR = os.path.join(os.getcwd(), "resume_files")
+
+CHUNK_SIZE = 64 * 1024
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_path(sha256: str, root=BLOB_DIR) -> str:
+    """Two-level sharding keeps directories small (65k buckets)."""
+    return os.path.join(root, sha256[:2], sha256[2:4], sha256)
+
+
+def put_blob(data: bytes, root=BLOB_DIR) -> str:
+    """
+    Stores bytes once per distinct content.
+    Returns the SHA-256 key (an existing identical file is reused).
+    """
+    sha256 = hash_bytes(data)
+    path = blob_path(sha256, root)
+    if os.path.exists(path):
+        return sha256
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Write to a temp file + rename → readers never see half a file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return sha256
+
+
+def has_blob(sha256: str, root=BLOB_DIR) -> bool:
+    return os.path.exists(blob_path(sha256, root))
+
+
+def iter_blob(sha256: str, chunk_size=CHUNK_SIZE, root=BLOB_DIR):
+    """Streams a stored file in chunks (never holds it all in memory)."""
+    with open(blob_path(sha256, root), "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def open_blob(sha256: str, root=BLOB_DIR):
+    """Binary file object over a stored file (caller closes it)."""
+    return open(blob_path(sha256, root), "rb")
+
+
+def read_blob(sha256: str, root=BLOB_DIR) -> bytes:
+    with open(blob_path(sha256, root), "rb") as f:
+        return f.read()
+
+
+def delete_blob(sha256: str, root=BLOB_DIR):
+    path = blob_path(sha256, root)
+    if os.path.exists(path):
+        os.remove(path)
@@ -11,9 +11,28 @@ SKILL_VOCAB = {
     "python", "sql", "mysql", "nlp", "machine learning", "ml",
     "deep learning", "pandas", "numpy", "matplotlib", "seaborn",
     "statistics", "probability", "data analysis", "nltk",
-    "tensorflow", "pytorch", "git", "github"
+    "tensorflow", "pytorch", "git", "github",
+    "communication", "problem solving"
 }
 
+# Alias / synonym → canonical skill (folded by SkillMatcher).
+# Never alias a word that is itself in SKILL_VOCAB, and never fold a
+# specific skill into a generic one (postgresql is not "sql")
+SKILL_ALIASES = {
+    "dl": "deep learning",
+    "natural language processing": "nlp",
+    "torch": "pytorch",
+    "tf": "tensorflow",
+    "stats": "statistics",
+    "data analytics": "data analysis",
+    "my sql": "mysql",
+}
+
+# Long resumes are embedded as overlapping token windows (the model
+# truncates at 256 word-pieces) pooled back into one vector
+CHUNKED_EMBEDDINGS = True
+CHUNK_POOLING = "mean"      # "mean" | "max" | "attention"
+
 # Common JD noise words
 JD_NOISE_WORDS = {
     "responsible", "excellent", "requirements", "preferred",
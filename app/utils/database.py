@@ -1,18 +1,333 @@
 # FILE: app/utils/database.py
 
-import sqlite3
+import atexit
+import io
 import os
+import queue
+import sqlite3
+import threading
+import time
 from datetime import datetime
 
+import numpy as np
+
+from app.utils.blob_store import put_blob, has_blob, read_blob, iter_blob, open_blob, delete_blob
+from app.utils.metrics import span, inc, attach, current_runs
+
 DB_PATH = os.path.join(os.getcwd(), "resume_system.db")
 
+# Max inserts grouped into one transaction by the writer
+WRITE_BATCH_SIZE = 500
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+# Listing columns (never the file BLOB)
+RESUME_LIST_COLUMNS = "id, filename, name, email, phone, uploaded_at"
+RESUME_DETAIL_COLUMNS = (
+    "id, filename, clean_text, skills, name, email, phone, "
+    "education, experience, projects, uploaded_at"
+)
+JD_LIST_COLUMNS = "id, role, skills, uploaded_at"
+
+# Running job with no heartbeat for this long → its worker died, reclaim
+JOB_STALE_SECONDS = 300
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# ---------------- READ CONNECTION ----------------
+_local = threading.local()
+
+
+def get_connection():
+    """
+    Long-lived connection for the calling thread: reads, plus the DDL of
+    create_tables (idempotent, before any queued write). Every data
+    write goes through the writer below. Reopened after a fork.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = _connect()
+        _local.conn = conn
+        _local.pid = os.getpid()
     return conn
 
 
+# ================================================================
+#                 SINGLE WRITER (write-behind queue)
+# ================================================================
+class PendingWrite:
+    """
+    Handle for a queued write; result() blocks until it is committed.
+    Either one statement (sql, params; want_id → result() is its
+    lastrowid) or a transaction body work(cursor, unused) → result();
+    `unused` collects blob SHA-256s to unlink once committed.
+    """
+
+    def __init__(self, sql, params, follow_up=None, want_id=True, work=None):
+        self.sql = sql
+        self.params = params
+        self.follow_up = follow_up      # fn(rowid) -> (sql, params) | [(sql, params)] | None
+        self.want_id = want_id
+        self.work = work
+        self.runs = current_runs()      # submitter's breakdowns (commit time counts there)
+        self.rowid = None
+        self.error = None
+        self._done = threading.Event()
+
+    def _resolve(self, rowid=None, error=None):
+        self.rowid = rowid
+        self.error = error
+        self._done.set()
+
+    def result(self, timeout=None):
+        self._done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.rowid
+
+
+class DatabaseWriter:
+    def __init__(self, batch_size=WRITE_BATCH_SIZE):
+        """
+        One writer thread + one WAL connection per process.
+        Queued writes are committed together, so N inserts cost one
+        transaction instead of N fsyncs.
+        """
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql, params, follow_up=None, want_id=True):
+        write = PendingWrite(sql, params, follow_up, want_id)
+        self._queue.put(write)
+        return write
+
+    def submit_work(self, work):
+        """Queues a transaction body work(cursor, unused) (see PendingWrite)."""
+        write = PendingWrite(None, None, work=work)
+        self._queue.put(write)
+        return write
+
+    def flush(self):
+        """Blocks until everything queued so far is committed."""
+        self._queue.join()
+
+    # ------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------
+    def _run(self):
+        conn = _connect()
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with attach(run for write in batch for run in write.runs):
+                    try:
+                        self._commit(conn, batch)
+                    except Exception as e:
+                        conn.rollback()
+                        if len(batch) == 1:
+                            batch[0]._resolve(error=e)
+                        else:
+                            self._commit_one_by_one(conn, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _commit_one_by_one(self, conn, batch):
+        """A failed batch is retried per write → only the offender fails."""
+        inc("db_batch_retries")
+        for write in batch:
+            try:
+                self._commit(conn, [write])
+            except Exception as e:
+                conn.rollback()
+                write._resolve(error=e)
+
+    @staticmethod
+    def _execute_grouped(cursor, statements):
+        """
+        Runs (sql, params, want_id) statements in order.
+        Returns the rowid of every statement that wants it
+        (cursor.lastrowid, read per statement → no assumption that ids
+        are consecutive), None for the others. Consecutive statements
+        with the same SQL whose ids are not wanted share one executemany
+        (order is kept).
+        """
+        rowids = []
+        pos = 0
+        while pos < len(statements):
+            sql, params, want_id = statements[pos]
+            if want_id:
+                cursor.execute(sql, params)
+                rowids.append(cursor.lastrowid)
+                pos += 1
+                continue
+
+            end = pos + 1
+            while end < len(statements) and statements[end][0] == sql and not statements[end][2]:
+                end += 1
+            cursor.executemany(sql, [p for _, p, _ in statements[pos:end]])
+            rowids.extend([None] * (end - pos))
+            pos = end
+
+        return rowids
+
+    @span("db_commit")
+    def _commit(self, conn, batch):
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+
+        # Statements grouped as before; transaction bodies run in queue order
+        rowids = []
+        unused = []
+        pos = 0
+        while pos < len(batch):
+            if batch[pos].work is not None:
+                rowids.append(batch[pos].work(cursor, unused))
+                pos += 1
+                continue
+            end = pos
+            while end < len(batch) and batch[end].work is None:
+                end += 1
+            rowids.extend(self._execute_grouped(
+                cursor, [(w.sql, w.params, w.want_id) for w in batch[pos:end]]
+            ))
+            pos = end
+
+        follow_ups = []
+        for write, rowid in zip(batch, rowids):
+            if write.follow_up is not None:
+                stmt = write.follow_up(rowid)
+                if isinstance(stmt, list):
+                    follow_ups.extend(stmt)
+                elif stmt is not None:
+                    follow_ups.append(stmt)
+        if follow_ups:
+            self._execute_grouped(cursor, [(sql, params, False) for sql, params in follow_ups])
+
+        conn.commit()
+        inc("db_rows_written", len(batch) + len(follow_ups))
+
+        try:
+            _drop_blobs(conn, unused)
+        except Exception:
+            conn.rollback()   # an orphaned file is harmless; the rows are committed
+
+        for write, rowid in zip(batch, rowids):
+            write._resolve(rowid)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer._pid != os.getpid():
+            _writer = DatabaseWriter()
+        return _writer
+
+
+def flush():
+    """Read-your-writes: wait until every queued insert is committed."""
+    if _writer is not None and _writer._pid == os.getpid():
+        with span("db_flush"):
+            _writer.flush()
+
+
+atexit.register(flush)
+
+
+def _submit(sql, params, wait, follow_up=None, want_id=True):
+    write = get_writer().submit(sql, params, follow_up, want_id)
+    return write.result() if wait else write
+
+
+def _transact(work, wait=True):
+    """
+    Runs work(cursor, unused) as one writer transaction → its return
+    value (or the PendingWrite when wait=False).
+    """
+    write = get_writer().submit_work(work)
+    return write.result() if wait else write
+
+
+# Batch CLI checkpoint: (run, resume_file, jd_file) → row written for it
+# (resume: jd_file "", JD: resume_file "", result: both set)
+CHECKPOINT_SQL = """
+    INSERT OR REPLACE INTO batch_checkpoints (run, resume_file, jd_file, row_id)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+def _chain(follow_up, extra):
+    """follow_up + extra(rowid) → one follow-up (all in the same transaction)."""
+    def combined(rowid):
+        stmts = []
+        if follow_up is not None:
+            stmt = follow_up(rowid)
+            stmts.extend(stmt if isinstance(stmt, list) else [stmt] if stmt else [])
+        stmts.append(extra(rowid))
+        return stmts
+
+    return combined
+
+
+def _with_checkpoint(follow_up, checkpoint):
+    """Adds the checkpoint row to a write's follow-ups (same transaction)."""
+    if checkpoint is None:
+        return follow_up
+    return _chain(follow_up, lambda rowid: (CHECKPOINT_SQL, tuple(checkpoint) + (rowid,)))
+
+
+def _with_job_item(follow_up, job_item, sql, params=()):
+    """
+    Records the new row id on a job item in the same transaction → a
+    retried item finds it instead of saving the row again.
+    """
+    if job_item is None:
+        return follow_up
+    return _chain(follow_up, lambda rowid: (sql, (rowid,) + tuple(params) + (job_item,)))
+
+
+BLOB_REF_SQL = """
+    INSERT INTO file_blobs (sha256, size, refcount) VALUES (?, ?, 1)
+    ON CONFLICT(sha256) DO UPDATE SET refcount = refcount + 1
+"""
+
+
+def _ensure_blob(sha256, data):
+    """
+    Call inside the transaction that took the reference: a concurrent
+    delete (refcount hit 0 between put_blob and the reference) may have
+    removed the file; holding the write lock, it cannot happen again.
+    """
+    if not has_blob(sha256):
+        put_blob(data)
+
+
+def _blob_ref_follow_up(sha256, data):
+    def follow_up(_rowid):
+        _ensure_blob(sha256, data)
+        return None
+    return follow_up
+
+
 def create_tables():
     conn = get_connection()
     cursor = conn.cursor()
@@ -31,7 +346,22 @@ def create_tables():
             education TEXT,
             experience TEXT,
             projects TEXT,
-            uploaded_at TIMESTAMP
+            uploaded_at TIMESTAMP,
+            file_sha256 TEXT
+        );
+    """)
+
+    # Older DBs: original file moved from the BLOB column to the blob store
+    columns = {row["name"] for row in cursor.execute("PRAGMA table_info(resumes)")}
+    if "file_sha256" not in columns:
+        cursor.execute("ALTER TABLE resumes ADD COLUMN file_sha256 TEXT")
+
+    # FILE BLOBS TABLE (reference counts of the content-addressed store)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS file_blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER,
+            refcount INTEGER
         );
     """)
 
@@ -59,25 +389,119 @@ def create_tables():
         );
     """)
 
+    # RESUME EMBEDDINGS TABLE (feeds the resume vector index)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resume_embeddings (
+            resume_id INTEGER PRIMARY KEY,
+            dim INTEGER,
+            vector BLOB
+        );
+    """)
+
+    # BACKGROUND SCORING JOBS (queue + one row per uploaded file)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            signature TEXT,
+            jd_id INTEGER,
+            status TEXT,
+            worker TEXT,
+            error TEXT,
+            heartbeat REAL,
+            created_at TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            position INTEGER,
+            filename TEXT,
+            file_sha256 TEXT,
+            status TEXT,
+            attempts INTEGER DEFAULT 0,
+            error TEXT,
+            resume_id INTEGER,
+            result_id INTEGER,
+            semantic_score REAL,
+            final_score REAL,
+            skills TEXT
+        );
+    """)
+
+    # DELETED RESUMES (tombstones → in-memory corpus indexes drop them)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS deleted_resumes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            resume_id INTEGER
+        );
+    """)
+
+    # INDEXES (listing order + result joins)
+    # BATCH CLI CHECKPOINTS (rows already written per output file)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS batch_checkpoints (
+            run TEXT,
+            resume_file TEXT,
+            jd_file TEXT,
+            row_id INTEGER,
+            PRIMARY KEY (run, resume_file, jd_file)
+        );
+    """)
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resumes_uploaded ON resumes (uploaded_at, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jds_uploaded ON job_descriptions (uploaded_at, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_matched ON results (matched_at, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_resume ON results (resume_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_results_jd ON results (jd_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resumes_sha ON resumes (file_sha256)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_signature ON jobs (signature)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_items_job ON job_items (job_id, status, position)")
+
     conn.commit()
-    conn.close()
 
 
 # ---------------- SAVE RESUME ----------------
 def save_resume(filename, filedata, clean_text, skills,
-                name, email, phone, education, experience, projects):
+                name, email, phone, education, experience, projects,
+                embedding=None, wait=True, checkpoint=None, job_item=None):
+    """
+    Queues a resume insert. Returns the new row id, or a PendingWrite
+    when wait=False (call .result() / flush() later).
+    checkpoint = (run, resume_file, jd_file) is recorded in
+    batch_checkpoints in the same transaction (batch CLI resume);
+    job_item (a job_items id) gets the new resume_id the same way.
+    """
+    follow_up = None
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    # Store the vector so the resume index can pick it up incrementally
+    if embedding is not None:
+        vec = np.asarray(embedding, dtype=np.float32).ravel()
 
-    cursor.execute("""
-        INSERT INTO resumes 
-        (filename, filedata, clean_text, skills,
+        def follow_up(resume_id):
+            return ("""
+                INSERT OR REPLACE INTO resume_embeddings (resume_id, dim, vector)
+                VALUES (?, ?, ?)
+            """, (resume_id, vec.shape[0], vec.tobytes()))
+
+    # Original file → content-addressed store (identical uploads stored once)
+    file_sha256 = None
+    if filedata:
+        file_sha256 = put_blob(filedata)
+        _submit(BLOB_REF_SQL, (file_sha256, len(filedata)), wait=False,
+                follow_up=_blob_ref_follow_up(file_sha256, filedata), want_id=False)
+
+    return _submit("""
+        INSERT INTO resumes
+        (filename, file_sha256, clean_text, skills,
          name, email, phone, education, experience, projects, uploaded_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
         filename,
-        filedata,
+        file_sha256,
         clean_text,
         ",".join(skills),
         name,
@@ -87,19 +511,16 @@ def save_resume(filename, filedata, clean_text, skills,
         experience,
         projects,
         datetime.now()
+    ), wait, _with_job_item(
+        _with_checkpoint(follow_up, checkpoint), job_item,
+        "UPDATE job_items SET resume_id = ? WHERE id = ?"
     ))
 
-    conn.commit()
-    conn.close()
-
 
 # ---------------- SAVE JD ----------------
-def save_jd(raw_jd, clean_jd, skills, role):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO job_descriptions 
+def save_jd(raw_jd, clean_jd, skills, role, wait=True, checkpoint=None):
+    return _submit("""
+        INSERT INTO job_descriptions
         (raw_jd, clean_jd, skills, role, uploaded_at)
         VALUES (?, ?, ?, ?, ?)
     """, (
@@ -108,18 +529,17 @@ def save_jd(raw_jd, clean_jd, skills, role):
         ",".join(skills),
         role,
         datetime.now()
-    ))
-
-    conn.commit()
-    conn.close()
+    ), wait, _with_checkpoint(None, checkpoint))
 
 
 # ---------------- SAVE MATCH RESULT ----------------
-def save_result(resume_id, jd_id, semantic_score, final_score):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
+def save_result(resume_id, jd_id, semantic_score, final_score, wait=True, checkpoint=None,
+                job_item=None):
+    """
+    Queues a match result (wait / checkpoint as in save_resume).
+    job_item gets the new result_id and the scores in the same transaction.
+    """
+    return _submit("""
         INSERT INTO results
         (resume_id, jd_id, semantic_score, final_score, matched_at)
         VALUES (?, ?, ?, ?, ?)
@@ -129,44 +549,60 @@ def save_result(resume_id, jd_id, semantic_score, final_score):
         semantic_score,
         final_score,
         datetime.now()
+    ), wait, _with_job_item(
+        _with_checkpoint(None, checkpoint), job_item,
+        "UPDATE job_items SET result_id = ?, semantic_score = ?, final_score = ? WHERE id = ?",
+        (semantic_score, final_score)
     ))
 
-    conn.commit()
-    conn.close()
-
 
-# ---------------- FETCH RESUMES ----------------
-def get_all_resumes():
-    conn = get_connection()
-    cursor = conn.cursor()
+def get_batch_checkpoints(run):
+    """{(resume_file, jd_file): row_id} recorded for one batch output."""
+    rows = get_connection().execute(
+        "SELECT resume_file, jd_file, row_id FROM batch_checkpoints WHERE run = ?", (run,)
+    ).fetchall()
+    return {(row["resume_file"], row["jd_file"]): row["row_id"] for row in rows}
 
-    cursor.execute("SELECT * FROM resumes ORDER BY uploaded_at DESC")
-    rows = cursor.fetchall()
 
-    conn.close()
+# ================================================================
+#          PAGINATED, BLOB-FREE QUERIES (admin dashboard)
+# ================================================================
+def _page(sql, ts_column, id_column, ts_key, limit, before):
+    """
+    Keyset pagination, newest first.
+    before = (timestamp, id) of the last row of the previous page.
+    Returns (rows, next_cursor) — next_cursor is None on the last page.
+    """
+    params = ()
+    if before is not None:
+        sql += f" WHERE ({ts_column}, {id_column}) < (?, ?)"
+        params = tuple(before)
+    sql += f" ORDER BY {ts_column} DESC, {id_column} DESC LIMIT ?"
 
-    return [dict(row) for row in rows]   # FIX
+    conn = get_connection()
+    rows = [dict(row) for row in conn.execute(sql, params + (limit + 1,)).fetchall()]
 
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1][ts_key], rows[-1]["id"])
 
-# ---------------- FETCH JDs ----------------
-def get_all_jds():
-    conn = get_connection()
-    cursor = conn.cursor()
+    return rows, next_cursor
 
-    cursor.execute("SELECT * FROM job_descriptions ORDER BY uploaded_at DESC")
-    rows = cursor.fetchall()
 
-    conn.close()
+def list_resumes(limit=50, before=None):
+    """One page of resume metadata (no text, no BLOB)."""
+    return _page(f"SELECT {RESUME_LIST_COLUMNS} FROM resumes",
+                 "uploaded_at", "id", "uploaded_at", limit, before)
 
-    return [dict(row) for row in rows]   # FIX
 
+def list_jds(limit=50, before=None):
+    return _page(f"SELECT {JD_LIST_COLUMNS} FROM job_descriptions",
+                 "uploaded_at", "id", "uploaded_at", limit, before)
 
-# ---------------- FETCH MATCH RESULTS ----------------
-def get_all_results():
-    conn = get_connection()
-    cursor = conn.cursor()
 
-    cursor.execute("""
+def list_results(limit=50, before=None):
+    return _page("""
         SELECT res.id as id,
                r.filename as filename,
                r.name as name,
@@ -177,10 +613,495 @@ def get_all_results():
         FROM results res
         JOIN resumes r ON res.resume_id = r.id
         JOIN job_descriptions j ON res.jd_id = j.id
-        ORDER BY res.matched_at DESC
-    """)
+    """, "res.matched_at", "res.id", "matched_at", limit, before)
+
+
+def count_rows(table):
+    """Row count for 'resumes', 'job_descriptions' or 'results'."""
+    if table not in ("resumes", "job_descriptions", "results"):
+        raise ValueError(f"unknown table: {table}")
+    return get_connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+# ---------------- FETCH ONE ----------------
+def get_resume(resume_id):
+    """Full parsed fields of one resume (still without the BLOB)."""
+    row = get_connection().execute(
+        f"SELECT {RESUME_DETAIL_COLUMNS} FROM resumes WHERE id = ?", (resume_id,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_resume_file(resume_id):
+    """(filename, bytes) of the original upload — only for downloads."""
+    row = get_connection().execute(
+        "SELECT filename, filedata, file_sha256 FROM resumes WHERE id = ?", (resume_id,)
+    ).fetchone()
+    if not row:
+        return None, None
+
+    if row["file_sha256"]:
+        return row["filename"], read_blob(row["file_sha256"])
+    return row["filename"], row["filedata"]   # not migrated yet
+
+
+def open_resume_file(resume_id):
+    """(filename, binary file object) of the original upload, or (None, None)."""
+    row = get_connection().execute(
+        "SELECT filename, file_sha256 FROM resumes WHERE id = ?", (resume_id,)
+    ).fetchone()
+    if not row:
+        return None, None
+    if row["file_sha256"]:
+        return row["filename"], open_blob(row["file_sha256"])
+
+    _, data = get_resume_file(resume_id)   # not migrated yet
+    return row["filename"], io.BytesIO(data or b"")
+
+
+def iter_resume_file(resume_id, chunk_size=64 * 1024):
+    """Streams the original upload in chunks."""
+    row = get_connection().execute(
+        "SELECT file_sha256 FROM resumes WHERE id = ?", (resume_id,)
+    ).fetchone()
+    if row and row["file_sha256"]:
+        yield from iter_blob(row["file_sha256"], chunk_size)
+        return
+
+    _, data = get_resume_file(resume_id)
+    for start in range(0, len(data or b""), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+# ---------------- DELETE RESUME ----------------
+def delete_resume(resume_id):
+    """
+    Deletes a resume with its match results; job items keep their row
+    (history) without the ids. Its file goes once nothing references it;
+    its cached parse (document cache) goes right away.
+    One writer transaction (queued after this thread's pending saves).
+    """
+    def work(cursor, unused):
+        row = cursor.execute(
+            "SELECT file_sha256 FROM resumes WHERE id = ?", (resume_id,)
+        ).fetchone()
+        if not row:
+            return None
+
+        # Checkpoints of the batch CLI that point at this resume / its results
+        cursor.execute("""
+            DELETE FROM batch_checkpoints
+            WHERE (jd_file = '' AND row_id = ?)
+               OR (resume_file != '' AND jd_file != ''
+                   AND row_id IN (SELECT id FROM results WHERE resume_id = ?))
+        """, (resume_id, resume_id))
+        cursor.execute("DELETE FROM results WHERE resume_id = ?", (resume_id,))
+        cursor.execute(
+            "UPDATE job_items SET resume_id = NULL, result_id = NULL WHERE resume_id = ?",
+            (resume_id,)
+        )
+        cursor.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
+        cursor.execute("DELETE FROM resume_embeddings WHERE resume_id = ?", (resume_id,))
+        cursor.execute("INSERT INTO deleted_resumes (resume_id) VALUES (?)", (resume_id,))
+        sha256 = row["file_sha256"]
+        if sha256 and _release_blob(cursor, sha256):
+            unused.append(sha256)   # unlinked by the writer once committed
+        return row
+
+    row = _transact(work)
+    if row is None:
+        return False
+
+    sha256 = row["file_sha256"]
+    if sha256:
+        # Parsed text of a deleted candidate must not outlive them
+        from app.utils.document_cache import purge_documents
+        purge_documents([sha256])
+
+    return True
+
+
+def _release_blob(cursor, sha256):
+    """
+    Drops one reference → True when nothing references the file any
+    more. It is unlinked by _drop_blobs after the commit (a rolled-back
+    transaction must not leave rows pointing at no file).
+    """
+    cursor.execute(
+        "UPDATE file_blobs SET refcount = refcount - 1 WHERE sha256 = ?", (sha256,)
+    )
+    left = cursor.execute(
+        "SELECT refcount FROM file_blobs WHERE sha256 = ?", (sha256,)
+    ).fetchone()
+    if left is not None and left["refcount"] <= 0:
+        cursor.execute("DELETE FROM file_blobs WHERE sha256 = ?", (sha256,))
+        return True
+    return False
+
+
+def _drop_blobs(conn, sha256s):
+    """
+    Unlinks files whose last reference a committed transaction dropped.
+    Re-checked under the write lock: a save that took a new reference
+    meanwhile keeps the file (its _ensure_blob restores it otherwise).
+    """
+    if not sha256s:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for sha256 in sha256s:
+            row = conn.execute("SELECT 1 FROM file_blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is None:
+                delete_blob(sha256)
+    finally:
+        conn.commit()
+
+
+# ---------------- MIGRATION: BLOB column → blob store ----------------
+def migrate_file_blobs(batch_size=200):
+    """
+    Moves file BLOBs still stored inside `resumes` into the blob store.
+    Safe to interrupt and re-run. Returns number of rows migrated.
+    """
+    create_tables()
+    flush()
+    conn = get_connection()
+    moved = 0
+
+    while True:
+        rows = conn.execute("""
+            SELECT id, filedata FROM resumes
+            WHERE filedata IS NOT NULL AND file_sha256 IS NULL
+            ORDER BY id LIMIT ?
+        """, (batch_size,)).fetchall()
+        if not rows:
+            break
+
+        stored = [(row["id"], row["filedata"], put_blob(row["filedata"]) if row["filedata"] else None)
+                  for row in rows]
+
+        def work(cursor, unused, stored=stored):
+            for resume_id, data, sha256 in stored:
+                if sha256:
+                    cursor.execute(BLOB_REF_SQL, (sha256, len(data)))
+                    _ensure_blob(sha256, data)
+                cursor.execute(
+                    "UPDATE resumes SET file_sha256 = ?, filedata = NULL WHERE id = ?",
+                    (sha256, resume_id)
+                )
+
+        _transact(work)
+        moved += len(rows)
+
+    return moved
+
+
+def get_jd(jd_id):
+    row = get_connection().execute(
+        "SELECT * FROM job_descriptions WHERE id = ?", (jd_id,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+# ---------------- FETCH RESUME EMBEDDINGS ----------------
+def get_resume_embeddings(after_id=0, limit=None, dim=None):
+    """
+    Returns (resume_ids, vectors) for stored embeddings with id > after_id
+    (at most `limit` rows when given → page through big corpora).
+    dim keeps only vectors of that size (rows from an older model differ).
+    vectors is a float32 (n x d) matrix.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    sql = "SELECT resume_id, vector FROM resume_embeddings WHERE resume_id > ?"
+    params = (after_id,)
+    if dim:
+        sql += " AND dim = ?"
+        params += (dim,)
+    sql += " ORDER BY resume_id"
+    if limit:
+        sql += " LIMIT ?"
+        params += (limit,)
+
+    cursor.execute(sql, params)
     rows = cursor.fetchall()
 
-    conn.close()
+    if not rows:
+        return np.empty(0, dtype=np.int64), None
+
+    ids = np.array([row["resume_id"] for row in rows], dtype=np.int64)
+    vectors = np.vstack([np.frombuffer(row["vector"], dtype=np.float32) for row in rows])
+    return ids, vectors
+
+
+def latest_embedding_dim():
+    """Size of the most recently stored resume vector (None if none)."""
+    row = get_connection().execute(
+        "SELECT dim FROM resume_embeddings ORDER BY resume_id DESC LIMIT 1"
+    ).fetchone()
+    return row["dim"] if row else None
+
+
+def get_resumes_by_ids(resume_ids):
+    """{resume_id: listing columns + skills} for the given ids (missing ids left out)."""
+    resume_ids = [int(i) for i in resume_ids]
+    out = {}
+    conn = get_connection()
+    for start in range(0, len(resume_ids), 500):
+        batch = resume_ids[start:start + 500]
+        rows = conn.execute(
+            f"SELECT {RESUME_LIST_COLUMNS}, skills FROM resumes "
+            f"WHERE id IN ({','.join('?' * len(batch))})",
+            batch
+        ).fetchall()
+        for row in rows:
+            out[row["id"]] = dict(row)
+    return out
+
+
+def get_resume_texts(after_id=0, limit=None):
+    """([resume_id], [clean_text]) for resumes with id > after_id, in id order."""
+    sql = "SELECT id, clean_text FROM resumes WHERE id > ? ORDER BY id"
+    params = (after_id,)
+    if limit:
+        sql += " LIMIT ?"
+        params += (limit,)
+
+    rows = get_connection().execute(sql, params).fetchall()
+    return [row["id"] for row in rows], [row["clean_text"] or "" for row in rows]
+
+
+def get_deleted_resumes(after_seq=0):
+    """
+    (last seq, [resume_id]) of resumes deleted after `after_seq`.
+    Corpus indexes poll this to drop deleted rows incrementally.
+    """
+    rows = get_connection().execute(
+        "SELECT seq, resume_id FROM deleted_resumes WHERE seq > ? ORDER BY seq", (after_seq,)
+    ).fetchall()
+    if not rows:
+        return after_seq, []
+    return rows[-1]["seq"], [row["resume_id"] for row in rows]
+
+
+def last_deleted_seq():
+    """Newest tombstone seq (0 if none) → starting point of a fresh index."""
+    row = get_connection().execute("SELECT MAX(seq) AS seq FROM deleted_resumes").fetchone()
+    return row["seq"] or 0
+
+
+def save_resume_embedding(resume_id, embedding, wait=True):
+    """Stores (or replaces) the vector of an already saved resume."""
+    vec = np.asarray(embedding, dtype=np.float32).ravel()
+    return _submit("""
+        INSERT OR REPLACE INTO resume_embeddings (resume_id, dim, vector)
+        VALUES (?, ?, ?)
+    """, (resume_id, vec.shape[0], vec.tobytes()), wait)
+
+
+def get_embeddings_by_ids(resume_ids):
+    """
+    Full-precision vectors for the given resume ids.
+    Returns {resume_id: float32 vector} (missing ids are left out).
+    """
+    resume_ids = [int(i) for i in resume_ids]
+    if not resume_ids:
+        return {}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    out = {}
+    # SQLite caps bound parameters → query in slices
+    for start in range(0, len(resume_ids), 500):
+        batch = resume_ids[start:start + 500]
+        cursor.execute(
+            f"SELECT resume_id, vector FROM resume_embeddings "
+            f"WHERE resume_id IN ({','.join('?' * len(batch))})",
+            batch
+        )
+        for row in cursor.fetchall():
+            out[row["resume_id"]] = np.frombuffer(row["vector"], dtype=np.float32)
+    return out
+
+
+# ---------------- BACKGROUND JOBS ----------------
+def submit_job(jd_id, files, signature=None):
+    """
+    Queues a scoring job. files: [(filename, bytes)].
+    Files go to the blob store (each item holds a reference until it
+    finishes). Returns the job id.
+    """
+    stored = [(name, put_blob(data), len(data)) for name, data in files]
+
+    def work(cursor, unused):
+        job_id = cursor.execute("""
+            INSERT INTO jobs (signature, jd_id, status, created_at)
+            VALUES (?, ?, 'queued', ?)
+        """, (signature, jd_id, datetime.now())).lastrowid
+
+        cursor.executemany(BLOB_REF_SQL, [(sha, size) for _, sha, size in stored])
+        for (_, data), (_, sha, _) in zip(files, stored):
+            _ensure_blob(sha, data)
+        cursor.executemany("""
+            INSERT INTO job_items (job_id, position, filename, file_sha256, status, attempts)
+            VALUES (?, ?, ?, ?, 'queued', 0)
+        """, [(job_id, pos, name, sha) for pos, (name, sha, _) in enumerate(stored)])
+        return job_id
+
+    return _transact(work)
+
+
+def find_job(signature):
+    """Latest non-failed job with this signature (reattach after a refresh)."""
+    row = get_connection().execute("""
+        SELECT id FROM jobs WHERE signature = ? AND status != 'failed'
+        ORDER BY id DESC LIMIT 1
+    """, (signature,)).fetchone()
+    return row["id"] if row else None
+
+
+def claim_job(worker_id, stale_seconds=JOB_STALE_SECONDS):
+    """
+    Atomically takes the oldest queued job (or a running one whose
+    worker stopped sending heartbeats). Returns the job dict or None.
+    """
+    def work(cursor, unused):
+        # Writer transactions are BEGIN IMMEDIATE → select + update are atomic
+        now = time.time()
+        row = cursor.execute("""
+            SELECT * FROM jobs
+            WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?)
+            ORDER BY id LIMIT 1
+        """, (now - stale_seconds,)).fetchone()
+
+        if row is not None:
+            cursor.execute("""
+                UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?,
+                                started_at = COALESCE(started_at, ?)
+                WHERE id = ?
+            """, (worker_id, now, datetime.now(), row["id"]))
+        return dict(row) if row else None
+
+    return _transact(work)
+
+
+def touch_job(job_id, worker_id):
+    """Heartbeat. False → the job was reclaimed by another worker."""
+    def work(cursor, unused):
+        cursor.execute(
+            "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time(), job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    return _transact(work)
+
+
+def next_job_items(job_id, limit=8):
+    """
+    Queued items of a job, fewest attempts first. resume_id / result_id
+    are set when an earlier attempt already saved those rows.
+    """
+    rows = get_connection().execute("""
+        SELECT * FROM job_items
+        WHERE job_id = ? AND status = 'queued'
+        ORDER BY attempts, position LIMIT ?
+    """, (job_id, limit)).fetchall()
+
+    items = []
+    for row in rows:
+        item = dict(row)
+        item["skills"] = item["skills"].split(",") if item["skills"] else []
+        items.append(item)
+    return items
+
+
+def update_job_items(items):
+    """
+    Writes item outcomes (dicts with id, file_sha256, status, attempts,
+    error, semantic_score, final_score, skills) in one transaction.
+    resume_id / result_id are not written here: save_resume /
+    save_result record them together with the rows.
+    Finished items release their file reference.
+    """
+    def work(cursor, unused):
+        cursor.executemany("""
+            UPDATE job_items
+            SET status = ?, attempts = ?, error = ?,
+                semantic_score = ?, final_score = ?, skills = ?
+            WHERE id = ?
+        """, [(
+            it["status"], it["attempts"], it.get("error"),
+            it.get("semantic_score"), it.get("final_score"),
+            ",".join(it.get("skills") or []), it["id"]
+        ) for it in items])
+
+        for it in items:
+            if it["status"] in ("done", "failed") and it["file_sha256"]:
+                if _release_blob(cursor, it["file_sha256"]):
+                    unused.append(it["file_sha256"])
+
+    _transact(work)
+
+
+def requeue_job(job_id):
+    """Hands a running job back to the queue (worker shutting down)."""
+    _submit(
+        "UPDATE jobs SET status = 'queued', worker = NULL WHERE id = ? AND status = 'running'",
+        (job_id,), wait=True, want_id=False
+    )
+
+
+def finish_job(job_id, error=None):
+    """done (items may still have failed individually) or failed."""
+    _submit(
+        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+        ("failed" if error else "done", error, datetime.now(), job_id), wait=True, want_id=False
+    )
+
+
+def get_job(job_id):
+    """Job row + item counts (total / queued / done / failed) for progress polling."""
+    conn = get_connection()
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not row:
+        return None
+
+    job = dict(row)
+    counts = dict(conn.execute("""
+        SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status
+    """, (job_id,)).fetchall())
+
+    job["queued"] = counts.get("queued", 0)
+    job["done"] = counts.get("done", 0)
+    job["failed"] = counts.get("failed", 0)
+    job["total"] = sum(counts.values())
+    job["progress"] = (job["done"] + job["failed"]) / job["total"] if job["total"] else 1.0
+    return job
+
+
+def get_job_results(job_id):
+    """Every item of a job (with the saved resume's text), in upload order."""
+    rows = get_connection().execute("""
+        SELECT i.position, i.filename, i.status, i.error, i.attempts,
+               i.semantic_score, i.final_score, i.skills,
+               i.resume_id, i.result_id, r.clean_text
+        FROM job_items i
+        LEFT JOIN resumes r ON r.id = i.resume_id
+        WHERE i.job_id = ?
+        ORDER BY i.position
+    """, (job_id,)).fetchall()
+    return [dict(r) for r in rows]
+
+
+if __name__ == "__main__":
+    import sys
 
-    return [dict(row) for row in rows]   # FIX
+    if sys.argv[1:] == ["migrate-blobs"]:
+        count = migrate_file_blobs()
+        get_connection().execute("VACUUM")
+        print(f"Moved {count} resume file(s) to the blob store")
+    else:
+        print("usage: python -m app.utils.database migrate-blobs")
@@ -0,0 +1,227 @@
+# FILE: app/utils/document_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from app.utils.database import DB_PATH
+from app.utils.logger import log_warning
+from app.utils.metrics import inc
+
+# Lives next to resume_system.db (like the other indexes / caches)
+DOCUMENT_CACHE_PATH = os.path.join(os.path.dirname(DB_PATH), "document_cache.db")
+
+# Bounds: rows (oldest writes pruned past it) and age in days (0 → unbounded)
+DEFAULT_MAX_ROWS = int(os.environ.get("ATS_DOCUMENT_CACHE_ROWS", "100000"))
+DEFAULT_MAX_AGE_DAYS = int(os.environ.get("ATS_DOCUMENT_CACHE_DAYS", "90"))
+
+# Bump whenever extraction, cleaning or section parsing changes output
+# (pdf_text, resume_parser, preprocessor, section_parser) → old entries
+# are ignored and purged on the next start
+PARSER_VERSION = 2
+
+
+def file_key(data: bytes) -> str:
+    """Cache key = SHA-256 of the uploaded bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def purge_documents(sha256s, path=DOCUMENT_CACHE_PATH):
+    """Drops the cached parses of these files (any parser version / page cap)."""
+    if not path or not os.path.exists(path):
+        return
+    cache = DocumentCache(path, prune=False)
+    try:
+        cache.purge(sha256s)
+    finally:
+        cache.close()
+
+
+class DocumentCache:
+    def __init__(self, path=DOCUMENT_CACHE_PATH, version=PARSER_VERSION,
+                 max_rows=DEFAULT_MAX_ROWS, max_age_days=DEFAULT_MAX_AGE_DAYS, prune=True):
+        """
+        Persistent parsed-document cache (SQLite, shared by every process):
+        file SHA-256 + parser version + page cap → raw text, clean text
+        and sections. A repeat upload skips extraction entirely.
+        Bounded by max_rows and max_age_days (pruned on start and on writes).
+        Pass path=None to disable it; a cache SQLite cannot open or
+        query degrades to no cache (every lookup a miss).
+        """
+        self.path = path
+        self.version = version
+        self.max_rows = max_rows
+        self.max_age_days = max_age_days
+        self._rows = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS documents (
+                        sha256 TEXT,
+                        parser_version INTEGER,
+                        max_pages INTEGER,
+                        raw_text TEXT,
+                        clean_text TEXT,
+                        sections TEXT,
+                        created_at TIMESTAMP,
+                        PRIMARY KEY (sha256, parser_version, max_pages)
+                    );
+                """)
+                if prune:
+                    # Entries of other parser versions can never hit again
+                    self._conn.execute("DELETE FROM documents WHERE parser_version != ?", (version,))
+                    self._conn.commit()
+                    self._prune()
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def _disable(self, error):
+        """Unusable cache file → run without the cache."""
+        log_warning(f"document cache at {self.path} unavailable ({error}); continuing without it")
+        inc("document_cache_errors")
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+        self._conn = None
+
+    def _prune(self):
+        """Drops entries past the age bound, then the oldest writes down to 90% of max_rows."""
+        if self.max_age_days:
+            cutoff = datetime.now() - timedelta(days=self.max_age_days)
+            self._conn.execute("DELETE FROM documents WHERE created_at < ?", (cutoff,))
+
+        self._rows = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        excess = self._rows - int(self.max_rows * 0.9)
+        if self.max_rows and self._rows > self.max_rows and excess > 0:
+            # INSERT OR REPLACE gives re-written keys a new rowid → rowid order = write age
+            self._conn.execute(
+                "DELETE FROM documents WHERE rowid IN "
+                "(SELECT rowid FROM documents ORDER BY rowid LIMIT ?)",
+                (excess,)
+            )
+            self._rows -= excess
+        self._conn.commit()
+
+    def purge(self, sha256s):
+        """Drops every cached parse of these file keys."""
+        sha256s = list(dict.fromkeys(sha256s))
+        if self._conn is None or not sha256s:
+            return
+        with self._lock:
+            try:
+                for start in range(0, len(sha256s), 500):
+                    chunk = sha256s[start:start + 500]
+                    marks = ",".join("?" * len(chunk))
+                    self._conn.execute(f"DELETE FROM documents WHERE sha256 IN ({marks})", chunk)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                log_warning(f"document cache purge failed ({e})")
+                inc("document_cache_errors")
+
+    def get_many(self, keys, max_pages=None):
+        """
+        Looks up many file keys at once.
+        Returns a list aligned with keys: {raw_text, clean_text, sections}
+        or None where not cached.
+        """
+        results = [None] * len(keys)
+        if self._conn is None or not keys:
+            return results
+
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            try:
+                # SQLite caps bound parameters, so look up in slices
+                for start in range(0, len(unique), 500):
+                    chunk = unique[start:start + 500]
+                    marks = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT sha256, raw_text, clean_text, sections FROM documents "
+                        f"WHERE parser_version = ? AND max_pages = ? AND sha256 IN ({marks})",
+                        [self.version, max_pages or 0] + chunk
+                    ).fetchall()
+                    for sha256, raw_text, clean_text, sections in rows:
+                        found[sha256] = {
+                            "raw_text": raw_text,
+                            "clean_text": clean_text,
+                            "sections": json.loads(sections) if sections else None,
+                        }
+            except sqlite3.Error as e:
+                # Locked / corrupt cache → extract everything this time
+                log_warning(f"document cache lookup failed ({e})")
+                inc("document_cache_errors")
+                found = {}
+
+            for idx, key in enumerate(keys):
+                results[idx] = found.get(key)
+            hits = sum(1 for r in results if r is not None)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        inc("document_cache_hits", hits)
+        inc("document_cache_misses", len(keys) - hits)
+        return results
+
+    def put_many(self, items, max_pages=None):
+        """items: [(file key, {raw_text, clean_text, sections})]."""
+        if self._conn is None or not items:
+            return
+
+        now = datetime.now()
+        with self._lock:
+            try:
+                self._conn.executemany("""
+                    INSERT OR REPLACE INTO documents
+                    (sha256, parser_version, max_pages, raw_text, clean_text, sections, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (key, self.version, max_pages or 0, doc["raw_text"], doc["clean_text"],
+                     json.dumps(doc["sections"]) if doc.get("sections") else None, now)
+                    for key, doc in items
+                ])
+                self._conn.commit()
+
+                self._rows += len(items)
+                if self.max_rows and self._rows > self.max_rows:
+                    self._prune()
+            except sqlite3.Error as e:
+                # Not cached this time; extraction results are unaffected
+                log_warning(f"document cache write failed ({e})")
+                inc("document_cache_errors")
+
+    def stats(self):
+        """Hit / miss counters and hit ratio (this process)."""
+        entries = 0
+        if self._conn is not None:
+            with self._lock:
+                try:
+                    entries = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
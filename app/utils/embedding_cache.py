@@ -0,0 +1,221 @@
+# FILE: app/utils/embedding_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EMBEDDING_CACHE_PATH = os.path.join(os.getcwd(), "embedding_cache.db")
+
+# Default in-memory budget (~43k MiniLM vectors)
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+
+# Disk tier bound (rows); oldest writes are pruned past it (0 → unbounded)
+DEFAULT_DISK_ROWS = int(os.environ.get("ATS_EMBEDDING_CACHE_ROWS", "500000"))
+
+
+def _frozen(emb):
+    """Read-only float32 copy → callers cannot corrupt cached vectors."""
+    emb = np.array(emb, dtype=np.float32)
+    emb.setflags(write=False)
+    return emb
+
+
+def text_key(model_name: str, text: str) -> str:
+    """Cache key = SHA-256 of model name + cleaned text."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, path=EMBEDDING_CACHE_PATH,
+                 max_bytes=DEFAULT_MEMORY_BYTES, max_disk_rows=DEFAULT_DISK_ROWS):
+        """
+        Two-tier embedding cache:
+        - Tier 1: in-memory LRU bounded by a byte budget
+        - Tier 2: SQLite store on disk (survives restarts, shared by sessions),
+          bounded by max_disk_rows (oldest writes pruned first)
+        Pass path=None to disable the disk tier.
+        Returned vectors are read-only; copy before modifying in place.
+        """
+        self.model_name = model_name
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_disk_rows = max_disk_rows
+        self._disk_rows = 0
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    dim INTEGER,
+                    vector BLOB
+                );
+            """)
+            self._conn.commit()
+            self._disk_rows = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    # ----------------------------------------------------------
+    # Memory tier (LRU)
+    # ----------------------------------------------------------
+    def _remember(self, key, emb):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+
+        if emb.nbytes > self.max_bytes:
+            return
+
+        self._memory[key] = emb
+        self._memory_bytes += emb.nbytes
+
+        while self._memory_bytes > self.max_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.nbytes
+            self.evictions += 1
+
+    # ----------------------------------------------------------
+    # Disk tier (SQLite)
+    # ----------------------------------------------------------
+    def _load(self, keys):
+        if self._conn is None or not keys:
+            return {}
+
+        found = {}
+        keys = list(keys)
+        # SQLite caps bound parameters, so look up in slices
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({marks})",
+                chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = _frozen(np.frombuffer(blob, dtype=np.float32))
+        return found
+
+    def _store(self, items):
+        if self._conn is None or not items:
+            return
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)",
+            [(key, self.model_name, emb.shape[0], emb.tobytes()) for key, emb in items]
+        )
+        self._conn.commit()
+
+        self._disk_rows += len(items)
+        if self.max_disk_rows and self._disk_rows > self.max_disk_rows:
+            self._prune()
+
+    def _prune(self):
+        """Drops the oldest writes (lowest rowids) down to 90% of the bound."""
+        self._disk_rows = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._disk_rows - int(self.max_disk_rows * 0.9)
+        if self._disk_rows <= self.max_disk_rows or excess <= 0:
+            return
+
+        # INSERT OR REPLACE gives re-written keys a new rowid → rowid order = write age
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)",
+            (excess,)
+        )
+        self._conn.commit()
+        self._disk_rows -= excess
+
+    # ----------------------------------------------------------
+    # Public API
+    # ----------------------------------------------------------
+    def get(self, text):
+        """Returns the cached embedding for text, or None."""
+        return self.get_many([text])[0]
+
+    def put(self, text, emb):
+        self.put_many([text], [emb])
+
+    def get_many(self, texts):
+        """
+        Looks up many texts at once.
+        Returns a list aligned with texts (None where not cached).
+        """
+        keys = [text_key(self.model_name, t) for t in texts]
+        results = [None] * len(texts)
+
+        with self._lock:
+            pending = {}
+            for idx, key in enumerate(keys):
+                emb = self._memory.get(key)
+                if emb is not None:
+                    self._memory.move_to_end(key)
+                    results[idx] = emb
+                    self.hits += 1
+                else:
+                    pending.setdefault(key, []).append(idx)
+
+            loaded = self._load(pending.keys())
+            for key, idxs in pending.items():
+                emb = loaded.get(key)
+                if emb is None:
+                    self.misses += len(idxs)
+                    continue
+                self._remember(key, emb)
+                self.disk_hits += len(idxs)
+                for idx in idxs:
+                    results[idx] = emb
+
+        return results
+
+    def put_many(self, texts, embeddings):
+        items = []
+        for text, emb in zip(texts, embeddings):
+            emb = _frozen(emb)
+            items.append((text_key(self.model_name, text), emb))
+
+        with self._lock:
+            for key, emb in items:
+                self._remember(key, emb)
+            self._store(items)
+
+    def stats(self):
+        """Hit / miss / eviction counters + memory usage."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+        }
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
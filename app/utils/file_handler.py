@@ -1,15 +1,10 @@
 # FILE: app/utils/file_handler.py
 
-import pdfplumber
-
 def read_pdf(file):
-    """Extract text from PDF safely."""
+    """Extract text from PDF safely (fast path + layout fallback per page)."""
     try:
-        text = ""
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                text += (page.extract_text() or "") + "\n"
-        return text.strip()
+        from app.utils.pdf_text import extract_pdf_text
+        return extract_pdf_text(file)
     except:
         return ""
 
@@ -0,0 +1,246 @@
+# FILE: app/utils/metrics.py
+"""
+Lightweight in-process instrumentation.
+
+    from app.utils.metrics import span, inc
+
+    @span("embed")                 # decorator …
+    def get_batch_embeddings(...): ...
+
+    with span("db_flush"):         # … or context manager
+        flush()
+
+    inc("embedding_cache_hits", 12)
+
+Spans feed a per-stage latency histogram; counters are plain totals.
+`collect()` additionally records the spans of one run (e.g. one
+scoring click) for the UI breakdown. Work done for the run elsewhere
+is folded in too: the DB writer thread runs under the submitting
+caller's runs (current_runs() / attach()), and extraction workers
+send their spans back with each result (capture() / replay()).
+Recording is a perf_counter call plus a short lock, so it stays on in
+production (ATS_METRICS=0 turns it off).
+
+Export: snapshot() → dict, to_prometheus() → text exposition format,
+write_snapshot(path). With ATS_METRICS_FILE set (".prom" → Prometheus,
+anything else → JSON) the file is rewritten every ATS_METRICS_INTERVAL
+seconds and at exit, e.g. for node_exporter's textfile collector.
+"""
+
+import atexit
+import json
+import multiprocessing as mp
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+ENABLED = os.environ.get("ATS_METRICS", "1") != "0"
+
+# Only the top-level process exports (pool workers keep local numbers)
+EXPORT_PATH = os.environ.get("ATS_METRICS_FILE") if mp.parent_process() is None else None
+EXPORT_INTERVAL = float(os.environ.get("ATS_METRICS_INTERVAL", "30"))
+
+PREFIX = "ats"
+
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}     # stage → {"counts": [...], "sum": s, "count": n}
+_last_export = [time.monotonic()]
+
+# Breakdowns collecting spans in the current context (see collect())
+_active_runs = ContextVar("ats_active_runs", default=())
+
+
+# ------------------------------------------------------------
+# Recording
+# ------------------------------------------------------------
+def inc(name, value=1):
+    """Adds value to counter `name`."""
+    if not ENABLED or not value:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(stage, seconds):
+    """Records one latency sample for `stage`."""
+    if not ENABLED:
+        return
+
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = {"counts": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0}
+        hist["counts"][bisect_left(BUCKETS, seconds)] += 1
+        hist["sum"] += seconds
+        hist["count"] += 1
+
+    for run in _active_runs.get():
+        run.add(stage, seconds)
+
+    if EXPORT_PATH and time.monotonic() - _last_export[0] >= EXPORT_INTERVAL:
+        _last_export[0] = time.monotonic()
+        write_snapshot(EXPORT_PATH)
+
+
+@contextmanager
+def span(stage):
+    """Times the enclosed block (or decorated function) as `stage`."""
+    if not ENABLED:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+# ------------------------------------------------------------
+# Per-run breakdown
+# ------------------------------------------------------------
+class RunBreakdown:
+    def __init__(self):
+        """Stage totals of one run (only spans inside collect())."""
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            calls, total = self.stages.get(stage, (0, 0.0))
+            self.stages[stage] = (calls + 1, total + seconds)
+
+    def rows(self):
+        """[{stage, calls, total_ms}] slowest first (nested spans overlap)."""
+        return [
+            {"stage": stage, "calls": calls, "total_ms": round(total * 1000.0, 2)}
+            for stage, (calls, total) in sorted(self.stages.items(), key=lambda kv: -kv[1][1])
+        ]
+
+
+@contextmanager
+def collect():
+    """Yields a RunBreakdown filled by every span of this block."""
+    run = RunBreakdown()
+    token = _active_runs.set(_active_runs.get() + (run,))
+    try:
+        yield run
+    finally:
+        _active_runs.reset(token)
+
+
+def current_runs():
+    """Breakdowns collecting in this context (hand them to another thread)."""
+    return _active_runs.get()
+
+
+@contextmanager
+def attach(runs):
+    """Spans of this block (e.g. on a worker thread) also count toward `runs`."""
+    token = _active_runs.set(tuple(dict.fromkeys(_active_runs.get() + tuple(runs))))
+    try:
+        yield
+    finally:
+        _active_runs.reset(token)
+
+
+class _Samples(list):
+    def add(self, stage, seconds):
+        self.append((stage, seconds))
+
+
+@contextmanager
+def capture():
+    """
+    Yields a list of (stage, seconds) for every span of this block —
+    picklable, so a worker process can send its timings with a result.
+    """
+    samples = _Samples()
+    token = _active_runs.set(_active_runs.get() + (samples,))
+    try:
+        yield samples
+    finally:
+        _active_runs.reset(token)
+
+
+def replay(samples):
+    """Records spans captured in another process as if they ran here."""
+    for stage, seconds in samples or ():
+        observe(stage, seconds)
+
+
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+def snapshot():
+    """All counters + histograms as a JSON-ready dict."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {
+            stage: {
+                "count": h["count"],
+                "sum_seconds": round(h["sum"], 6),
+                "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h["counts"])),
+            }
+            for stage, h in _histograms.items()
+        }
+    return {"timestamp": time.time(), "pid": os.getpid(),
+            "counters": counters, "stages": histograms}
+
+
+def to_prometheus():
+    """Prometheus text exposition format."""
+    snap = snapshot()
+    lines = []
+
+    for name, value in sorted(snap["counters"].items()):
+        metric = f"{PREFIX}_{name}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+    metric = f"{PREFIX}_stage_seconds"
+    if snap["stages"]:
+        lines.append(f"# TYPE {metric} histogram")
+    for stage, h in sorted(snap["stages"].items()):
+        cumulative = 0
+        for bound, count in h["buckets"].items():
+            cumulative += count
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{stage="{stage}"}} {h["sum_seconds"]}')
+        lines.append(f'{metric}_count{{stage="{stage}"}} {h["count"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot(path, fmt=None):
+    """Atomically writes a snapshot (fmt: "prometheus" | "json", default by extension)."""
+    fmt = fmt or ("prometheus" if path.endswith(".prom") else "json")
+    body = to_prometheus() if fmt == "prometheus" else json.dumps(snapshot(), indent=2)
+
+    try:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        return False
+
+
+def reset():
+    """Clears every counter and histogram."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+if EXPORT_PATH:
+    atexit.register(lambda: write_snapshot(EXPORT_PATH))
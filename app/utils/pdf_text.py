@@ -0,0 +1,160 @@
+# FILE: app/utils/pdf_text.py
+"""
+Tiered PDF text extraction.
+
+1. fast:   PyPDF2 reads each page's text stream (no layout analysis)
+2. layout: pdfplumber re-extracts only the pages whose fast text looks
+           wrong (too few words, (cid:NN) glyph codes, replacement
+           characters, run-on words from lost spaces)
+
+Every page is timed per tier ("pdf_page_fast" / "pdf_page_layout"
+spans); documents are counted by the tier that served them
+(pdf_docs_fast / pdf_docs_mixed / pdf_docs_layout).
+"""
+
+import re
+import time
+
+from app.utils.metrics import inc, observe
+
+# Pages read per document (the rest is counted as pdf_pages_capped)
+MAX_PAGES = 20
+
+# Fast-path text scoring below this → page goes to layout extraction
+QUALITY_THRESHOLD = 0.5
+MIN_WORDS_PER_PAGE = 10
+MAX_WORD_LENGTH = 30
+
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_CID_RE = re.compile(r"\(cid:\d+\)")
+
+
+def text_quality(text, min_words=MIN_WORDS_PER_PAGE):
+    """
+    0–1 estimate of how readable extracted page text is: share of
+    letters among visible characters, minus the share taken by garbage
+    ((cid:NN) codes, U+FFFD, control characters) and run-on "words".
+    0 for pages with fewer than min_words words.
+    """
+    if not text:
+        return 0.0
+
+    words = text.split()
+    if not words or len(words) < min_words:
+        return 0.0
+
+    visible = sum(len(w) for w in words)
+    letters = sum(map(str.isalpha, text))
+    garbage = (sum(len(m) for m in _CID_RE.findall(text))
+               + text.count("\ufffd")
+               + len(_CONTROL_RE.findall(text)))
+    run_on = sum(len(w) for w in words if len(w) > MAX_WORD_LENGTH)
+
+    return max(0.0, min(1.0, (letters - garbage - run_on) / visible))
+
+
+def _rewind(file):
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return file
+
+
+def _fast_pages(file, max_pages):
+    """
+    PyPDF2 pass → (page texts, seconds per page, total page count),
+    or ([], [], None) when PyPDF2 cannot read the file.
+    """
+    try:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(_rewind(file))
+        if reader.is_encrypted:
+            reader.decrypt("")
+
+        total = len(reader.pages)
+        texts, seconds = [], []
+        for page in reader.pages[:max_pages]:
+            start = time.perf_counter()
+            try:
+                texts.append(page.extract_text() or "")
+            except Exception:
+                texts.append("")
+            seconds.append(time.perf_counter() - start)
+            observe("pdf_page_fast", seconds[-1])
+        return texts, seconds, total
+    except Exception:
+        return [], [], None
+
+
+def extract_pdf(file, max_pages=MAX_PAGES):
+    """
+    Returns (text, report); report = {"pages", "total_pages", "capped",
+    "tiers": per-page "fast" | "layout", "page_ms": per-page time of
+    both tiers}.
+    """
+    fast, seconds, total = _fast_pages(file, max_pages)
+
+    plumber = None
+    texts, tiers = [], []
+    try:
+        n_pages = len(fast) if total is not None else None
+        if n_pages is None:
+            # PyPDF2 could not open it → every page via layout analysis
+            import pdfplumber
+            plumber = pdfplumber.open(_rewind(file))
+            total = len(plumber.pages)
+            n_pages = min(total, max_pages) if max_pages else total
+            fast = [""] * n_pages
+            seconds = [0.0] * n_pages
+
+        for idx in range(n_pages):
+            # A short closing page is normal; elsewhere few words = missed text
+            min_words = 1 if idx == total - 1 else MIN_WORDS_PER_PAGE
+            if text_quality(fast[idx], min_words) >= QUALITY_THRESHOLD:
+                texts.append(fast[idx])
+                tiers.append("fast")
+                continue
+
+            start = time.perf_counter()
+            try:
+                if plumber is None:
+                    import pdfplumber   # heavy → imported on first escalation
+                    plumber = pdfplumber.open(_rewind(file))
+                layout = plumber.pages[idx].extract_text() or ""
+            except Exception:
+                layout = ""
+            elapsed = time.perf_counter() - start
+            seconds[idx] += elapsed
+            observe("pdf_page_layout", elapsed)
+
+            # Keep whichever tier produced the better page
+            if layout.strip() and text_quality(layout, min_words) >= text_quality(fast[idx], min_words):
+                texts.append(layout)
+            else:
+                texts.append(fast[idx])
+            tiers.append("layout")
+    finally:
+        if plumber is not None:
+            plumber.close()
+
+    n_layout = tiers.count("layout")
+    inc("pdf_pages_fast", len(tiers) - n_layout)
+    inc("pdf_pages_layout", n_layout)
+    inc("pdf_pages_capped", max(0, (total or 0) - len(tiers)))
+    if tiers:
+        inc("pdf_docs_layout" if n_layout == len(tiers) else
+            "pdf_docs_mixed" if n_layout else "pdf_docs_fast")
+
+    report = {
+        "pages": len(tiers),
+        "total_pages": total or 0,
+        "capped": max(0, (total or 0) - len(tiers)),
+        "tiers": tiers,
+        "page_ms": [round(sec * 1000.0, 3) for sec in seconds[:len(tiers)]],
+    }
+    return "\n".join(texts).strip(), report
+
+
+def extract_pdf_text(file, max_pages=MAX_PAGES):
+    """Text only (see extract_pdf)."""
+    return extract_pdf(file, max_pages)[0]
@@ -2,32 +2,128 @@
 
 import re
 
+from app.utils.metrics import span
+
+# ------------------ PATTERNS / LOOKUPS (built once) ------------------
+EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+PHONE_RE = re.compile(r"(\+?\d[\d\s\-]{7,}\d)")
+NON_LETTER_RE = re.compile(r"[^a-zA-Z\s]")
+
+# Tokenizing: punctuation → space, "." dropped (b.tech → btech, ph.d → phd)
+_PUNCT = str.maketrans({**{c: " " for c in ",;:()[]{}|/\\-–—•·*\"'!?&+=#@\t"}, ".": None})
+
+# Whole-line section headings (after punctuation is stripped)
+HEADERS = {}
+for _section, _names in {
+    "education": ("education", "educational background", "education details",
+                  "educational qualification", "educational qualifications",
+                  "academic", "academics", "academic background", "academic details",
+                  "academic qualification", "academic qualifications",
+                  "qualification", "qualifications"),
+    "experience": ("experience", "work experience", "professional experience",
+                   "relevant experience", "industry experience", "employment",
+                   "employment history", "work history", "career history",
+                   "internship", "internships"),
+    "projects": ("project", "projects", "academic projects", "personal projects",
+                 "key projects", "selected projects", "major projects"),
+    "contact": ("contact", "contact details", "contact info", "contact information",
+                "contact me", "personal details", "personal information"),
+    "other": ("skills", "technical skills", "key skills", "summary", "profile",
+              "objective", "career objective", "certification", "certifications",
+              "achievement", "achievements", "award", "awards", "languages", "hobbies",
+              "interests", "publications", "references", "declaration",
+              "extra curricular activities", "extracurricular activities"),
+}.items():
+    for _name in _names:
+        HEADERS[_name] = _section
+
+# Whole-word keywords → sections (plain substrings made "ba"/"bs" hit
+# "database", "jobs", ...); "project" counts for experience and projects
+KEYWORDS = {}
+for _sections, _words in (
+    (("education",), "bachelor bachelors master masters btech mtech bsc msc ba bs mba "
+                     "phd degree university "
+                     "universities college school graduation graduate graduated "
+                     "undergraduate postgraduate"),
+    (("experience",), "experience experienced experiences intern interns internship "
+                      "internships worked role roles position positions"),
+    (("projects",), "developed built created"),
+    (("experience", "projects"), "project projects"),
+):
+    for _word in _words.split():
+        KEYWORDS[_word] = _sections
+KEYWORD_SET = frozenset(KEYWORDS)
+
+
 class SectionParser:
 
+    # ------------------ SINGLE-PASS SEGMENTER ------------------
+    @staticmethod
+    def segment(text):
+        """
+        Normalizes the text once, then walks its lines once; each line
+        is checked with set / dict lookups instead of regexes.
+        A heading ("EDUCATION", "Work Experience:") opens a block and
+        every following line belongs to it until the next heading (a
+        contact block already ends at the first line with a section
+        keyword); outside their block, lines still count for a section
+        when they contain one of its keywords (resumes without headings).
+        Returns {"education": [...], "experience": [...], "projects": [...],
+        "contact": [...]} in document order (lower-cased, contact as-is).
+        """
+        out = {"education": [], "experience": [], "projects": [], "contact": []}
+        block = None
+
+        lower = text.lower()
+        lines = zip(text.split("\n"), lower.split("\n"), lower.translate(_PUNCT).split("\n"))
+        for raw, line, norm in lines:
+            words = norm.split()
+            if not words:
+                continue
+
+            if len(words) <= 4:
+                header = HEADERS.get(" ".join(words))
+                if header:
+                    block = header
+                    continue
+
+            if block == "contact":
+                if KEYWORD_SET.isdisjoint(words):
+                    out["contact"].append(raw)
+                    continue
+                block = None   # resume content, not a contact detail → block over
+            elif block in out:
+                out[block].append(line)
+
+            found = KEYWORD_SET.intersection(words)
+            if found:
+                sections = set()
+                for word in found:
+                    sections.update(KEYWORDS[word])
+                sections.discard(block)
+                for section in sections:
+                    out[section].append(line)
+
+        return out
+
     # ------------------ EXTRACT EMAIL ------------------
     @staticmethod
     def extract_email(text):
-        pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-        match = re.search(pattern, text)
+        match = EMAIL_RE.search(text)
         return match.group(0) if match else None
 
     # ------------------ EXTRACT PHONE ------------------
     @staticmethod
     def extract_phone(text):
-        pattern = r"(\+?\d[\d\s\-]{7,}\d)"
-        match = re.search(pattern, text)
+        match = PHONE_RE.search(text)
         return match.group(0) if match else None
 
     # ------------------ EXTRACT NAME ------------------
     @staticmethod
     def extract_name(text):
-        lines = text.split("\n")
-
-        for line in lines[:5]:   # top 5 lines usually contain the name
-            clean = line.strip()
-
+        for line in text.split("\n", 5)[:5]:   # top 5 lines usually contain the name
             # Remove emojis, icons, symbols except letters/spaces
-            clean = re.sub(r"[^a-zA-Z\s]", "", clean)
+            clean = NON_LETTER_RE.sub("", line.strip())
 
             # Allow 1–4 word names (supports single-name resumes)
             if clean and 1 <= len(clean.split()) <= 4:
@@ -35,47 +131,37 @@ class SectionParser:
 
         return None
 
-
-    # ------------------ EXTRACT EDUCATION ------------------
+    # ------------------ EXTRACT EDUCATION / EXPERIENCE / PROJECTS ------------------
     @staticmethod
     def extract_education(text):
-        edu_keywords = [
-            "bachelor", "b.tech", "btech", "ba", "bs",
-            "master", "m.tech", "mtech", "msc", "degree",
-            "university", "college", "school", "graduation"
-        ]
-
-        lines = text.lower().split("\n")
-        matches = [l for l in lines if any(k in l for k in edu_keywords)]
-        return " ".join(matches) if matches else None
+        return SectionParser._join(SectionParser.segment(text)["education"])
 
-    # ------------------ EXTRACT EXPERIENCE ------------------
     @staticmethod
     def extract_experience(text):
-        exp_keywords = ["experience", "intern", "worked", "project", "role", "position"]
-        lines = text.lower().split("\n")
-
-        matches = [l for l in lines if any(k in l for k in exp_keywords)]
-        return " ".join(matches) if matches else None
+        return SectionParser._join(SectionParser.segment(text)["experience"])
 
-    # ------------------ EXTRACT PROJECTS ------------------
     @staticmethod
     def extract_projects(text):
-        proj_keywords = ["project", "developed", "built", "created"]
-        lines = text.lower().split("\n")
+        return SectionParser._join(SectionParser.segment(text)["projects"])
 
-        matches = [l for l in lines if any(k in l for k in proj_keywords)]
-        return " ".join(matches) if matches else None
+    @staticmethod
+    def _join(lines):
+        return " ".join(lines) if lines else None
 
     # ------------------ MASTER FUNCTION ------------------
     @staticmethod
+    @span("sections")
     def get_sections(text):
+        blocks = SectionParser.segment(text)
+
+        # Contact block first (small), whole text as fallback
+        contact = "\n".join(blocks["contact"])
 
         return {
             "name": SectionParser.extract_name(text),
-            "email": SectionParser.extract_email(text),
-            "phone": SectionParser.extract_phone(text),
-            "education": SectionParser.extract_education(text),
-            "experience": SectionParser.extract_experience(text),
-            "projects": SectionParser.extract_projects(text),
+            "email": SectionParser.extract_email(contact) or SectionParser.extract_email(text),
+            "phone": SectionParser.extract_phone(contact) or SectionParser.extract_phone(text),
+            "education": SectionParser._join(blocks["education"]),
+            "experience": SectionParser._join(blocks["experience"]),
+            "projects": SectionParser._join(blocks["projects"]),
         }
@@ -0,0 +1,146 @@
+# FILE: benchmarks/batching.py
+"""
+Embedding batches: token-budget plan (plan_batches) vs fixed-size
+batches of 32, length-sorted the way SentenceTransformer.encode sorts
+them.
+
+    python -m benchmarks.batching --texts 2000 --out batching.json
+
+Texts are a length mix of synthetic resumes, JDs and one-line snippets
+(benchmarks/corpus.py). Both plans run on a cost-model encoder whose
+work grows with padded tokens (batch size x longest item, like the
+dense layers of a transformer), so the report shows forward passes,
+padded vs real tokens and seconds under that model. It does not load
+SBERT: the wall-clock gain on the real model still has to be measured
+with the model installed (python -m benchmarks.run).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXED_BATCH_SIZE = 32   # SentenceTransformer.encode default
+
+
+# ------------------------------------------------------------
+# Cost-model encoder
+# ------------------------------------------------------------
+class PaddedCostEncoder:
+    """One (batch x longest x dim) @ (dim x dim) product per forward pass."""
+
+    def __init__(self, dim=384, seed=0):
+        self.dim = dim
+        self.weights = np.random.default_rng(seed).normal(size=(dim, dim)).astype(np.float32)
+
+    def forward(self, lengths):
+        hidden = np.ones((len(lengths), max(lengths), self.dim), dtype=np.float32)
+        return (hidden @ self.weights).mean(axis=1)
+
+
+# ------------------------------------------------------------
+# Plans
+# ------------------------------------------------------------
+def fixed_batches(lengths, size=FIXED_BATCH_SIZE):
+    """Length-sorted, `size` items per batch (previous behaviour)."""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    return [order[i:i + size] for i in range(0, len(order), size)]
+
+
+def run_plan(encoder, lengths, batches):
+    start = time.perf_counter()
+    for batch in batches:
+        encoder.forward([lengths[i] for i in batch])
+    seconds = time.perf_counter() - start
+
+    padded = sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+    real = sum(lengths)
+    return {
+        "passes": len(batches),
+        "padded_tokens": padded,
+        "real_tokens": real,
+        "padding_ratio": round(padded / real, 4) if real else None,
+        "seconds": round(seconds, 4),
+    }
+
+
+# ------------------------------------------------------------
+# Suite
+# ------------------------------------------------------------
+def mixed_texts(n_texts, seed=42):
+    """Resumes (1–16 bullets), JDs and single bullets in equal parts."""
+    from benchmarks.corpus import resume_text, jd_text, _bullet
+
+    rng = random.Random(seed)
+    kinds = [
+        lambda: resume_text(rng, rng.randint(1, 16)),
+        lambda: jd_text(rng, rng.randint(2, 10)),
+        lambda: _bullet(rng),
+    ]
+    return [kinds[i % len(kinds)]() for i in range(n_texts)]
+
+
+def run_benchmarks(n_texts=2000, seed=42, repeat=3):
+    """Times both plans on the same lengths (best of `repeat`) → result dict."""
+    from benchmarks.run import StubEncoder
+    from app.services.embedding_model import (
+        EmbeddingModel, plan_batches, TOKEN_BUDGET, MAX_BATCH_SIZE
+    )
+
+    texts = mixed_texts(n_texts, seed)
+    lengths = EmbeddingModel(backend=StubEncoder(), cache_path=None).token_lengths(texts)
+    encoder = PaddedCostEncoder()
+
+    plans = {
+        f"fixed_{FIXED_BATCH_SIZE}": fixed_batches(lengths),
+        "token_budget": plan_batches(lengths),
+    }
+    stages = {}
+    for name, batches in plans.items():
+        runs = [run_plan(encoder, lengths, batches) for _ in range(repeat)]
+        stages[name] = min(runs, key=lambda r: r["seconds"])
+
+    fixed, budget = stages[f"fixed_{FIXED_BATCH_SIZE}"], stages["token_budget"]
+    return {
+        "meta": {
+            "seed": seed,
+            "texts": n_texts,
+            "token_budget": TOKEN_BUDGET,
+            "max_batch_size": MAX_BATCH_SIZE,
+            "length_p50": int(np.percentile(lengths, 50)),
+            "length_max": max(lengths),
+        },
+        "stages": stages,
+        "speedup": round(fixed["seconds"] / budget["seconds"], 2) if budget["seconds"] else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.batching", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per plan (best kept)")
+    parser.add_argument("--out", default=None, help="JSON output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    result = run_benchmarks(args.texts, seed=args.seed, repeat=args.repeat)
+
+    report = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# FILE: benchmarks/corpus.py
+"""
+Deterministic synthetic resume / JD generator.
+
+Same seed + sizes → identical document text (and byte-identical PDFs),
+so benchmark runs are comparable between releases. PDFs are written by
+a tiny built-in writer (no extra dependency); DOCX files use python-docx.
+"""
+
+import io
+import random
+
+from app.utils.constants import SKILL_VOCAB
+
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sara", "Kabir",
+               "Meera", "Arjun", "Isha", "Dev", "Nisha", "Rahul", "Tara"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Khan", "Reddy", "Gupta", "Das",
+              "Nair", "Singh", "Mehta", "Bose", "Joshi"]
+COMPANIES = ["Infosys", "TCS", "Flipkart", "Zomato", "Freshworks", "Razorpay",
+             "Wipro", "Swiggy", "Accenture", "Paytm"]
+ROLES = ["Data Scientist", "Data Analyst", "Python Developer", "ML Engineer",
+         "NLP Engineer", "Backend Developer", "Software Engineer"]
+DEGREES = ["B.Tech in Computer Science", "Bachelor of Science in Statistics",
+           "M.Tech in Artificial Intelligence", "MSc Data Science",
+           "Bachelor of Engineering in Information Technology"]
+UNIVERSITIES = ["Delhi University", "Anna University", "VIT University",
+                "Pune University", "IIT Bombay", "NIT Trichy"]
+VERBS = ["Developed", "Built", "Designed", "Optimized", "Automated",
+         "Maintained", "Created", "Deployed", "Analyzed", "Improved"]
+OBJECTS = ["a recommendation engine", "ETL pipelines", "customer churn models",
+           "REST APIs", "interactive dashboards", "a resume screening tool",
+           "data quality checks", "forecasting models", "a chatbot",
+           "reporting workflows"]
+OUTCOMES = ["reducing latency by {n}%", "for {n}k daily users",
+            "improving accuracy by {n}%", "saving {n} hours per week",
+            "across {n} business units"]
+
+SKILLS = sorted(SKILL_VOCAB) + ["docker", "flask", "fastapi", "excel", "tableau",
+                                "power bi", "spark", "aws", "linux", "rest api"]
+
+
+# ------------------------------------------------------------
+# Text
+# ------------------------------------------------------------
+def _bullet(rng):
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    skills = ", ".join(rng.sample(SKILLS, 2))
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {skills}, {outcome}."
+
+
+def resume_text(rng, n_bullets=12):
+    """One resume as plain text (about 12 bullets ≈ one page)."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = name.lower().replace(" ", ".") + f"{rng.randint(1, 99)}@example.com"
+    phone = f"+91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}"
+
+    lines = [name, f"{email} | {phone}", "", "SUMMARY",
+             f"{rng.choice(ROLES)} with {rng.randint(1, 9)} years of experience in "
+             f"{', '.join(rng.sample(SKILLS, 4))}.", "", "EXPERIENCE"]
+
+    jobs = max(1, n_bullets // 4)
+    for job in range(jobs):
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} "
+                     f"({2015 + job} - {2016 + job})")
+        lines += [f"- {_bullet(rng)}" for _ in range(n_bullets // jobs)]
+
+    lines += ["", "PROJECTS"]
+    lines += [f"- Project: {_bullet(rng)}" for _ in range(max(1, n_bullets // 4))]
+
+    lines += ["", "EDUCATION",
+              f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)}, {rng.randint(2010, 2022)}",
+              "", "SKILLS", ", ".join(rng.sample(SKILLS, rng.randint(5, 10)))]
+    return "\n".join(lines)
+
+
+def jd_text(rng, n_requirements=8):
+    """One job description as plain text."""
+    role = rng.choice(ROLES)
+    lines = [f"We are looking for a {role} to join {rng.choice(COMPANIES)}.", "",
+             "Responsibilities:"]
+    lines += [f"- {_bullet(rng)}" for _ in range(max(1, n_requirements // 2))]
+    lines += ["", "Requirements:"]
+    lines += [f"- Strong knowledge of {s}" for s in rng.sample(SKILLS, n_requirements)]
+    return "\n".join(lines)
+
+
+# ------------------------------------------------------------
+# File formats
+# ------------------------------------------------------------
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text, width=90):
+    out = []
+    for line in text.split("\n"):
+        while len(line) > width:
+            cut = line.rfind(" ", 0, width)
+            cut = cut if cut > 0 else width
+            out.append(line[:cut])
+            line = line[cut:].lstrip()
+        out.append(line)
+    return out
+
+
+def to_pdf(text, lines_per_page=50):
+    """Minimal text-only PDF (Helvetica 10pt, A4, one content stream per page)."""
+    lines = _wrap(text.encode("latin-1", "replace").decode("latin-1"))
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = []   # object bodies, object number = index + 1
+    n_pages = len(pages)
+    page_ids = [4 + 2 * i for i in range(n_pages)]
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n_pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for pid, page_lines in zip(page_ids, pages):
+        body = "BT /F1 10 Tf 12 TL 50 800 Td\n"
+        body += "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines)
+        body += "ET"
+        stream = body.encode("latin-1")
+
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n"
+                       + stream + b"\nendstream")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.write("".join(f"{off:010d} 00000 n \n" for off in offsets).encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+              f"startxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def to_docx(text):
+    """One paragraph per line."""
+    import docx
+
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+# ------------------------------------------------------------
+# Corpus
+# ------------------------------------------------------------
+class SyntheticFile(io.BytesIO):
+    """In-memory upload (same surface as Streamlit's UploadedFile)."""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+
+def generate_corpus(n_resumes=100, n_jds=5, n_bullets=12, docx_ratio=0.3, seed=42):
+    """
+    Returns {"resumes": [(filename, bytes, text)], "jds": [text]}.
+    About docx_ratio of the resumes are DOCX, the rest PDF.
+    """
+    rng = random.Random(seed)
+
+    resumes = []
+    for i in range(n_resumes):
+        text = resume_text(rng, n_bullets)
+        if rng.random() < docx_ratio:
+            resumes.append((f"resume_{i:05d}.docx", to_docx(text), text))
+        else:
+            resumes.append((f"resume_{i:05d}.pdf", to_pdf(text), text))
+
+    jds = [jd_text(rng) for _ in range(n_jds)]
+    return {"resumes": resumes, "jds": jds}
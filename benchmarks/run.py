@@ -0,0 +1,259 @@
+# FILE: benchmarks/run.py
+"""
+Stage-level + end-to-end throughput benchmark.
+
+    python -m benchmarks.run --resumes 200 --jds 5 --out bench.json
+
+Every stage runs on the same synthetic corpus (benchmarks/corpus.py) and
+reports docs/sec, p50/p95 latency per document and peak traced memory.
+Embedding uses a deterministic hashing stub, so numbers measure the
+pipeline, not the model. Everything (DB, blobs, caches) is written to a
+throw-away working directory.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+# ------------------------------------------------------------
+# Stub encoder (stands in for SBERT)
+# ------------------------------------------------------------
+class StubEncoder:
+    """Hashing-trick bag-of-words vectors; same text → same vector."""
+
+    name = "stub"
+    tokenizer = None
+    max_seq_length = 256
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in text.split()[:self.max_seq_length]:
+            h = zlib.crc32(word.encode("utf-8"))
+            vec[h % self.dim] += 1.0 if h & 1 else -1.0
+        return vec
+
+    def encode(self, sentences, **kwargs):
+        if isinstance(sentences, str):
+            return self._vector(sentences)
+        return np.vstack([self._vector(s) for s in sentences]) if sentences else \
+            np.zeros((0, self.dim), dtype=np.float32)
+
+
+# ------------------------------------------------------------
+# Measurement
+# ------------------------------------------------------------
+def _summary(latencies, n_docs, total):
+    lat = np.asarray(latencies, dtype=np.float64) * 1000.0
+    return {
+        "docs": n_docs,
+        "seconds": round(total, 4),
+        "docs_per_sec": round(n_docs / total, 2) if total > 0 else None,
+        "p50_ms": round(float(np.percentile(lat, 50)), 4) if len(lat) else None,
+        "p95_ms": round(float(np.percentile(lat, 95)), 4) if len(lat) else None,
+    }
+
+
+def measure(fn, items, n_docs=None, memory=True):
+    """
+    Times fn(item) for every item (one latency sample per call), then
+    repeats the pass under tracemalloc for peak memory.
+    n_docs: documents covered by all calls (batch stages pass 1 item).
+    """
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+
+    n_docs = n_docs or len(items)
+    result = _summary(latencies, n_docs, total)
+    if len(items) < n_docs:
+        # Batch call → latency per document
+        result["p50_ms"] = result["p95_ms"] = round(total * 1000.0 / n_docs, 4)
+
+    if memory:
+        tracemalloc.start()
+        for item in items:
+            fn(item)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mem_mb"] = round(peak / 2 ** 20, 3)
+
+    return result
+
+
+# ------------------------------------------------------------
+# Suite
+# ------------------------------------------------------------
+def run_benchmarks(n_resumes=100, n_jds=5, n_bullets=12, seed=42, memory=True):
+    """Runs every stage + the end-to-end pipeline → result dict."""
+    from benchmarks.corpus import generate_corpus, SyntheticFile
+    from app.services.resume_parser import ResumeParser
+    from app.services.preprocessor import TextPreprocessor
+    from app.services.jd_parser import JDParser
+    from app.services.embedding_model import EmbeddingModel
+    from app.services.similarity_engine import SimilarityEngine
+    from app.services.scoring_engine import ScoringEngine
+    from app.utils.section_parser import SectionParser
+    from app.utils import database
+
+    t0 = time.perf_counter()
+    corpus = generate_corpus(n_resumes, n_jds, n_bullets, seed=seed)
+    generate_seconds = time.perf_counter() - t0
+
+    resume_parser = ResumeParser()
+    preprocessor = TextPreprocessor()
+    jd_parser = JDParser()
+    similarity = SimilarityEngine()
+    scoring = ScoringEngine()
+    database.create_tables()
+
+    files = corpus["resumes"]
+    raw_texts = [text for _, _, text in files]
+    preprocessor.clean_text(raw_texts[0])   # load stopwords / lemmatizer outside timings
+    clean_texts = [preprocessor.clean_text(t) for t in raw_texts]
+    jd_infos = [jd_parser.process_jd(jd) for jd in corpus["jds"]]
+
+    def fresh_model():
+        # Empty memory cache, no disk tier → every run really encodes
+        return EmbeddingModel(backend=StubEncoder(), cache_path=None)
+
+    stages = {}
+
+    stages["extract"] = measure(
+        lambda f: resume_parser.get_resume_text(SyntheticFile(f[0], f[1])), files, memory=memory
+    )
+    stages["clean_text"] = measure(preprocessor.clean_text, raw_texts, memory=memory)
+    stages["sections"] = measure(SectionParser.get_sections, raw_texts, memory=memory)
+    stages["extract_skills"] = measure(jd_parser.extract_skills, raw_texts, memory=memory)
+
+    stages["embed_batch"] = measure(
+        lambda texts: fresh_model().get_batch_embeddings(texts),
+        [clean_texts], n_docs=len(clean_texts), memory=memory
+    )
+
+    embedder = fresh_model()
+    resume_embs = embedder.get_batch_embeddings(clean_texts)
+    jd_embs = embedder.get_batch_embeddings([info["clean_text"] for info in jd_infos])
+
+    stages["similarity_matrix"] = measure(
+        lambda _: similarity.similarity_matrix(resume_embs, jd_embs),
+        [None], n_docs=len(clean_texts) * len(jd_infos), memory=memory
+    )
+
+    resume_skills = [jd_parser.match_skills(t, jd_infos[0]["skills"]) for t in raw_texts]
+    stages["scoring"] = measure(
+        lambda skills: scoring.calculate_final_score(0.5, skills, jd_infos[0]["skills"]),
+        resume_skills, memory=memory
+    )
+
+    def write_all(_):
+        ids = [
+            database.save_resume(
+                filename=name, filedata=data, clean_text=clean, skills=[],
+                name=None, email=None, phone=None, education=None,
+                experience=None, projects=None, embedding=emb, wait=False
+            )
+            for (name, data, _), clean, emb in zip(files, clean_texts, resume_embs)
+        ]
+        database.flush()
+        jd_id = database.save_jd(corpus["jds"][0], jd_infos[0]["clean_text"],
+                                 jd_infos[0]["skills"], jd_infos[0]["role"])
+        for pending in ids:
+            database.save_result(pending.result(), jd_id, 0.5, 50.0, wait=False)
+        database.flush()
+
+    stages["db_writes"] = measure(write_all, [None], n_docs=len(files), memory=memory)
+
+    # End-to-end: bytes in → scores for every JD
+    def pipeline(_):
+        model = fresh_model()
+        extracted = [resume_parser.get_resume_text(SyntheticFile(n, d)) for n, d, _ in files]
+        ok = [(raw, clean) for raw, clean in extracted if raw]
+        for raw, _ in ok:
+            SectionParser.get_sections(raw)
+        embs = model.get_batch_embeddings([clean for _, clean in ok])
+        jd_vecs = model.get_batch_embeddings([info["clean_text"] for info in jd_infos])
+        sims = similarity.similarity_matrix(embs, jd_vecs)
+        for r_idx, (raw, _) in enumerate(ok):
+            for j_idx, info in enumerate(jd_infos):
+                skills = jd_parser.match_skills(raw, info["skills"])
+                scoring.calculate_final_score(float(sims[r_idx, j_idx]), skills, info["skills"])
+
+    end_to_end = measure(pipeline, [None], n_docs=len(files), memory=memory)
+
+    pdfs = sum(1 for name, _, _ in files if name.endswith(".pdf"))
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "resumes": n_resumes,
+            "pdf": pdfs,
+            "docx": n_resumes - pdfs,
+            "jds": n_jds,
+            "bullets_per_resume": n_bullets,
+            "corpus_bytes": sum(len(data) for _, data, _ in files),
+            "generate_seconds": round(generate_seconds, 4),
+        },
+        "stages": stages,
+        "end_to_end": end_to_end,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=5)
+    parser.add_argument("--bullets", type=int, default=12, help="resume size (12 ≈ one page)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="JSON output file (default: stdout)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args(argv)
+
+    out_path = os.path.abspath(args.out) if args.out else None
+
+    # DB / blob / cache paths are taken from the cwd at import → scratch dir
+    with tempfile.TemporaryDirectory(prefix="ats-bench-") as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            result = run_benchmarks(args.resumes, args.jds, args.bullets,
+                                    seed=args.seed, memory=not args.no_memory)
+            from app.utils.database import flush
+            flush()
+        finally:
+            os.chdir(cwd)
+
+    report = json.dumps(result, indent=2)
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
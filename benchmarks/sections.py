@@ -0,0 +1,78 @@
+# FILE: benchmarks/sections.py
+"""
+Section extraction: single-pass segmenter vs the per-section scans it
+replaced.
+
+    python -m benchmarks.sections --resumes 2000 --out sections.json
+
+The previous extractors are the tests' reference copy
+(tests/section_reference.py). Both run on the same synthetic resume
+text (benchmarks/corpus.py, no PDF / DOCX rendering) and report
+docs/sec, p50/p95 latency and peak traced memory (benchmarks/run.py
+measure()).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+# ------------------------------------------------------------
+# Suite
+# ------------------------------------------------------------
+def run_benchmarks(n_resumes=1000, n_bullets=12, seed=42, memory=True):
+    """Times legacy_sections vs SectionParser.get_sections → result dict."""
+    from benchmarks.corpus import resume_text
+    from benchmarks.run import measure
+    from tests.section_reference import legacy_sections
+    from app.utils.section_parser import SectionParser
+
+    rng = random.Random(seed)
+    texts = [resume_text(rng, n_bullets) for _ in range(n_resumes)]
+
+    stages = {
+        "legacy": measure(legacy_sections, texts, memory=memory),
+        "single_pass": measure(SectionParser.get_sections, texts, memory=memory),
+    }
+    legacy, single = stages["legacy"]["seconds"], stages["single_pass"]["seconds"]
+    return {
+        "meta": {
+            "seed": seed,
+            "resumes": n_resumes,
+            "bullets_per_resume": n_bullets,
+            "corpus_bytes": sum(len(t) for t in texts),
+        },
+        "stages": stages,
+        "speedup": round(legacy / single, 2) if single > 0 else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sections", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--bullets", type=int, default=12, help="resume size (12 ≈ one page)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="JSON output file (default: stdout)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args(argv)
+
+    result = run_benchmarks(args.resumes, args.bullets, seed=args.seed,
+                            memory=not args.no_memory)
+
+    report = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# FILE: tests/conftest.py
+"""
+Shared fixtures. DB / blob / cache paths are taken from the cwd when
+app modules are imported → the whole session runs in a scratch dir.
+"""
+
+import os
+import tempfile
+import threading
+
+import pytest
+
+os.chdir(tempfile.mkdtemp(prefix="ats-tests-"))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Fresh database for one test (own writer thread + connections)."""
+    from app.utils import database
+
+    database.flush()
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "resume_system.db"))
+    monkeypatch.setattr(database, "_local", threading.local())
+    monkeypatch.setattr(database, "_writer", None)
+    database.create_tables()
+    yield database
+    database.flush()
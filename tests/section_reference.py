@@ -0,0 +1,67 @@
+# FILE: tests/section_reference.py
+"""
+Reference for the section parser tests (also timed by
+benchmarks/sections.py): get_sections() as it was before the
+single-pass segmenter, plus a small seeded resume generator.
+"""
+
+import re
+
+# ------------------------------------------------------------
+# Previous extractors (one lower/split + substring scan per
+# section, regexes compiled per call)
+# ------------------------------------------------------------
+LEGACY_KEYWORDS = {
+    "education": ["bachelor", "b.tech", "btech", "ba", "bs", "master", "m.tech", "mtech",
+                  "msc", "degree", "university", "college", "school", "graduation"],
+    "experience": ["experience", "intern", "worked", "project", "role", "position"],
+    "projects": ["project", "developed", "built", "created"],
+}
+
+
+def _legacy_lines(text, keywords):
+    lines = text.lower().split("\n")
+    matches = [l for l in lines if any(k in l for k in keywords)]
+    return " ".join(matches) if matches else None
+
+
+def legacy_sections(text):
+    """get_sections() as it was before the single-pass segmenter."""
+    from app.utils.section_parser import SectionParser
+
+    email = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
+    phone = re.search(r"(\+?\d[\d\s\-]{7,}\d)", text)
+    return {
+        "name": SectionParser.extract_name(text),
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0) if phone else None,
+        "education": _legacy_lines(text, LEGACY_KEYWORDS["education"]),
+        "experience": _legacy_lines(text, LEGACY_KEYWORDS["experience"]),
+        "projects": _legacy_lines(text, LEGACY_KEYWORDS["projects"]),
+    }
+
+
+# ------------------------------------------------------------
+# Sample resumes (headings, contact line, every section present)
+# ------------------------------------------------------------
+NAMES = ["Priya Sharma", "Rohan Iyer", "Ananya Das", "Kabir Khan", "Meera Nair"]
+ROLES = ["Data Analyst", "Python Developer", "ML Engineer", "Backend Developer"]
+COMPANIES = ["Infosys", "Flipkart", "Razorpay", "Swiggy"]
+WORK = ["Developed ETL pipelines in Python", "Built REST APIs with Flask",
+        "Created dashboards in Tableau", "Automated reporting workflows with SQL"]
+DEGREES = ["B.Tech in Computer Science, Anna University",
+           "MSc Data Science, Delhi University"]
+
+
+def sample_resume(rng):
+    name = rng.choice(NAMES)
+    email = name.lower().replace(" ", ".") + f"{rng.randint(1, 99)}@example.com"
+    phone = f"+91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}"
+
+    lines = [name, f"{email} | {phone}", "", "EXPERIENCE",
+             f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} (2019 - 2022)"]
+    lines += [f"- {line}" for line in rng.sample(WORK, 2)]
+    lines += ["", "PROJECTS", f"- Project: {rng.choice(WORK)}",
+              "", "EDUCATION", rng.choice(DEGREES),
+              "", "SKILLS", "Python, SQL, Excel"]
+    return "\n".join(lines)
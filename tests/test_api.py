@@ -0,0 +1,119 @@
+# FILE: tests/test_api.py
+"""
+HTTP scoring API over a real socket: /score (text and file uploads,
+saving), validation errors, admission control (503 + Retry-After) and
+the chunked file download. JD parsing, extraction and the embedding
+model are replaced by fakes.
+"""
+
+import base64
+import http.client
+import json
+import threading
+import zlib
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from app import api
+from app.services import registry
+
+
+class FakeJDParser:
+    class preprocessor:
+        @staticmethod
+        def clean_text(text):
+            return text.lower()
+
+    def process_jd(self, text):
+        return {"clean_text": text.lower(), "skills": ["python", "sql"], "role": "developer"}
+
+    def extract_skills(self, text):
+        return self.match_skills(text, ["python", "sql"])
+
+    def match_skills(self, text, skills):
+        return [s for s in skills if s in text.lower()]
+
+
+class FakeModel:
+    def encode_documents(self, texts):
+        return [np.random.default_rng(zlib.crc32(t.encode())).normal(size=8).astype(np.float32)
+                for t in texts]
+
+
+class FakePool:
+    def extract_all(self, files):
+        return [{"filename": f.name, "raw_text": f.getvalue().decode(),
+                 "clean_text": f.getvalue().decode().lower(), "sections": None, "error": None}
+                for f in files]
+
+    def cache_stats(self):
+        return {"hits": 0, "misses": 0, "hit_ratio": 0.0, "entries": 0}
+
+
+@pytest.fixture
+def server(db, monkeypatch):
+    monkeypatch.setattr(registry, "get_jd_parser", FakeJDParser)
+    monkeypatch.setattr(registry, "get_embedding_model", FakeModel)
+    monkeypatch.setattr(registry, "get_extraction_pool", lambda workers=None: FakePool())
+    monkeypatch.setattr(api, "ADMIT_TIMEOUT", 0.05)
+    monkeypatch.setattr(api.ApiHandler, "service", api.ScoringService(max_inflight=1))
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), api.ApiHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(server, method, path, body=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                 headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response, data
+
+
+def test_score_text_and_file_uploads(server, db):
+    cv = b"Python and SQL developer"
+    response, data = request(server, "POST", "/score", {
+        "jd": "Python developer with SQL",
+        "resumes": [{"name": "a", "text": "python only"},
+                    {"filename": "b.pdf", "content_b64": base64.b64encode(cv).decode()},
+                    {"name": "c"}],
+        "save": True,
+    })
+    body = json.loads(data)
+
+    assert response.status == 200
+    a, b, c = body["results"]
+    assert a["matched_skills"] == ["python"] and b["matched_skills"] == ["python", "sql"]
+    assert c["error"] and "final_score" not in c
+    assert a["resume_id"] and b["result_id"] and body["jd"]["id"]
+
+    response, data = request(server, "GET", f"/resumes/{b['resume_id']}/file")
+    assert response.status == 200 and data == cv
+
+
+def test_invalid_requests_are_400(server):
+    assert request(server, "POST", "/score", {"jd": "", "resumes": [{"text": "x"}]})[0].status == 400
+    assert request(server, "POST", "/score", {"jd": "python", "resumes": [1]})[0].status == 400
+    assert request(server, "POST", "/search", {"jd": "python", "k": 0})[0].status == 400
+    assert request(server, "GET", "/resumes/999")[0].status == 404
+
+
+def test_admission_control_rejects_when_full(server):
+    service = api.ApiHandler.service
+    service.admit()            # the only slot
+    try:
+        response, _ = request(server, "POST", "/score", {"jd": "python", "resumes": [{"text": "x"}]})
+    finally:
+        service.release()
+
+    assert response.status == 503 and response.getheader("Retry-After") == "1"
+    response, data = request(server, "GET", "/health")
+    assert response.status == 200 and json.loads(data)["inflight"] == 0
@@ -0,0 +1,129 @@
+# FILE: tests/test_batch.py
+"""
+Batch CLI checkpoints: a rerun skips finished pairs, retries error rows
+and never stores a resume / result twice, even after a crash between
+the DB commit and the output append. Extraction, JD parsing and
+embedding are replaced by fakes.
+"""
+
+import csv
+
+import numpy as np
+import pytest
+
+from app import batch
+
+
+class FakePool:
+    broken = set()   # file names that fail extraction
+
+    def __init__(self, workers=None):
+        pass
+
+    def extract_all(self, paths):
+        out = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            failed = any(path.endswith(name) for name in self.broken)
+            out.append({"filename": path, "raw_text": "" if failed else text,
+                        "clean_text": text.lower(), "sections": None,
+                        "error": "could not read file" if failed else None})
+        return out
+
+    def cache_stats(self):
+        return {"hits": 0, "misses": 0, "hit_ratio": 0.0, "entries": 0}
+
+    def close(self):
+        pass
+
+
+class FakeJDParser:
+    def process_jd(self, text):
+        return {"role": "python developer", "skills": ["python", "sql"],
+                "clean_text": text.lower()}
+
+    def match_skills(self, text, skills):
+        return [s for s in skills if s in text.lower()]
+
+
+class FakeEmbeddingModel:
+    def encode_documents(self, texts):
+        return [np.random.default_rng(len(t)).normal(size=8).astype(np.float32) for t in texts]
+
+
+@pytest.fixture
+def corpus(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "ExtractionPool", FakePool)
+    monkeypatch.setattr(batch, "JDParser", FakeJDParser)
+    monkeypatch.setattr(batch, "EmbeddingModel", FakeEmbeddingModel)
+    monkeypatch.setattr(FakePool, "broken", set())
+
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    for i in range(4):   # .docx name, plain text body (FakePool reads it)
+        (resumes / f"cv{i}.docx").write_text(f"Candidate {i}\npython and sql {'x' * i}")
+    jd = tmp_path / "jd.txt"
+    jd.write_text("Python developer with SQL")
+    return str(resumes), str(jd), str(tmp_path / "out.csv")
+
+
+def run(resumes, jd, out):
+    scorer = batch.BatchScorer([jd])
+    list(scorer.run([resumes], out, chunk_size=2))
+    return scorer
+
+
+def output(out):
+    with open(out, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def counts(db):
+    conn = db.get_connection()
+    return tuple(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                 for table in ("resumes", "job_descriptions", "results"))
+
+
+def test_rerun_retries_error_rows_only(db, corpus):
+    resumes, jd, out = corpus
+    FakePool.broken = {"cv1.docx"}
+    run(resumes, jd, out)
+    errors = [row["resume_file"].endswith("cv1.docx") for row in output(out) if row["error"]]
+    assert errors == [True] and len(output(out)) == 4
+    assert counts(db) == (3, 1, 3)
+
+    FakePool.broken = set()
+    run(resumes, jd, out)
+
+    rows = output(out)
+    assert len(rows) == 5 and not rows[-1]["error"]
+    assert rows[-1]["resume_file"].endswith("cv1.docx")
+    assert counts(db) == (4, 1, 4)
+
+
+def test_crash_before_output_append_does_not_duplicate_rows(db, corpus, monkeypatch):
+    resumes, jd, out = corpus
+    write_rows = batch.ResultWriter.write_rows
+
+    def crash_on_second_chunk(self, rows):
+        if any(row["resume_file"].endswith("cv2.docx") for row in rows):
+            raise KeyboardInterrupt   # DB already committed for this chunk
+        write_rows(self, rows)
+
+    monkeypatch.setattr(batch.ResultWriter, "write_rows", crash_on_second_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        run(resumes, jd, out)
+    assert len(output(out)) == 2 and counts(db) == (4, 1, 4)
+
+    monkeypatch.setattr(batch.ResultWriter, "write_rows", write_rows)
+    run(resumes, jd, out)
+
+    assert len(output(out)) == 4
+    assert counts(db) == (4, 1, 4)
+    assert len({row["resume_id"] for row in output(out)}) == 4
+
+
+def test_cache_stats_are_read_before_the_pool_closes(db, corpus):
+    scorer = run(*corpus)
+    assert scorer.cache_stats["entries"] == 0 and "hit_ratio" in scorer.cache_stats
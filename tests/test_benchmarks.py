@@ -0,0 +1,80 @@
+# FILE: tests/test_benchmarks.py
+"""
+Benchmark suite plumbing: the synthetic corpus is deterministic and
+readable by the app's own extractors, measure() reports per-document
+numbers, and the full suite runs end to end (when the NLTK data the
+preprocessor needs is available locally).
+"""
+
+import io
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.run import StubEncoder, measure
+
+
+def nltk_data_available():
+    try:
+        import nltk
+        from app.services.preprocessor import NLTK_DATA_DIR
+    except ImportError:
+        return False
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    try:
+        nltk.data.find("corpora/stopwords")
+        nltk.data.find("corpora/wordnet")
+        return True
+    except LookupError:
+        return False
+
+
+def test_corpus_is_deterministic():
+    first = generate_corpus(n_resumes=6, n_jds=2, seed=3)
+    second = generate_corpus(n_resumes=6, n_jds=2, seed=3)
+
+    assert first == second
+    assert generate_corpus(n_resumes=6, n_jds=2, seed=4)["jds"] != first["jds"]
+
+
+def test_corpus_files_are_readable():
+    from app.utils.file_handler import read_pdf
+
+    docx = pytest.importorskip("docx")
+    corpus = generate_corpus(n_resumes=8, n_jds=1, docx_ratio=0.5, seed=1)
+
+    for name, data, text in corpus["resumes"]:
+        first_line = text.split("\n")[0]
+        if name.endswith(".pdf"):
+            assert first_line in read_pdf(io.BytesIO(data))
+        else:
+            paragraphs = [p.text for p in docx.Document(io.BytesIO(data)).paragraphs]
+            assert paragraphs[0] == first_line
+
+
+def test_measure_reports_per_document_numbers():
+    single = measure(len, ["a", "bb", "ccc"], memory=True)
+    batch = measure(lambda items: [len(i) for i in items], [["a", "bb"]], n_docs=2, memory=False)
+
+    assert single["docs"] == 3 and "peak_mem_mb" in single
+    assert single["p50_ms"] <= single["p95_ms"]
+    assert batch["docs"] == 2 and batch["p50_ms"] == batch["p95_ms"]
+
+
+def test_stub_encoder_is_deterministic():
+    encoder = StubEncoder(dim=16)
+
+    assert (encoder.encode(["python sql"]) == encoder.encode("python sql")).all()
+    assert encoder.encode([]).shape == (0, 16)
+
+
+@pytest.mark.skipif(not nltk_data_available(), reason="NLTK stopwords / wordnet not installed")
+def test_full_suite_runs(db):
+    from benchmarks.run import run_benchmarks
+
+    result = run_benchmarks(n_resumes=4, n_jds=2, n_bullets=4, memory=False)
+
+    assert result["meta"]["resumes"] == 4
+    assert result["end_to_end"]["docs"] == 4
+    assert {"extract", "embed_batch", "similarity_matrix", "db_writes"} <= set(result["stages"])
@@ -0,0 +1,86 @@
+# FILE: tests/test_chunked_embeddings.py
+"""
+Long documents as overlapping windows: every word lands in a window,
+windows of all documents are encoded together (each distinct window
+once) and pooled back into one vector per document.
+"""
+
+import zlib
+
+import numpy as np
+
+from app.services.embedding_model import EmbeddingModel, pool_chunks
+
+
+class StubEncoder:
+    name = "stub"
+    tokenizer = None        # word windows
+    max_seq_length = 10
+
+    def __init__(self):
+        self.seen = []
+
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if any("broken" in t for t in texts):
+            raise ValueError("cannot encode")
+        self.seen.extend(texts)
+        vectors = np.vstack([
+            np.random.default_rng(zlib.crc32(t.encode())).normal(size=8) for t in texts
+        ]).astype(np.float32)
+        return vectors[0] if single else vectors
+
+
+def words(n, prefix="w"):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_windows_cover_the_text_with_overlap():
+    model = EmbeddingModel(backend=StubEncoder(), cache_path=None)
+
+    chunks = model.split_into_chunks(words(30), overlap=2)
+
+    assert all(n <= 8 for _, n in chunks)               # max_seq_length - 2
+    covered = {w for chunk, _ in chunks for w in chunk.split()}
+    assert covered == set(words(30).split())
+    assert chunks[0][0].split()[-2:] == chunks[1][0].split()[:2]
+
+
+def test_short_document_is_its_own_window():
+    model = EmbeddingModel(backend=StubEncoder(), cache_path=None)
+
+    (doc,) = model.embed_documents([words(5)])
+
+    assert doc["chunks"] == [words(5)]
+    assert np.allclose(doc["embedding"], model.get_batch_embeddings([words(5)])[0])
+
+
+def test_windows_are_shared_and_encoded_once():
+    encoder = StubEncoder()
+    model = EmbeddingModel(backend=encoder, cache_path=None)
+
+    docs = model.embed_documents([words(20), words(20), words(3, "x")])
+
+    assert len(encoder.seen) == len(set(encoder.seen))
+    assert np.array_equal(docs[0]["embedding"], docs[1]["embedding"])
+    assert docs[0]["chunk_embeddings"].shape[0] == len(docs[0]["chunks"]) > 1
+
+
+def test_failed_windows_are_left_out_of_the_pool():
+    model = EmbeddingModel(backend=StubEncoder(), cache_path=None)
+
+    doc, dead = model.embed_documents([words(8) + " broken " + words(8, "v"), "broken"])
+
+    assert doc["embedding"] is not None
+    assert all("broken" not in chunk for chunk in doc["chunks"])
+    assert dead == {"embedding": None, "chunks": [], "chunk_embeddings": None}
+
+
+def test_pooling_methods():
+    vecs = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    assert np.allclose(pool_chunks(vecs, np.array([3.0, 1.0]), "mean"), [0.75, 0.25])
+    assert np.allclose(pool_chunks(vecs, method="max"), [1.0, 1.0])
+    attention = pool_chunks(vecs, np.array([1.0, 1.0]), "attention")
+    assert attention.shape == (2,) and np.isfinite(attention).all()
@@ -0,0 +1,115 @@
+# FILE: tests/test_database.py
+"""
+Single writer (row ids, queue order, one failed write in a batch) and
+blob store reference counting: a file lives as long as a resume or a
+queued job item references it, and a rolled-back delete keeps it.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from app.utils.blob_store import has_blob, hash_bytes
+
+
+def save(db, data, name="cv"):
+    return db.save_resume(filename=name, filedata=data, clean_text="python", skills=["python"],
+                          name=None, email=None, phone=None, education=None,
+                          experience=None, projects=None)
+
+
+def refcount(db, sha256):
+    row = db.get_connection().execute(
+        "SELECT refcount FROM file_blobs WHERE sha256 = ?", (sha256,)
+    ).fetchone()
+    return row["refcount"] if row else None
+
+
+def hold_writer(db):
+    """Parks the writer thread → everything queued meanwhile is one batch."""
+    release = threading.Event()
+    db._transact(lambda cursor, unused: release.wait(10), wait=False)
+    return release
+
+
+def test_batch_keeps_order_and_isolates_a_failed_write(db):
+    release = hold_writer(db)
+    jd = db._submit("INSERT INTO job_descriptions (raw_jd) VALUES ('a')", (), wait=False)
+    bad = db._submit("INSERT INTO no_such_table VALUES (1)", (), wait=False)
+    seen = db._transact(lambda cursor, unused: cursor.execute(
+        "SELECT COUNT(*) FROM job_descriptions").fetchone()[0], wait=False)
+    release.set()
+
+    assert jd.result(5) > 0
+    with pytest.raises(sqlite3.OperationalError):
+        bad.result(5)
+    assert seen.result(5) == 1   # ran after the insert queued before it
+
+
+def test_upsert_without_id_does_not_report_one(db):
+    sql = db.BLOB_REF_SQL
+    assert db._submit(sql, ("f" * 64, 10), wait=True, want_id=False) is None
+    assert db._submit(sql, ("f" * 64, 10), wait=True, want_id=False) is None
+    assert refcount(db, "f" * 64) == 2
+
+
+def test_shared_file_goes_with_its_last_resume(db):
+    data = b"same upload, two resumes"
+    sha256 = hash_bytes(data)
+    first, second = save(db, data), save(db, data)
+    assert refcount(db, sha256) == 2
+
+    assert db.delete_resume(first)
+    assert refcount(db, sha256) == 1 and has_blob(sha256)
+
+    assert db.delete_resume(second)
+    assert refcount(db, sha256) is None and not has_blob(sha256)
+
+
+def test_rolled_back_delete_keeps_the_file(db, monkeypatch):
+    connect = db._connect
+
+    def connect_with_foreign_keys():
+        conn = connect()
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    monkeypatch.setattr(db, "_connect", connect_with_foreign_keys)
+    monkeypatch.setattr(db, "_local", threading.local())
+
+    data = b"delete whose commit fails"
+    sha256 = hash_bytes(data)
+    resume_id = save(db, data)
+
+    # Deferred check → the delete runs through, its COMMIT is refused
+    conn = db.get_connection()
+    conn.execute("""
+        CREATE TABLE pins (sha256 TEXT REFERENCES file_blobs (sha256)
+                           DEFERRABLE INITIALLY DEFERRED)
+    """)
+    conn.execute("INSERT INTO pins VALUES (?)", (sha256,))
+    conn.commit()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db.delete_resume(resume_id)
+
+    assert db.get_resume(resume_id) is not None
+    assert refcount(db, sha256) == 1
+    assert has_blob(sha256)
+
+
+def test_job_item_reference_outlives_nothing_else(db):
+    data = b"uploaded once, queued and saved"
+    sha256 = hash_bytes(data)
+    resume_id = save(db, data)
+    job_id = db.submit_job(None, [("cv.txt", data)])
+    assert refcount(db, sha256) == 2
+
+    (item,) = db.next_job_items(job_id)
+    item.update(status="done", error=None)
+    db.update_job_items([item])
+    assert refcount(db, sha256) == 1 and has_blob(sha256)
+
+    db.delete_resume(resume_id)
+    assert not has_blob(sha256)
@@ -0,0 +1,115 @@
+# FILE: tests/test_document_cache.py
+"""
+Parsed-document cache: hits keyed by file + parser version + page cap,
+row / age bounds, purges, a corrupt file degrading to no cache, and
+ExtractionPool serving a repeat upload from it.
+"""
+
+import io
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.utils.document_cache import DocumentCache, file_key, purge_documents
+
+
+def doc(text):
+    return {"raw_text": text, "clean_text": text.lower(), "sections": {"skills": text}}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "document_cache.db")
+
+
+def test_repeat_lookup_hits_and_version_or_page_cap_misses(path):
+    key = file_key(b"resume bytes")
+    cache = DocumentCache(path)
+    cache.put_many([(key, doc("Python SQL"))], max_pages=5)
+
+    assert cache.get_many([key], max_pages=5) == [doc("Python SQL")]
+    assert cache.get_many([key], max_pages=None) == [None]
+    cache.close()
+
+    other = DocumentCache(path, version=cache.version + 1)
+    assert other.get_many([key], max_pages=5) == [None]
+    assert other.stats() == {"hits": 0, "misses": 1, "hit_ratio": 0.0, "entries": 0}
+    other.close()
+
+
+def test_rows_past_the_bound_drop_the_oldest_writes(path):
+    cache = DocumentCache(path, max_rows=10)
+    keys = [file_key(str(i).encode()) for i in range(11)]
+    for key in keys:
+        cache.put_many([(key, doc(key))])
+
+    assert cache.stats()["entries"] == 9
+    hits = cache.get_many(keys)
+    assert hits[:2] == [None, None] and all(hits[2:])
+    cache.close()
+
+
+def test_entries_past_the_age_bound_go_on_start(path):
+    old, new = file_key(b"old"), file_key(b"new")
+    cache = DocumentCache(path)
+    cache.put_many([(old, doc("old")), (new, doc("new"))])
+    cache._conn.execute("UPDATE documents SET created_at = ? WHERE sha256 = ?",
+                        (datetime.now() - timedelta(days=30), old))
+    cache._conn.commit()
+    cache.close()
+
+    cache = DocumentCache(path, max_age_days=7)
+    assert cache.get_many([old, new]) == [None, doc("new")]
+    cache.close()
+
+
+def test_purge_drops_every_version_and_page_cap(path):
+    gone, kept = file_key(b"deleted resume"), file_key(b"kept resume")
+    for version in (1, 2):
+        cache = DocumentCache(path, version=version, prune=False)
+        cache.put_many([(gone, doc("gone")), (kept, doc("kept"))])
+        cache.put_many([(gone, doc("gone"))], max_pages=3)
+        cache.close()
+
+    purge_documents([gone, gone], path)
+
+    rows = sqlite3.connect(path).execute("SELECT DISTINCT sha256 FROM documents").fetchall()
+    assert rows == [(kept,)]
+
+
+def test_corrupt_file_degrades_to_no_cache(path):
+    with open(path, "wb") as f:
+        f.write(b"not a sqlite database" * 100)
+
+    cache = DocumentCache(path)
+    key = file_key(b"resume")
+    cache.put_many([(key, doc("python"))])
+
+    assert cache.get_many([key]) == [None]
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_extraction_pool_serves_cached_files_without_a_worker(path):
+    from app.services.extraction_pool import ExtractionPool
+
+    cached, unreadable = b"parsed on an earlier upload", b"neither pdf nor docx"
+    pool = ExtractionPool(workers=1, cache_path=path)
+    try:
+        pool.cache.put_many([(file_key(cached), doc("Python SQL"))], pool.max_pages)
+        uploads = []
+        for name, data in (("cv.docx", cached), ("bad.docx", unreadable)):
+            f = io.BytesIO(data)
+            f.name = name
+            uploads.append(f)
+        hit, miss = pool.extract_all(uploads)
+        stats = pool.cache_stats()
+    finally:
+        pool.close()
+
+    assert (hit["filename"], hit["error"]) == ("cv.docx", None)
+    assert hit["raw_text"] == "Python SQL" and hit["sections"] == {"skills": "Python SQL"}
+    assert miss["error"]
+    # Failed parses are not cached → only the seeded entry
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
@@ -0,0 +1,126 @@
+# FILE: tests/test_embedding_cache.py
+"""
+Two-tier embedding cache (memory LRU + SQLite) and the batch path of
+EmbeddingModel that uses it: only unseen texts reach the encoder, once
+each, and one bad text does not fail its batch.
+"""
+
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+from app.services.embedding_model import EmbeddingModel
+from app.utils.embedding_cache import EmbeddingCache
+
+
+def vec(text, dim=8):
+    return np.random.default_rng(zlib.crc32(text.encode())).normal(size=dim).astype(np.float32)
+
+
+class CountingEncoder:
+    name = "stub"
+    tokenizer = None
+    max_seq_length = 256
+
+    def __init__(self):
+        self.seen = []
+
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if "bad" in texts:
+            raise ValueError("cannot encode")
+        self.seen.extend(texts)
+        vectors = np.vstack([vec(t) for t in texts])
+        return vectors[0] if single else vectors
+
+
+def test_disk_tier_survives_a_restart_per_model(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache("model-a", path=path)
+    cache.put_many(["python", "sql"], [vec("python"), vec("sql")])
+    cache.close()
+
+    reopened = EmbeddingCache("model-a", path=path)
+    got = reopened.get_many(["python", "sql", "java"])
+    assert np.array_equal(got[0], vec("python")) and got[2] is None
+    assert reopened.stats()["disk_hits"] == 2 and reopened.stats()["misses"] == 1
+
+    assert EmbeddingCache("model-b", path=path).get("python") is None
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    cache = EmbeddingCache("m", path=None, max_bytes=3 * vec("x").nbytes)
+    for text in ["a", "b", "c"]:
+        cache.put(text, vec(text))
+    cache.get("a")            # most recently used → survives
+    cache.put("d", vec("d"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memory_bytes"] <= cache.max_bytes
+
+
+def test_cached_vectors_are_read_only():
+    cache = EmbeddingCache("m", path=None)
+    cache.put("python", vec("python"))
+
+    with pytest.raises(ValueError):
+        cache.get("python")[0] = 1.0
+
+
+def test_disk_tier_prunes_oldest_writes(tmp_path):
+    cache = EmbeddingCache("m", path=str(tmp_path / "e.db"), max_disk_rows=10)
+    for i in range(25):
+        cache.put(f"text {i}", vec(f"text {i}"))
+    cache.clear_memory()
+
+    assert cache.get("text 24") is not None and cache.get("text 0") is None
+    rows = cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert rows <= 10
+
+
+def test_concurrent_lookups_and_writes(tmp_path):
+    cache = EmbeddingCache("m", path=str(tmp_path / "e.db"), max_bytes=20 * vec("x").nbytes)
+    errors = []
+
+    def worker(tag):
+        try:
+            for i in range(50):
+                text = f"{tag} {i % 30}"
+                got = cache.get(text)
+                if got is not None:
+                    assert np.array_equal(got, vec(text))
+                cache.put(text, vec(text))
+        except Exception as e:   # surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in "abcd"]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_batch_encodes_each_unseen_text_once(tmp_path):
+    encoder = CountingEncoder()
+    model = EmbeddingModel(backend=encoder, cache_path=str(tmp_path / "e.db"))
+
+    first = model.get_batch_embeddings(["python", "sql", "python"])
+    second = model.get_batch_embeddings(["sql", "java"])
+
+    assert sorted(encoder.seen) == ["java", "python", "sql"]
+    assert np.array_equal(first[0], first[2]) and np.array_equal(first[1], second[0])
+
+
+def test_bad_text_does_not_fail_its_batch(tmp_path):
+    model = EmbeddingModel(backend=CountingEncoder(), cache_path=None)
+
+    out = model.get_batch_embeddings(["python", "bad", "sql"])
+
+    assert out[1] is None
+    assert np.array_equal(out[0], vec("python")) and np.array_equal(out[2], vec("sql"))
@@ -0,0 +1,98 @@
+# FILE: tests/test_embedding_daemon.py
+"""
+Embedding daemon client over a real Unix socket: vectors come back
+through shared memory, a busy daemon is waited for and then fails the
+request, and only an unreachable daemon loads the model in-process.
+The served model is a hashing stub.
+"""
+
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+from app.services import embedding_daemon
+from app.services.embedding_daemon import DaemonBusy, EmbeddingDaemon, SidecarEncoder
+
+
+class StubEncoder:
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else sentences
+        vectors = np.array([[zlib.crc32(f"{t}{i}".encode()) % 97 for i in range(8)]
+                            for t in texts], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+class StubModel:
+    model_name, backend, device = "stub", "stub", "cpu"
+
+    def __init__(self):
+        self.model = StubEncoder()
+
+    def warmup(self):
+        pass
+
+    def token_lengths(self, texts):
+        return [len(t.split()) + 2 for t in texts]
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    server = EmbeddingDaemon(str(tmp_path / "embed.sock"), model=StubModel())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client(server, loads):
+    def fallback():
+        loads.append(1)
+        return StubEncoder()
+    return SidecarEncoder(server.server_address, fallback)
+
+
+def test_vectors_come_back_from_the_daemon(daemon):
+    loads = []
+    texts = ["python developer", "sql analyst", "python developer"]
+
+    vectors = client(daemon, loads).encode(texts)
+
+    assert np.array_equal(vectors, StubEncoder().encode(texts))
+    assert not loads
+
+
+def test_busy_daemon_fails_the_request_without_loading_a_model(daemon, monkeypatch):
+    monkeypatch.setattr(embedding_daemon, "BUSY_WAIT_SECONDS", 0.2)
+    daemon.batcher.max_queued = 0   # every request rejected as busy
+    loads = []
+    sidecar = client(daemon, loads)
+
+    with pytest.raises(DaemonBusy):
+        sidecar.encode(["python developer"])
+    with pytest.raises(DaemonBusy):   # fails fast right after
+        sidecar.encode(["sql analyst"])
+    assert not loads
+
+
+def test_busy_daemon_is_waited_out(daemon, monkeypatch):
+    monkeypatch.setattr(embedding_daemon, "BUSY_WAIT_SECONDS", 5.0)
+    daemon.batcher.max_queued = 0
+    threading.Timer(0.2, lambda: setattr(daemon.batcher, "max_queued", 100)).start()
+    loads = []
+
+    vectors = client(daemon, loads).encode(["python developer"])
+
+    assert vectors.shape == (1, 8) and not loads
+
+
+def test_unreachable_daemon_loads_the_model_in_process(tmp_path):
+    loads = []
+    sidecar = SidecarEncoder(str(tmp_path / "nobody.sock"), lambda: loads.append(1) or StubEncoder())
+
+    vectors = sidecar.encode(["python developer", "sql analyst"])
+
+    assert vectors.shape == (2, 8) and loads == [1]
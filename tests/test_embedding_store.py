@@ -0,0 +1,69 @@
+# FILE: tests/test_embedding_store.py
+"""
+Quantized embedding store: int8 / float16 codes stay close to the
+float32 vectors, the exact re-rank gives the float32 top-k, and the
+store follows resumes saved / deleted through the database.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.embedding_store import QuantizedEmbeddingStore
+
+
+def vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def save(db, emb):
+    return db.save_resume(filename="cv", filedata=None, clean_text="python", skills=[],
+                          name=None, email=None, phone=None, education=None,
+                          experience=None, projects=None, embedding=emb)
+
+
+def exact_top(vecs, ids, query, k):
+    unit = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    return [int(ids[i]) for i in np.argsort(-scores, kind="stable")[:k]]
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_codes_stay_close_to_float32(dtype):
+    store = QuantizedEmbeddingStore(dtype=dtype, load=False)
+    vecs = vectors(100)
+    store.add(np.arange(1, 101), vecs)
+
+    unit = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    assert np.abs(store.dequantize() - unit).max() < 0.01
+    assert store.memory_report()["compression"] >= (3.5 if dtype == "int8" else 2.0)
+
+
+def test_rerank_returns_the_float32_top_k():
+    store = QuantizedEmbeddingStore(dtype="int8", load=False, dim=32)
+    vecs, ids = vectors(500), np.arange(1, 501)
+    store.add(ids, vecs)
+    store.refresh = lambda: 0   # in-memory only
+    full = {int(rid): v for rid, v in zip(ids, vecs)}
+
+    for query in vectors(10, seed=1):
+        found = [rid for rid, _ in store.search(query, k=10, full_vectors=full)]
+        assert found == exact_top(vecs, ids, query, 10)
+
+
+def test_store_follows_saved_and_deleted_resumes(db):
+    vecs = vectors(5)
+    ids = [save(db, v) for v in vecs[:3]]
+    store = QuantizedEmbeddingStore(dtype="int8")
+    assert len(store) == 3
+
+    new_id = save(db, vecs[3])
+    db.delete_resume(ids[0])
+    found = [rid for rid, _ in store.search(vecs[3], k=5)]
+
+    assert found[0] == new_id and ids[0] not in found and len(store) == 3
+    assert store.overlap([vecs[1], vecs[2]], k=2) == 1.0
+
+
+def test_unknown_dtype_is_rejected():
+    with pytest.raises(ValueError):
+        QuantizedEmbeddingStore(dtype="int4", load=False)
@@ -0,0 +1,59 @@
+# FILE: tests/test_extraction_pool.py
+"""
+ExtractionPool shared between threads (one pool per process, every
+session thread calls it): each caller must get its own files back.
+"""
+
+import io
+import threading
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+from app.services.extraction_pool import ExtractionPool  # noqa: E402
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+
+def make_docx(name, marker):
+    document = docx.Document()
+    document.add_paragraph(f"Candidate {marker}")
+    document.add_paragraph(f"Worked on project {marker} with python and sql")
+    out = io.BytesIO()
+    document.save(out)
+    return Upload(name, out.getvalue())
+
+
+def test_concurrent_callers_get_their_own_results():
+    pool = ExtractionPool(workers=2, cache_path=None)
+    outcomes, errors = {}, []
+
+    def caller(tag):
+        files = [make_docx(f"{tag}_{i}.docx", f"{tag}marker{i}") for i in range(12)]
+        try:
+            outcomes[tag] = (files, pool.extract_all(files))
+        except Exception as e:   # surfaced below
+            errors.append(e)
+
+    try:
+        threads = [threading.Thread(target=caller, args=(tag,)) for tag in ("alpha", "beta")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=120)
+    finally:
+        pool.close()
+
+    assert not errors
+    for tag, (files, results) in outcomes.items():
+        assert len(results) == len(files)
+        for i, (upload, item) in enumerate(zip(files, results)):
+            assert item["filename"] == upload.name
+            if item["error"] is None:
+                assert f"{tag}marker{i}" in item["raw_text"].lower()
+    assert set(outcomes) == {"alpha", "beta"}
@@ -0,0 +1,84 @@
+# FILE: tests/test_inference_backends.py
+"""
+Offline checks of the inference backends against a tiny random model
+(build_tiny_model → no download). Skipped when the optional runtimes
+are not installed.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("sentence_transformers")
+
+from app.services.inference_backends import (  # noqa: E402
+    TorchBackend, OnnxBackend, TorchScriptBackend, VALIDATION_TEXTS,
+    build_tiny_model, check_backend, load_backend, validate_backend
+)
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    return build_tiny_model(str(tmp_path_factory.mktemp("tiny_sbert")))
+
+
+@pytest.fixture(scope="module")
+def reference(tiny_model):
+    return TorchBackend(tiny_model)
+
+
+def test_torch_backend_encodes_single_and_batch(reference):
+    batch = reference.encode(VALIDATION_TEXTS, convert_to_numpy=True)
+    single = reference.encode(VALIDATION_TEXTS[0], convert_to_numpy=True)
+
+    assert batch.shape == (len(VALIDATION_TEXTS), 32)
+    assert single.shape == (32,)
+    assert np.allclose(single, batch[0], atol=1e-5)
+
+
+def test_onnx_backend_agrees_with_torch(tiny_model, reference, tmp_path):
+    pytest.importorskip("onnxruntime")
+    backend = OnnxBackend(tiny_model, export_dir=str(tmp_path))
+
+    report = validate_backend(backend, reference)
+    assert report["passed"], report
+
+
+def test_torchscript_backend_agrees_with_torch(tiny_model, reference, tmp_path):
+    backend = TorchScriptBackend(tiny_model, export_dir=str(tmp_path))
+
+    report = validate_backend(backend, reference)
+    assert report["passed"], report
+
+
+def test_graph_backend_pads_mixed_lengths_like_torch(tiny_model, reference, tmp_path):
+    backend = TorchScriptBackend(tiny_model, export_dir=str(tmp_path))
+    texts = ["python", VALIDATION_TEXTS[1] + " " + VALIDATION_TEXTS[2]]
+
+    a = backend.encode(texts, batch_size=2)
+    b = np.vstack([backend.encode(t) for t in texts])
+    assert np.allclose(a, b, atol=1e-4)
+
+
+def test_check_backend_caches_report(tiny_model, tmp_path):
+    backend = TorchScriptBackend(tiny_model, export_dir=str(tmp_path))
+
+    first = check_backend(backend, tiny_model, export_dir=str(tmp_path))
+    assert (tmp_path / "torchscript.validation.json").exists()
+    assert check_backend(backend, tiny_model, export_dir=str(tmp_path)) == first
+
+
+def test_check_backend_reports_disagreement(tiny_model, tmp_path):
+    class Shuffled:
+        name = "shuffled"
+
+        def encode(self, texts, **kwargs):
+            return np.random.default_rng(0).normal(size=(len(texts), 32)).astype(np.float32)
+
+    assert not check_backend(Shuffled(), tiny_model, export_dir=str(tmp_path))["passed"]
+
+
+def test_load_backend_rejects_unknown_name(tiny_model):
+    with pytest.raises(ValueError):
+        load_backend("tensorrt", tiny_model)
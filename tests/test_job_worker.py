@@ -0,0 +1,112 @@
+# FILE: tests/test_job_worker.py
+"""
+Background job retries: rows an interrupted attempt already saved are
+reused (no duplicate resumes / results) and only unfinished files are
+charged an attempt. Extraction and embedding are replaced by fakes.
+"""
+
+import numpy as np
+import pytest
+
+from app.services import job_worker, registry
+
+
+class FakePool:
+    def extract_all(self, files):
+        out = []
+        for f in files:
+            text = f.getvalue().decode()
+            out.append({"filename": f.name, "raw_text": text, "clean_text": text.lower(),
+                        "sections": None, "error": None if text else "no text found"})
+        return out
+
+
+def fake_embed(texts):
+    return [np.random.default_rng(len(t)).normal(size=8).astype(np.float32) for t in texts]
+
+
+@pytest.fixture
+def job(db, monkeypatch):
+    monkeypatch.setitem(registry._engines, "extraction_pool", FakePool())
+    monkeypatch.setattr(job_worker, "_embed", fake_embed)
+    monkeypatch.setattr(registry, "get_embedding_model", lambda: type(
+        "Model", (), {"encode_document": staticmethod(lambda text: fake_embed([text])[0])}
+    ))
+
+    jd_id = db.save_jd("python developer with sql", "python developer sql", ["python", "sql"], None)
+    files = [(f"cv{i}.txt", f"Candidate {i}\npython and sql work {'x' * i}".encode())
+             for i in range(3)]
+    job_id = db.submit_job(jd_id, files)
+    claimed = db.claim_job("test-worker")
+    assert claimed["id"] == job_id
+    return claimed
+
+
+def counts(db):
+    conn = db.get_connection()
+    return tuple(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                 for table in ("resumes", "results"))
+
+
+def test_retry_after_failed_result_write_reuses_saved_resumes(db, job, monkeypatch):
+    save_result = db.save_result
+    calls = {"n": 0}
+
+    def flaky_save_result(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("disk I/O error")
+        return save_result(*args, **kwargs)
+
+    monkeypatch.setattr(db, "save_result", flaky_save_result)
+    job_worker.run_job(job, "test-worker")
+
+    items = db.get_job_results(job["id"])
+    assert [it["status"] for it in items] == ["done"] * 3
+    assert counts(db) == (3, 3)
+    assert all(it["resume_id"] and it["result_id"] for it in items)
+    # The one failed chunk counts against its unfinished files only once
+    assert all(it["attempts"] == 1 for it in items)
+
+
+def test_items_saved_before_a_crash_are_not_saved_again(db, job):
+    # Worker dies after the rows are committed, before the items are updated
+    items = db.next_job_items(job["id"])
+    jd = {"id": job["jd_id"], "skills": ["python", "sql"], "embedding": fake_embed(["jd"])[0]}
+    job_worker.process_items(items, jd)
+    db.flush()
+    assert counts(db) == (3, 3)
+
+    job_worker.run_job(job, "test-worker")
+
+    items = db.get_job_results(job["id"])
+    assert [it["status"] for it in items] == ["done"] * 3
+    assert [it["attempts"] for it in items] == [0, 0, 0]
+    assert counts(db) == (3, 3)
+    assert all(it["skills"] == "python,sql" for it in items)
+
+
+def test_failed_chunk_does_not_charge_settled_items(db, monkeypatch):
+    monkeypatch.setitem(registry._engines, "extraction_pool", FakePool())
+    monkeypatch.setattr(job_worker, "_embed", fake_embed)
+
+    def broken_similarity():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(registry, "get_similarity_engine", broken_similarity)
+    jd_id = db.save_jd("python", "python", ["python"], None)
+    job_id = db.submit_job(jd_id, [("empty.txt", b""), ("cv.txt", b"python")])
+    items = db.next_job_items(job_id)
+
+    with pytest.raises(RuntimeError):
+        job_worker.process_items(items, {"id": jd_id, "skills": ["python"],
+                                         "embedding": fake_embed(["jd"])[0]})
+
+    empty, cv = items
+    assert (empty["status"], empty["attempts"]) == ("failed", 1)   # settled before the error
+    assert cv["status"] == "running"                               # run_job charges this one
+
+
+def test_cpu_budget_is_split_between_workers():
+    assert job_worker.cpu_share(2, budget=7) == 3
+    assert job_worker.cpu_share(4, budget=2) == 1
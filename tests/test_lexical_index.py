@@ -0,0 +1,88 @@
+# FILE: tests/test_lexical_index.py
+"""
+BM25 first stage: scores match the textbook formula, the shortlist
+puts the most relevant texts first, and the persistent index follows
+resumes saved / deleted through the database across reloads.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.services.lexical_index import (
+    BM25_B, BM25_K1, LexicalIndex, bm25_scores, shortlist_texts, term_counts
+)
+
+DOCS = [
+    "python developer with sql and python scripts",
+    "java backend engineer",
+    "data analyst sql excel reporting",
+    "python",
+]
+
+
+def reference_bm25(docs, query, k1=BM25_K1, b=BM25_B):
+    tokenized = [d.split() for d in docs]
+    avgdl = sum(map(len, tokenized)) / len(tokenized)
+    scores = []
+    for words in tokenized:
+        tf = Counter(words)
+        score = 0.0
+        for term in set(query.split()):
+            df = sum(term in other for other in tokenized)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            f = tf[term]
+            score += idf * f * (k1 + 1) / (f + k1 * (1 - b + b * len(words) / avgdl))
+        scores.append(score)
+    return np.array(scores)
+
+
+def test_scores_match_the_formula():
+    query = "python sql"
+    scores = bm25_scores(term_counts(DOCS), term_counts([query]))
+
+    assert np.allclose(scores, reference_bm25(DOCS, query), rtol=1e-4)
+
+
+def test_shortlist_orders_by_relevance():
+    picked, scores = shortlist_texts(DOCS, "python sql", n=2)
+
+    expected = np.argsort(-reference_bm25(DOCS, "python sql"), kind="stable")[:2]
+    assert list(picked) == list(expected)
+    assert scores.max() == 1.0 and scores[1] == 0.0
+
+
+def test_query_without_known_terms_scores_zero():
+    picked, scores = shortlist_texts(DOCS, "rust", n=2)
+    assert len(picked) == 2 and not scores.any()
+
+
+def save(db, text):
+    return db.save_resume(filename="cv", filedata=None, clean_text=text, skills=[],
+                          name=None, email=None, phone=None, education=None,
+                          experience=None, projects=None)
+
+
+def test_index_follows_the_database_across_reloads(db, tmp_path):
+    ids = [save(db, text) for text in DOCS]
+    path = str(tmp_path / "lexical.npz")
+    index = LexicalIndex(index_path=path)
+    assert len(index) == 4 and index.shortlist("java", 1)[0][0] == ids[1]
+
+    new_id = save(db, "senior java architect java")
+    db.delete_resume(ids[1])
+    found = [rid for rid, _ in index.shortlist("java", 2)]
+    assert found[0] == new_id and ids[1] not in found
+
+    reopened = LexicalIndex(index_path=path)
+    assert sorted(reopened.ids.tolist()) == sorted([*ids[:1], *ids[2:], new_id])
+
+
+def test_unreadable_index_file_is_rebuilt(db, tmp_path):
+    save(db, "python developer")
+    path = tmp_path / "lexical.npz"
+    path.write_bytes(b"not an npz file")
+
+    assert len(LexicalIndex(index_path=str(path))) == 1
@@ -0,0 +1,97 @@
+# FILE: tests/test_metrics.py
+"""
+Instrumentation: spans feed the stage histograms and the per-run
+breakdown (also from other threads and processes), and the export
+formats carry the same numbers.
+"""
+
+import json
+import threading
+
+import pytest
+
+from app.utils import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_spans_and_counters_reach_the_snapshot():
+    with metrics.span("parse"):
+        pass
+
+    @metrics.span("parse")
+    def parse():
+        return "done"
+
+    assert parse() == "done"
+    metrics.inc("files", 3)
+    metrics.inc("files")
+    metrics.inc("files", 0)
+
+    snap = metrics.snapshot()
+    assert snap["counters"] == {"files": 4}
+    assert snap["stages"]["parse"]["count"] == 2
+    assert sum(snap["stages"]["parse"]["buckets"].values()) == 2
+
+
+def test_breakdown_collects_only_its_own_run():
+    with metrics.span("before"):
+        pass
+
+    with metrics.collect() as run:
+        metrics.observe("embed", 0.2)
+        metrics.observe("embed", 0.1)
+        metrics.observe("db_commit", 0.5)
+
+    # Slowest stage first
+    assert [(r["stage"], r["calls"]) for r in run.rows()] == [("db_commit", 1), ("embed", 2)]
+    assert run.rows()[1]["total_ms"] == pytest.approx(300.0)
+
+
+def test_attached_thread_counts_toward_the_run():
+    with metrics.collect() as run:
+        runs = metrics.current_runs()
+
+        def worker():
+            with metrics.attach(runs):
+                metrics.observe("db_commit", 0.01)
+            metrics.observe("unrelated", 0.01)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    assert set(run.stages) == {"db_commit"}
+
+
+def test_captured_samples_replay_into_the_run():
+    with metrics.capture() as samples:   # e.g. inside an extraction worker
+        metrics.observe("pdf_page_fast", 0.02)
+
+    with metrics.collect() as run:
+        metrics.replay(list(samples))
+
+    assert run.stages["pdf_page_fast"][0] == 1
+    assert metrics.snapshot()["stages"]["pdf_page_fast"]["count"] == 2
+
+
+def test_prometheus_and_json_exports(tmp_path):
+    metrics.inc("embedding_cache_hits", 5)
+    metrics.observe("embed", 0.003)
+    metrics.observe("embed", 20.0)
+
+    text = metrics.to_prometheus()
+    assert "ats_embedding_cache_hits_total 5" in text
+    assert 'ats_stage_seconds_bucket{stage="embed",le="0.005"} 1' in text
+    assert 'ats_stage_seconds_bucket{stage="embed",le="+Inf"} 2' in text
+    assert 'ats_stage_seconds_count{stage="embed"} 2' in text
+
+    assert metrics.write_snapshot(str(tmp_path / "m.prom"))
+    assert (tmp_path / "m.prom").read_text() == text
+    assert metrics.write_snapshot(str(tmp_path / "m.json"))
+    assert json.loads((tmp_path / "m.json").read_text())["counters"] == {"embedding_cache_hits": 5}
@@ -0,0 +1,84 @@
+# FILE: tests/test_micro_batcher.py
+"""
+Micro-batcher: concurrent callers share encode calls but each gets its
+own vectors back; a full queue is refused and a failed encode fails
+only the requests batched with it.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.services.micro_batcher import MicroBatcher, Overloaded
+
+
+class Encoder:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, texts):
+        self.release.wait(5)
+        self.calls.append(list(texts))
+        if "boom" in texts:
+            raise ValueError("encoder failed")
+        return [np.full(4, len(t), dtype=np.float32) for t in texts]
+
+
+def test_concurrent_requests_share_batches():
+    encoder = Encoder()
+    batcher = MicroBatcher(encoder, max_batch=64, max_wait_ms=50)
+    results, start = {}, threading.Barrier(8)
+
+    def caller(i):
+        texts = ["x" * (i * 10 + j) for j in range(1, 4)]
+        start.wait()
+        results[i] = (texts, batcher.submit(texts).result(5))
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(encoder.calls) < 8
+    for texts, vectors in results.values():
+        assert [int(v[0]) for v in vectors] == [len(t) for t in texts]
+    assert batcher.depth == 0
+
+
+def test_full_queue_is_refused():
+    encoder = Encoder()
+    encoder.release.clear()                 # encoder stuck → texts pile up
+    batcher = MicroBatcher(encoder, max_batch=2, max_wait_ms=1, max_queued=4)
+
+    first = batcher.submit(["a", "b"])
+    deadline = time.monotonic() + 5
+    while batcher.depth and time.monotonic() < deadline:
+        time.sleep(0.001)                   # taken by the encoder thread
+    waiting = [batcher.submit(["c", "d"]), batcher.submit(["e"])]
+    with pytest.raises(Overloaded):
+        batcher.submit(["f", "g", "h"])
+
+    encoder.release.set()
+    assert len(first.result(5)) == 2 and all(w.result(5) for w in waiting)
+
+
+def test_failed_encode_fails_only_its_batch():
+    encoder = Encoder()
+    batcher = MicroBatcher(encoder, max_batch=1, max_wait_ms=1)
+
+    bad = batcher.submit(["boom"])
+    with pytest.raises(ValueError):
+        bad.result(5)
+    assert len(batcher.submit(["fine"]).result(5)) == 1
+
+
+def test_wrong_vector_count_is_an_error():
+    batcher = MicroBatcher(lambda texts: [], max_wait_ms=1)
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(["a"]).result(5)
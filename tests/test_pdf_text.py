@@ -0,0 +1,87 @@
+# FILE: tests/test_pdf_text.py
+"""
+Tiered PDF extraction: readable pages stay on the PyPDF2 fast path,
+pages whose fast text looks wrong are re-read with pdfplumber, and the
+page cap is reported; an unreadable file reads as empty text.
+"""
+
+import io
+
+import pytest
+
+from app.utils import pdf_text
+from app.utils.file_handler import read_pdf
+from app.utils.pdf_text import extract_pdf, text_quality
+
+pytest.importorskip("PyPDF2")
+pytest.importorskip("pdfplumber")
+
+PAGE = ["Priya Sharma worked as a data analyst at Acme Corp in Pune",
+        "Built reporting dashboards in Python and SQL for the finance team"]
+
+
+def make_pdf(pages):
+    """Minimal text-only PDF, one content stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        body = "BT /F1 10 Tf 12 TL 50 800 Td\n" + "".join(f"({l}) Tj T*\n" for l in lines) + "ET"
+        kids.append(len(objects) + 1)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>"
+                       .encode())
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream".encode())
+    objects[1] = (f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] "
+                  f"/Count {len(kids)} >>").encode()
+
+    out = io.BytesIO(b"%PDF-1.4\n")
+    out.seek(0, io.SEEK_END)
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.write("".join(f"{off:010d} 00000 n \n" for off in offsets).encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+              f"startxref\n{xref}\n%%EOF\n".encode())
+    return io.BytesIO(out.getvalue())
+
+
+def test_text_quality():
+    assert text_quality(" ".join(PAGE)) > 0.8
+    assert text_quality("(cid:12)(cid:34) " * 20) < pdf_text.QUALITY_THRESHOLD
+    assert text_quality("too few words") == 0.0
+    assert text_quality("x" * 200 + " word" * 12) < pdf_text.QUALITY_THRESHOLD
+
+
+def test_readable_pages_stay_on_the_fast_path():
+    text, report = extract_pdf(make_pdf([PAGE, PAGE]))
+
+    assert report["tiers"] == ["fast", "fast"]
+    assert PAGE[0] in text and len(report["page_ms"]) == 2
+
+
+def test_bad_fast_page_is_reread_with_layout(monkeypatch):
+    fast_pages = pdf_text._fast_pages
+
+    def garbled_first_page(file, max_pages):
+        texts, seconds, total = fast_pages(file, max_pages)
+        return ["(cid:3)(cid:4)" * 30] + texts[1:], seconds, total
+
+    monkeypatch.setattr(pdf_text, "_fast_pages", garbled_first_page)
+    text, report = extract_pdf(make_pdf([PAGE, PAGE]))
+
+    assert report["tiers"] == ["layout", "fast"]
+    assert "cid:" not in text and text.count("Priya Sharma") == 2
+
+
+def test_page_cap_is_reported():
+    text, report = extract_pdf(make_pdf([PAGE] * 3), max_pages=2)
+
+    assert (report["pages"], report["total_pages"], report["capped"]) == (2, 3, 1)
+
+
+def test_unreadable_file_gives_empty_text():
+    assert read_pdf(io.BytesIO(b"not a pdf at all")) == ""
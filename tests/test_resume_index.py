@@ -0,0 +1,78 @@
+# FILE: tests/test_resume_index.py
+"""
+IVF resume index: probing every cell gives the exact top-k, clustered
+data keeps recall with few cells probed, and refresh() follows resumes
+saved / deleted through the database.
+"""
+
+import numpy as np
+
+from app.services import resume_index
+from app.services.resume_index import ResumeIndex
+
+
+def clustered(n, dim=16, n_clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    return (centers[rng.integers(n_clusters, size=n)]
+            + 0.1 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def save(db, emb):
+    return db.save_resume(filename="cv", filedata=None, clean_text="python", skills=[],
+                          name=None, email=None, phone=None, education=None,
+                          experience=None, projects=None, embedding=emb)
+
+
+def trained_index(db, tmp_path, n=2000):
+    index = ResumeIndex(index_path=str(tmp_path / "centroids.npy"), dim=16)
+    vectors = clustered(n)
+    index.add(np.arange(1, n + 1), vectors)
+    assert index.build(n_lists=20)
+    return index, vectors
+
+
+def test_probing_every_cell_is_exact(db, tmp_path):
+    index, vectors = trained_index(db, tmp_path)
+    query = vectors[7] + 0.05
+
+    assert index.search(query, k=10, nprobe=20) == index.exact_search(query, k=10)
+
+
+def test_recall_on_clustered_vectors(db, tmp_path):
+    index, vectors = trained_index(db, tmp_path)
+    queries = clustered(20, seed=1)
+
+    recalls = [index.recall(q, k=10, nprobe=4) for q in queries]
+    assert np.mean(recalls) >= 0.9
+
+
+def test_untrained_index_searches_exactly(db, tmp_path):
+    index = ResumeIndex(index_path=None, dim=16)
+    vectors = clustered(50)
+    index.add(np.arange(1, 51), vectors)
+
+    assert not index.is_trained
+    assert index.search(vectors[3], k=5)[0][0] == 4
+
+
+def test_centroids_are_reloaded(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_index, "MIN_TRAIN_SIZE", 16)
+    index, _ = trained_index(db, tmp_path, n=200)
+
+    reopened = ResumeIndex(index_path=index.index_path, dim=16)
+    assert reopened.is_trained and np.allclose(reopened.centroids, index.centroids)
+
+
+def test_refresh_follows_saved_and_deleted_resumes(db, tmp_path):
+    vectors = clustered(6)
+    ids = [save(db, v) for v in vectors[:4]]
+    index = ResumeIndex(index_path=None)
+    assert len(index) == 4
+
+    new_id = save(db, vectors[4])
+    db.delete_resume(ids[0])
+
+    found = [rid for rid, _ in index.search(vectors[4], k=10)]
+    assert found[0] == new_id
+    assert ids[0] not in found and len(index) == 4
@@ -0,0 +1,154 @@
+# FILE: tests/test_scoring_session.py
+"""
+Incremental session scoring: a rerun only extracts / embeds uploads it
+has not seen, nothing is saved twice, unreadable files are retried and
+a BM25 shortlist embeds only its top-N. Extraction, JD parsing and the
+embedding model are replaced by fakes.
+"""
+
+import io
+import zlib
+
+import numpy as np
+import pytest
+
+from app.services import scoring_session
+from app.services.scoring_session import ScoringSession
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data.encode() if isinstance(data, str) else data)
+        self.name = name
+
+
+class FakePool:
+    def __init__(self):
+        self.extracted = []
+
+    def extract_all(self, files):
+        self.extracted += [f.name for f in files]
+        out = []
+        for f in files:
+            text = f.getvalue().decode()
+            out.append({"filename": f.name, "raw_text": text, "clean_text": text.lower(),
+                        "sections": None, "error": None if text else "no text found"})
+        return out
+
+
+class FakeJDParser:
+    def process_jd(self, text):
+        return {"clean_text": text.lower(), "skills": ["python", "sql"], "role": "developer"}
+
+    def extract_skills(self, text):
+        return self.match_skills(text, ["python", "sql"])
+
+    def match_skills(self, text, skills):
+        return [s for s in skills if s in text.lower()]
+
+
+def vec(text):
+    return np.random.default_rng(zlib.crc32(text.encode())).normal(size=8).astype(np.float32)
+
+
+class FakeModel:
+    def __init__(self):
+        self.embedded = []
+
+    def encode_document(self, text):
+        return vec(text)
+
+    def encode_documents(self, texts):
+        self.embedded += texts
+        return [vec(t) for t in texts]
+
+    def embed_documents(self, texts, pooling="mean"):
+        return [{"embedding": emb, "chunks": [t], "chunk_embeddings": [emb]}
+                for t, emb in zip(texts, self.encode_documents(texts))]
+
+
+@pytest.fixture
+def fakes(db, monkeypatch):
+    pool, model, parser = FakePool(), FakeModel(), FakeJDParser()
+    monkeypatch.setattr(scoring_session, "get_extraction_pool", lambda: pool)
+    monkeypatch.setattr(scoring_session, "get_embedding_model", lambda: model)
+    monkeypatch.setattr(scoring_session, "get_jd_parser", lambda: parser)
+    monkeypatch.setattr(scoring_session, "SHORTLIST_SIZE", 0)
+    return pool, model
+
+
+def counts(db):
+    conn = db.get_connection()
+    return tuple(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                 for table in ("resumes", "job_descriptions", "results"))
+
+
+JD = "Python developer with SQL"
+
+
+def test_rerun_processes_only_new_uploads(db, fakes):
+    pool, model = fakes
+    session = ScoringSession()
+    files = [Upload("a.pdf", "python and sql"), Upload("b.pdf", "java only")]
+
+    _, first = session.score(files, JD)
+    _, again = session.score(files, JD)
+    assert again == first
+    assert pool.extracted == ["a.pdf", "b.pdf"] and counts(db) == (2, 1, 2)
+
+    files.append(Upload("c.pdf", "sql reports"))
+    resumes, scores = session.score(files, JD)
+
+    assert pool.extracted == ["a.pdf", "b.pdf", "c.pdf"]
+    assert len(model.embedded) == 3 and counts(db) == (3, 1, 3)
+    assert [r["name"] for r in resumes] == ["a", "b", "c"]
+    assert scores[0]["skills"] == ["python", "sql"]
+
+
+def test_unreadable_upload_is_retried(db, fakes):
+    pool, _ = fakes
+    session = ScoringSession()
+    empty = Upload("empty.pdf", "")
+
+    resumes, _ = session.score([empty, Upload("a.pdf", "python")], JD)
+    assert [r["name"] for r in resumes] == ["a"]
+    assert session.errors([empty]) == [("empty.pdf", "no text found")]
+
+    session.score([empty, Upload("a.pdf", "python")], JD)
+    assert pool.extracted.count("empty.pdf") == 2 and pool.extracted.count("a.pdf") == 1
+
+
+def test_new_jd_reuses_parsed_resumes(db, fakes):
+    pool, model = fakes
+    session = ScoringSession()
+    files = [Upload("a.pdf", "python and sql")]
+
+    session.score(files, JD)
+    session.score(files, "SQL analyst")
+
+    assert pool.extracted == ["a.pdf"] and len(model.embedded) == 1
+    assert counts(db) == (1, 2, 2)
+
+
+def test_shortlist_embeds_only_the_top_n(db, fakes, monkeypatch):
+    _, model = fakes
+    monkeypatch.setattr(scoring_session, "SHORTLIST_SIZE", 1)
+    session = ScoringSession()
+    files = [Upload("a.pdf", "cooking and gardening"), Upload("b.pdf", "python developer sql")]
+
+    _, scores = session.score(files, JD)
+
+    assert model.embedded == ["python developer sql"]
+    assert [s["shortlisted"] for s in scores] == [False, True]
+    assert scores[0]["semantic_score"] is None and scores[1]["lexical_score"] == 1.0
+    assert counts(db) == (2, 1, 1)
+
+
+def test_same_uploads_reattach_to_their_job(db, fakes):
+    session = ScoringSession()
+    files = [Upload("a.pdf", "python"), Upload("b.pdf", "sql")]
+
+    job_id = session.submit(files, JD)
+
+    assert session.submit(list(reversed(files)), JD) == job_id
+    assert session.submit(files[:1], JD) != job_id
@@ -0,0 +1,73 @@
+# FILE: tests/test_section_parser.py
+"""
+Single-pass segmenter vs the per-section scans it replaced
+(tests/section_reference.py legacy_sections) plus heading / contact blocks.
+"""
+
+import random
+
+from app.utils.section_parser import SectionParser
+from tests.section_reference import legacy_sections, sample_resume
+
+# No headings and no "ba" / "bs" inside other words → both must agree
+PLAIN_RESUME = "\n".join([
+    "Jane Roe",
+    "jane.roe@example.com",
+    "+91 98765 43210",
+    "Worked at Acme Corp as a data analyst",
+    "Developed a churn model in Python",
+    "Project lead for the reporting tool",
+    "Internship at Infosys",
+    "Senior role in analytics",
+    "Bachelor of Science, Delhi University, 2019",
+    "MSc Data Science from Anna University",
+    "Python SQL Excel",
+])
+
+
+def test_matches_legacy_on_resumes_without_headings():
+    assert SectionParser.get_sections(PLAIN_RESUME) == legacy_sections(PLAIN_RESUME)
+
+
+def test_same_shape_and_contact_fields_as_legacy():
+    rng = random.Random(7)
+    for _ in range(20):
+        text = sample_resume(rng)
+        new, old = SectionParser.get_sections(text), legacy_sections(text)
+
+        assert new.keys() == old.keys()
+        for field in ("name", "email", "phone"):
+            assert new[field] == old[field]
+        for field in ("education", "experience", "projects"):
+            assert new[field]
+
+
+def test_short_keywords_match_whole_words_only():
+    sections = SectionParser.get_sections("Tuned database jobs for speed")
+
+    assert legacy_sections("Tuned database jobs for speed")["education"]
+    assert sections["education"] is None
+
+
+def test_heading_block_keeps_lines_without_keywords():
+    sections = SectionParser.get_sections("EXPERIENCE\nAcme Corp, 2019 - 2021\nSKILLS\nPython")
+
+    assert sections["experience"] == "acme corp, 2019 - 2021"
+    assert sections["education"] is None
+
+
+def test_contact_block_ends_at_resume_content():
+    text = "\n".join([
+        "Contact",
+        "jane@example.com",
+        "+91 98765 43210",
+        "Work Summary",
+        "Worked at Acme as analyst",
+        "B.Tech from XYZ University",
+    ])
+    sections = SectionParser.get_sections(text)
+
+    assert sections["email"] == "jane@example.com"
+    assert sections["phone"] == "+91 98765 43210"
+    assert sections["experience"] == "worked at acme as analyst"
+    assert sections["education"] == "b.tech from xyz university"
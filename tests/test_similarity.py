@@ -0,0 +1,58 @@
+# FILE: tests/test_similarity.py
+"""
+Matrix kernels vs the per-pair score, and the empty-input shapes
+(no resumes → N = 0 rows / k = 0 columns, never an error).
+"""
+
+import numpy as np
+
+from app.services.similarity_engine import SimilarityEngine
+
+
+def vectors(n, d=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, d)).astype(np.float32)
+
+
+def test_matrix_matches_pairwise_scores():
+    engine = SimilarityEngine()
+    resumes, jds = vectors(7), vectors(3, seed=1)
+
+    scores = engine.similarity_matrix(resumes, jds, chunk_size=2)
+
+    expected = [[engine.calculate_similarity(r, j) for j in jds] for r in resumes]
+    assert scores.shape == (7, 3)
+    assert np.allclose(scores, expected, atol=1e-5)
+
+
+def test_top_k_agrees_with_full_sort():
+    engine = SimilarityEngine()
+    resumes, jds = vectors(50), vectors(4, seed=1)
+
+    idx, scores = engine.top_k(resumes, jds, k=5, chunk_size=8)
+
+    full = engine.similarity_matrix(resumes, jds)
+    for j in range(4):
+        assert list(idx[j]) == list(np.argsort(-full[:, j], kind="stable")[:5])
+        assert np.allclose(scores[j], full[idx[j], j])
+
+
+def test_no_resumes_gives_empty_shapes():
+    engine = SimilarityEngine()
+    jds = vectors(3)
+
+    assert engine.normalize([]).shape == (0, 0)
+    assert engine.similarity_matrix([], jds).shape == (0, 3)
+
+    idx, scores = engine.top_k([], jds, k=5)
+    assert idx.shape == scores.shape == (3, 0)
+    assert engine.batch_similarity([], jds[0]) == []
+
+
+def test_missing_vector_scores_zero():
+    engine = SimilarityEngine()
+    resumes = [vectors(1)[0], None]
+
+    scores = engine.similarity_matrix(resumes, vectors(2, seed=1))
+
+    assert scores.shape == (2, 2)
+    assert not scores[1].any()
@@ -0,0 +1,43 @@
+# FILE: tests/test_skill_matcher.py
+"""
+Token-trie skill matcher: whole words and phrases only, aliases fold
+to the canonical skill, longest match wins.
+"""
+
+from app.services.skill_matcher import SkillMatcher, tokenize
+
+SKILLS = ["python", "sql", "ml", "machine learning", "c++", "node.js",
+          "deep learning", "tensorflow", "nlp"]
+ALIASES = {"tf": "tensorflow", "dl": "deep learning", "natural language processing": "nlp"}
+
+
+def matcher():
+    return SkillMatcher(SKILLS, ALIASES)
+
+
+def test_whole_words_only():
+    assert matcher().find_all("HTML, MySQL and PostgreSQL") == []
+    assert matcher().find_all("Python, SQL; ML.") == ["python", "sql", "ml"]
+
+
+def test_phrases_and_symbols():
+    found = matcher().find_all("Built machine learning services in C++ and Node.js")
+    assert found == ["machine learning", "c++", "node.js"]
+
+
+def test_longest_match_and_no_partial_phrase():
+    assert matcher().find_all("machine learning") == ["machine learning"]
+    assert matcher().find_all("machine shop learning") == []
+
+
+def test_aliases_fold_to_canonical_skill():
+    found = matcher().find_all("TF and DL for natural language processing; tensorflow again")
+    assert found == ["tensorflow", "deep learning", "nlp"]
+
+
+def test_match_keeps_jd_order():
+    assert matcher().match("sql then python", ["python", "sql", "nlp"]) == ["python", "sql"]
+
+
+def test_tokenize_drops_sentence_dots():
+    assert tokenize("Used Python. Then node.js.") == ["used", "python", "then", "node.js"]